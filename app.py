@@ -1,19 +1,37 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from datetime import datetime, timezone, timedelta
 import os
-from src.services.trello_service import TrelloService
+from datetime import datetime, timezone, timedelta
+from src.ui.trello_cache import CachedTrelloService
+from src.services.card_cache import card_detail_cache
+from src.services.shared_cache import configured_board_ids
+from src.services.history_store import HistoryStore
+from src.services.card_archive import CardArchive
+from src.services.visits import VisitStore
+from src.services.refresh import refresh_scheduler
+from src.delta import ActionIndex, compute_delta, DELTA_MAX_ITEMS
+from src.anomaly import AnomalyEngine, build_history_context
 from src.ui.styles import apply_custom_styles
-import base64
+from src.ui.assets import asset_src, preload_assets
+from src.ui.fragments import timed_fragment
+from src.ui.snapshot import get_board_snapshot, clear_board_snapshots
+from src.data import DUE_SOON_HOURS
 # Force Reload v2.2 (2026-01-30 15:37)
-from src.ui.components import render_kpi_card_new, render_plotly_bar, render_plotly_pie, render_insight_card
-from src.insights import generate_insights
+from src.ui.components import render_kpi_card_new, render_plotly_bar, render_plotly_pie, render_plotly_area, render_insight_card, render_trace_waterfall, render_due_calendar, render_refresh_status
+from src.insights import generate_insights, actions_fingerprint
+from src.metrics import (compute_kpis, list_counts, member_counts, label_kpis, completions, completions_throughput,
+                         cycle_time, member_deliveries, WIP_CHART_EXCLUDE_PATTERN)
+from src.static_snapshot import SNAPSHOTS_DIR, snapshot_url
+from src.tracing import span, start_trace, end_trace, start_metrics_server
 
 # --- CONFIGURAÇÃO INICIAL ---
 # Force Reload Fix
 st.set_page_config(page_title="Núcleo Digital | Projetos & Cases", page_icon="assets/pie-chart.png", layout="wide", initial_sidebar_state="expanded")
+# Trace do rerun: cada estágio abaixo vira um span (waterfall no modo debug, logs/métricas)
+run_trace = start_trace("app")
+start_metrics_server()
 apply_custom_styles()
+preload_assets()
 
 # --- SERVICES ---
 if "api_key" not in st.session_state:
@@ -21,15 +39,74 @@ if "api_key" not in st.session_state:
 if "token" not in st.session_state:
     st.session_state["token"] = os.getenv("TRELLO_TOKEN")
 
-trello_service = TrelloService(st.session_state["api_key"], st.session_state["token"])
-BOARD_ID = os.getenv("TRELLO_BOARD_ID")
+trello_service = CachedTrelloService(st.session_state["api_key"], st.session_state["token"])
+# Board escolhido no portfólio (drill-down) ou o configurado no ambiente
+BOARD_ID = st.session_state.get("board_id") or os.getenv("TRELLO_BOARD_ID")
+# Semanas exibidas no calendário de prazos
+DUE_CALENDAR_WEEKS = int(os.getenv("DUE_CALENDAR_WEEKS", "8"))
+
+@st.cache_resource
+def get_history_store():
+    return HistoryStore()
+
+@st.cache_resource
+def get_anomaly_engine(board_id):
+    return AnomalyEngine(board_id, get_history_store())
+
+@st.cache_resource
+def get_card_archive():
+    return CardArchive()
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_closed_cards(_service, board_id, epoch, _list_names):
+    """
+    Cards arquivados do board: sincroniza (backfill aos poucos, depois incremental) e lê o local.
+    Uma sincronização por época de atualização do board (mesma agenda adaptativa das cargas).
+    """
+    archive = get_card_archive()
+    try:
+        archive.sync(_service, board_id, _list_names)
+    except Exception:
+        pass
+    return archive.load(board_id)
+
+# Época vencida: descarta os arquivados da época anterior (re-registrar a cada rerun substitui)
+refresh_scheduler.on_advance("closed_cards", lambda board_id, epoch: get_closed_cards.clear(None, board_id, epoch, None))
+
+@st.cache_resource
+def get_visit_store():
+    return VisitStore()
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_action_index(board_id, fingerprint, _actions):
+    """Índice de ações por data (compartilhado entre sessões; um por versão das ações)."""
+    return ActionIndex(_actions)
+
+def current_user_key():
+    """
+    Quem está vendo, quando há identidade própria: e-mail do login do Streamlit ou membro dono
+    de um token informado na sessão. Com o token do ambiente todos os acessos seriam o mesmo
+    membro, então retorna None (sem acompanhamento de visitas).
+    """
+    if st.user.get("is_logged_in") and st.user.get("email"):
+        return st.user.get("email")
+    token = st.session_state.get("token")
+    if not token or token == os.getenv("TRELLO_TOKEN"):
+        return None
+    member = st.session_state.get("trello_member")
+    if not member or member[0] != token:
+        me = trello_service.get_me() or {}
+        member = st.session_state["trello_member"] = (token, me.get("id"))
+    return member[1]
 
 # --- SIDEBAR (FILTROS & CONFIG) ---
 with st.sidebar:
     st.image("assets/logo.png", use_container_width=True)
     st.markdown("### 🎛️ Filtros Avançados")
     
-    if not trello_service.validate_auth():
+    with span("auth"):
+        authenticated = trello_service.validate_auth()
+    if not authenticated:
         st.warning("⚠️ Autenticação incompleta")
         
         api_key_input = st.text_input("API Key", value=st.session_state["api_key"] or "", type="password")
@@ -49,26 +126,32 @@ with st.sidebar:
         st.stop()
 
     # Load Data
-    board_data = trello_service.get_board_data(BOARD_ID)
-    if not board_data:
+    with span("board_snapshot"):
+        snapshot = get_board_snapshot(trello_service, BOARD_ID)
+    if not snapshot:
         st.stop()
+    board_data = snapshot.board_data
 
     # Prepare Filter Options
-    all_members = {m['id']: m['fullName'] for m in board_data['members']}
-    all_lists = {l['id']: l['name'] for l in board_data['lists']}
+    all_members = snapshot.members
+    all_lists = snapshot.lists
     
     # Filters
     selected_lists = st.multiselect("Filtrar por Lista:", options=all_lists.values(), default=[l for l in all_lists.values() if "Backlog" not in l])
     selected_members = st.multiselect("Filtrar por Membro:", options=all_members.values())
+    # Labels: tabela resolvida no snapshot; filtro combina os bitmaps por OR/AND
+    label_options = snapshot.label_table[snapshot.label_table['cards'] > 0]
+    selected_labels = st.multiselect("Filtrar por Label:", options=label_options['id'].tolist(),
+                                     format_func=lambda label_id: snapshot.labels.get(label_id, label_id))
+    label_mode = st.radio("Combinar labels", ["Qualquer (OU)", "Todas (E)"], horizontal=True,
+                          disabled=len(selected_labels) < 2)
     
     st.divider()
     
     # Botão de refresh com ícone customizado (arrow.png)
-    import base64
     try:
-        with open("assets/arrow.png", "rb") as f:
-            arrow_b64 = base64.b64encode(f.read()).decode()
-            
+        arrow_src = asset_src("arrow.png")
+
         st.markdown(f"""
         <style>
         /* Estiliza o botão APENAS na sidebar para incluir o ícone */
@@ -83,7 +166,7 @@ with st.sidebar:
             content: "";
             width: 18px;
             height: 18px;
-            background-image: url("data:image/png;base64,{arrow_b64}");
+            background-image: url("{arrow_src}");
             background-size: contain;
             background-repeat: no-repeat;
             background-position: center;
@@ -97,51 +180,297 @@ with st.sidebar:
     
     if st.button("Atualizar Dados", use_container_width=True):
         st.cache_data.clear()
+        clear_board_snapshots()
+        card_detail_cache.clear()
+        trello_service.invalidate_board(BOARD_ID)
+        get_closed_cards.clear()
         st.rerun()
 
     st.divider()
     if st.button("Abrir Card Explorer", use_container_width=True, help="Exploração detalhada de cartões com busca e filtros"):
         st.switch_page("pages/explorer.py")
+    if len(configured_board_ids()) > 1 and st.button("Visão de Portfólio", use_container_width=True, help="KPIs consolidados de todos os boards"):
+        st.switch_page("pages/portfolio.py")
 
-# --- DATA PROCESSING ---
-df_cards = pd.DataFrame(board_data['cards'])
-df_cards['list_name'] = df_cards['idList'].map(all_lists)
+    show_debug = st.toggle("Modo debug", key="show_debug", help="Exibe o custo das regras de insight e o tempo de render de cada seção")
+
+    # Versão estática pré-renderizada (src.static_snapshot): leve para quem só precisa ver
+    if os.path.exists(os.path.join(SNAPSHOTS_DIR, str(BOARD_ID), "index.html")):
+        st.markdown(f"<small><a href='{snapshot_url(BOARD_ID)}' target='_blank'>📄 Versão estática (sem filtros)</a></small>", unsafe_allow_html=True)
 
+# --- DATA PROCESSING ---
 # Fetch Actions (Needed for Throughput AND Insights)
-actions = trello_service.get_actions(BOARD_ID)
+with span("actions"):
+    actions = trello_service.get_actions(BOARD_ID)
+    # Sync incremental: cards com ações mais novas que o detalhe em cache são invalidados
+    card_detail_cache.invalidate_from_actions(actions)
+# Atualização adaptativa: o intervalo segue a taxa de ações do board (medida nas ações acima)
+with st.sidebar:
+    render_refresh_status(refresh_scheduler.status(BOARD_ID))
 
-# Filter Logic
-if selected_lists:
-    df_cards_filtered = df_cards[df_cards['list_name'].isin(selected_lists)]
-else:
-    df_cards_filtered = df_cards # If nothing selected (or default), show all? sidebar default handles it.
+# Última visita: lida uma vez por sessão (base do painel de novidades). Só é gravada pelo botão
+# "Marcar como visto", e só para quem tem identidade própria (login ou token da sessão)
+with span("visits"):
+    # Atribuições vêm numa chamada própria: não disputam o limite do log de movimentações
+    assignments = trello_service.get_assignments(BOARD_ID)
+    action_index = get_action_index(BOARD_ID, (actions_fingerprint(actions), actions_fingerprint(assignments)),
+                                    actions + assignments)
+    user_key = current_user_key()
+    if st.session_state.get("delta_visit_owner") != (BOARD_ID, user_key):
+        st.session_state["delta_visit_owner"] = (BOARD_ID, user_key)
+        st.session_state["delta_visit"] = get_visit_store().last_visit(BOARD_ID, user_key) if user_key else None
 
-if selected_members:
-    name_to_id = {v: k for k, v in all_members.items()}
-    selected_ids = [name_to_id[name] for name in selected_members]
-    df_cards_filtered = df_cards_filtered[df_cards_filtered['idMembers'].apply(lambda x: any(mid in selected_ids for mid in x))]
+# Cards arquivados (armazenamento local): throughput, cycle time e equipe cobrem a vida do board
+with span("closed_cards"):
+    closed_cards = get_closed_cards(trello_service, BOARD_ID, refresh_scheduler.epoch(BOARD_ID), all_lists)
 
-# KPI Data
-total_cards = len(df_cards_filtered)
-wip_count = df_cards_filtered[~df_cards_filtered['list_name'].str.contains('Done|Concluído|Backlog|Arquivado', case=False, na=False)].shape[0]
+# Histórico: snapshot diário (idempotente; o job agendado faz o mesmo) e baselines de anomalia
+history_ctx = None
+with span("history"):
+    try:
+        get_history_store().append_daily_snapshot(BOARD_ID, board_data, actions=actions)
+        anomaly_engine = get_anomaly_engine(BOARD_ID)
+        anomaly_engine.update()
+        history_ctx = build_history_context(anomaly_engine, board_data, actions)
+    except Exception:
+        pass
 
-now = datetime.now(timezone.utc)
-df_cards_filtered['due_date'] = pd.to_datetime(df_cards_filtered['due'], utc=True, errors='coerce')
-overdue_count = df_cards_filtered[(df_cards_filtered['due_date'] < now) & (~df_cards_filtered['dueComplete'])].shape[0]
-unassigned_count = df_cards_filtered[df_cards_filtered['idMembers'].apply(len) == 0].shape[0]
+# Filter Logic: a sessão guarda só a máscara; os dados são o snapshot compartilhado
+with span("filter"):
+    name_to_id = {v: k for k, v in all_members.items()}
+    filter_mask = snapshot.mask(
+        list_names=selected_lists,
+        member_ids=[name_to_id[name] for name in selected_members],
+        label_ids=selected_labels,
+        label_mode="and" if label_mode.startswith("Todas") else "or",
+    )
+    df_cards_filtered = snapshot.view(filter_mask)
 
 # --- INSIGHTS ENGINE ---
 # Gera insights com base nos dados filtrados e ações
-insights_list = generate_insights(df_cards_filtered, actions, all_lists)
+insight_timings = []
+with span("insights"):
+    insights_list = generate_insights(df_cards_filtered, actions, all_lists, timings=insight_timings, history=history_ctx,
+                                      label_names=snapshot.labels)
+
+if show_debug:
+    with st.sidebar.expander("🐞 Custo das Regras de Insight", expanded=True):
+        st.dataframe(pd.DataFrame(insight_timings), hide_index=True, use_container_width=True)
+        st.caption(f"Total: {sum(t['ms'] for t in insight_timings):.1f} ms")
+    cache_stats = card_detail_cache.stats()
+    st.sidebar.caption(
+        f"📦 Cache de detalhes: {cache_stats['entries']} cards, "
+        f"{cache_stats['bytes'] / 1024:.0f}/{cache_stats['max_bytes'] / 1024:.0f} KB, "
+        f"hit rate {cache_stats['hit_rate']:.0%} ({cache_stats['evictions']} evicções)"
+    )
+
+
+# --- SECTIONS (fragments: cada seção reexecuta sozinha ao interagir com seus widgets) ---
+@timed_fragment("KPIs")
+def render_kpi_section(df_cards_filtered, filter_mask):
+    now = datetime.now(timezone.utc)
+    kpis = compute_kpis(df_cards_filtered, now)
+    total_cards, wip_count = kpis["total"], kpis["wip"]
+    unassigned_count = kpis["unassigned"]
+    # Prazos: buscas por faixa no índice ordenado do snapshot (sem varrer os cards)
+    overdue_count = len(snapshot.overdue_rows(now, filter_mask))
+    due_soon_count = len(snapshot.due_soon_rows(now, DUE_SOON_HOURS, filter_mask))
+
+    # KPIs (New Style)
+    k1, k2, k3, k4 = st.columns(4)
+    with k1: 
+        # Use HTML wrapper from components
+        render_kpi_card_new("Total Registros", total_cards, "Volume total filtrado", "edit.png")
+    with k2: 
+        render_kpi_card_new("Em Execução", wip_count, "Cards ativos (WIP)", "gear.png")
+    with k3: 
+        render_kpi_card_new("Atrasados", overdue_count, f"Vencidos · {due_soon_count} vencem em {DUE_SOON_HOURS}h", "siren.png")
+    with k4: 
+        render_kpi_card_new("Sem Dono", unassigned_count, "Aguardando atribuição", "user.png")
+
+
+@timed_fragment("Status & Insights")
+def render_status_section(df_cards_filtered, insights_list):
+    st.markdown("### 📊 Status, Distribuição & Insights")
+
+    # Layout: 3 colunas (Bar | Donut | Insights)
+    # Ajustando proporção para dar destaque aos charts mas manter insights visíveis
+    c1, c2, c3 = st.columns([1.8, 1.2, 1.5])
+
+    with c1:
+        st.caption("Volume por Fase")
+        render_plotly_bar(list_counts(df_cards_filtered), 'list_name', 'count', "") # Titulo removido para usar caption externa
+
+    with c2:
+        st.caption("Distribuição do WIP")
+        # Restored "WIP Donut" - showing distribution of active cards
+        wip_df = df_cards_filtered[~df_cards_filtered['list_name'].str.contains(WIP_CHART_EXCLUDE_PATTERN, case=False, na=False)]
+        if not wip_df.empty:
+            wip_counts = wip_df['list_name'].value_counts().reset_index()
+            render_plotly_pie(wip_counts, 'count', 'list_name', "", hole=0.6) # Titulo removido
+        else:
+            st.info("Sem cards em 'WIP' para exibir gráfico.")
+
+    with c3:
+        st.caption("🧠 Insights Automáticos")
+        # Filtro local: reexecuta apenas esta seção
+        only_critical = st.toggle("Apenas críticos", key="insights_only_critical")
+        shown = [i for i in insights_list if i.get("severity") == "critical"] if only_critical else insights_list
+        if shown:
+            # Mostrar max 2-3 insights por vez para não poluir
+            for insight in shown[:3]:
+                render_insight_card(insight)
+            
+            if len(shown) > 3:
+                with st.expander(f"Ver mais {len(shown)-3} insights"):
+                    for insight in shown[3:]:
+                        render_insight_card(insight)
+        else:
+            st.success("Tudo certo! Nenhuma anomalia detectada no momento.")
+
+
+@timed_fragment("Throughput & Equipe")
+def render_throughput_section(df_cards_filtered, actions, closed_cards):
+    r2_c1, r2_c2 = st.columns([2, 1])
+    # Conclusões de toda a vida do board (abertos em "concluído" + arquivados), não só o log de ações
+    done = completions(snapshot, actions, closed_cards)
+
+    with r2_c1:
+        st.markdown("### 📈 Produtividade (Throughput)")
+        # Filtro local: reexecuta apenas esta seção
+        granularity = st.radio("Agrupar por", ["Semana", "Mês"], horizontal=True, key="throughput_granularity", label_visibility="collapsed")
+        tp = completions_throughput(done, 'W' if granularity == "Semana" else 'M')
+        if not tp.empty:
+            tp.columns = [granularity, 'Entregas']
+            render_plotly_area(tp, granularity, 'Entregas')
+            ct = cycle_time(done)
+            caption = f"{len(done)} entregas ({int(done['archived'].sum())} de cards arquivados)"
+            if ct["count"]:
+                caption += f" · Cycle time (criação → conclusão): mediana {ct['median']:.1f} dias, p85 {ct['p85']:.1f} dias"
+            st.caption(caption)
+        else:
+            st.info("Sem dados históricos de conclusão suficientes.")
+
+    with r2_c2:
+        st.markdown("### 👥 Equipe")
+        team_view = st.radio("Equipe", ["Carga atual", "Entregas (histórico)"], horizontal=True,
+                             key="team_view", label_visibility="collapsed")
+        if team_view == "Carga atual":
+            render_plotly_pie(member_counts(df_cards_filtered, all_members), 'count', 'member_name', "Cards por Membro", hole=0.4)
+        elif not done.empty:
+            render_plotly_pie(member_deliveries(done, all_members), 'count', 'member_name', "Entregas por Membro", hole=0.4)
+        else:
+            st.info("Sem entregas registradas.")
+
+
+def _mark_delta_seen():
+    # Callback: a visita passa a ser agora e o painel já reexecuta zerado
+    st.session_state["delta_visit"] = get_visit_store().mark_seen(BOARD_ID, user_key, action_index.version)
+
+
+@timed_fragment("Novidades")
+def render_delta_section():
+    if not user_key:
+        st.caption("🔔 Entre com login (ou com o seu token do Trello) para ver as novidades desde a sua última visita.")
+        return
+    visit = st.session_state.get("delta_visit")
+    if not visit:
+        st.caption("👋 Marque o board como visto para acompanhar o que mudar a partir de agora.")
+        st.button("Marcar como visto", key="delta_mark_seen", on_click=_mark_delta_seen)
+        return
+    # Só as ações da faixa desde a visita e os prazos vencidos nela são lidos
+    delta = compute_delta(action_index, snapshot, visit, datetime.now(timezone.utc))
+    counts = delta["counts"]
+    total = sum(counts.values())
+    since = delta["since"].tz_convert(None).strftime("%d/%m %H:%M")
+    with st.expander(f"🔔 Desde sua última visita ({since} UTC): {total} novidades", expanded=total > 0):
+        labels = {"moved": "Movidos", "completed": "Concluídos", "assigned": "Atribuídos", "newly_overdue": "Passaram a atrasar"}
+        for col, (kind, label) in zip(st.columns(4), labels.items()):
+            col.metric(label, counts[kind])
+        if delta["partial"]:
+            st.caption("Visita anterior ao histórico de ações carregado: movimentações podem estar incompletas.")
+        rows = [{"Tipo": labels[kind], "Card": item["name"], "Detalhe": item["detail"],
+                 "Quando": pd.Timestamp(item["date"]).tz_convert(None)}
+                for kind in labels for item in delta["items"][kind]]
+        if rows:
+            st.dataframe(
+                pd.DataFrame(rows),
+                hide_index=True,
+                use_container_width=True,
+                column_config={"Quando": st.column_config.DatetimeColumn("Quando", format="DD/MM HH:mm")},
+            )
+            if any(counts[kind] > DELTA_MAX_ITEMS for kind in counts):
+                st.caption(f"Mostrando até {DELTA_MAX_ITEMS} cards por tipo.")
+        st.button("Marcar como visto", key="delta_mark_seen", on_click=_mark_delta_seen)
+
+
+@timed_fragment("Prazos")
+def render_due_section(filter_mask):
+    st.markdown("### 📅 Calendário de Prazos")
+    now = datetime.now(timezone.utc)
+    # Semanas completas a partir da segunda-feira atual (dias já passados = prazos vencidos)
+    week_start = now - timedelta(days=now.weekday())
+    d_c1, d_c2 = st.columns([2, 1])
+    with d_c1:
+        calendar = snapshot.due_calendar(week_start, DUE_CALENDAR_WEEKS * 7, filter_mask)
+        if calendar['count'].sum() == 0:
+            st.info(f"Nenhum prazo pendente nas próximas {DUE_CALENDAR_WEEKS} semanas.")
+        else:
+            render_due_calendar(calendar, now)
+    with d_c2:
+        st.caption(f"⏳ Vencem nas próximas {DUE_SOON_HOURS}h")
+        rows = snapshot.due_soon_rows(now, DUE_SOON_HOURS, filter_mask)
+        if len(rows) == 0:
+            st.success("Nenhum prazo nas próximas horas.")
+        else:
+            due_soon = snapshot.cards.iloc[rows]
+            st.dataframe(
+                pd.DataFrame({
+                    "Card": due_soon['name'],
+                    "Lista": due_soon['list_name'],
+                    "Prazo": due_soon['due_date'].dt.tz_localize(None),
+                }),
+                hide_index=True,
+                use_container_width=True,
+                column_config={"Prazo": st.column_config.DatetimeColumn("Prazo", format="DD/MM HH:mm")},
+            )
+
+
+@timed_fragment("Labels")
+def render_label_section(snapshot, filter_mask):
+    st.markdown("### 🏷️ Por Label")
+    by_label = label_kpis(snapshot, filter_mask)
+    if by_label.empty:
+        st.info("Nenhum card com label no filtro atual.")
+        return
+
+    l_c1, l_c2 = st.columns([1, 1.4])
+    with l_c1:
+        render_plotly_bar(by_label.head(12), 'label', 'total', "")
+    with l_c2:
+        by_label['overdue_rate'] = by_label['overdue'] / by_label['total'] * 100
+        st.dataframe(
+            by_label,
+            hide_index=True,
+            use_container_width=True,
+            column_order=['label', 'total', 'wip', 'overdue', 'unassigned', 'overdue_rate'],
+            column_config={
+                'label': st.column_config.TextColumn("Label"),
+                'total': st.column_config.NumberColumn("Cards"),
+                'wip': st.column_config.NumberColumn("Em Execução"),
+                'overdue': st.column_config.NumberColumn("Atrasados"),
+                'unassigned': st.column_config.NumberColumn("Sem Dono"),
+                'overdue_rate': st.column_config.ProgressColumn("% Atrasados", min_value=0, max_value=100, format="%.0f%%"),
+            },
+        )
+
 
 # --- MAIN DASHBOARD ---
 # Title with Target Icon
 try:
-    with open("assets/target.png", "rb") as f:
-        target_encoded = base64.b64encode(f.read()).decode()
     title_html = f"""
     <div class="title-container">
-        <img src="data:image/png;base64,{target_encoded}" class="title-icon-img">
+        <img src="{asset_src('target.png')}" class="title-icon-img">
         <h2 style="margin:0; padding:0;">Visão Geral do Board</h2>
     </div>
     """
@@ -149,93 +478,28 @@ try:
 except:
     st.markdown("## 🦁 Visão Geral do Board")
 
-# KPIs (New Style)
-k1, k2, k3, k4 = st.columns(4)
-with k1: 
-    # Use HTML wrapper from components
-    render_kpi_card_new("Total Registros", total_cards, "Volume total filtrado", "edit.png")
-with k2: 
-    render_kpi_card_new("Em Execução", wip_count, "Cards ativos (WIP)", "gear.png")
-with k3: 
-    render_kpi_card_new("Atrasados", overdue_count, "Vencidos e pendentes", "siren.png")
-with k4: 
-    render_kpi_card_new("Sem Dono", unassigned_count, "Aguardando atribuição", "user.png")
+render_delta_section()
+
+render_kpi_section(df_cards_filtered, filter_mask)
 
 st.markdown("---")
 
 # --- ROW 1: STATUS, DISTRIBUTION & INSIGHTS ---
-st.markdown("### 📊 Status, Distribuição & Insights")
-
-# Layout: 3 colunas (Bar | Donut | Insights)
-# Ajustando proporção para dar destaque aos charts mas manter insights visíveis
-c1, c2, c3 = st.columns([1.8, 1.2, 1.5])
-
-with c1:
-    st.caption("Volume por Fase")
-    list_counts = df_cards_filtered['list_name'].value_counts().reset_index()
-    render_plotly_bar(list_counts, 'list_name', 'count', "") # Titulo removido para usar caption externa
-
-with c2:
-    st.caption("Distribuição do WIP")
-    # Restored "WIP Donut" - showing distribution of active cards
-    wip_df = df_cards_filtered[~df_cards_filtered['list_name'].str.contains('Done|Concluído|Backlog', case=False, na=False)]
-    if not wip_df.empty:
-        wip_counts = wip_df['list_name'].value_counts().reset_index()
-        render_plotly_pie(wip_counts, 'count', 'list_name', "", hole=0.6) # Titulo removido
-    else:
-        st.info("Sem cards em 'WIP' para exibir gráfico.")
-
-with c3:
-    st.caption("🧠 Insights Automáticos")
-    if insights_list:
-        # Mostrar max 2-3 insights por vez para não poluir
-        for insight in insights_list[:3]:
-            render_insight_card(insight)
-        
-        if len(insights_list) > 3:
-            with st.expander(f"Ver mais {len(insights_list)-3} insights"):
-                for insight in insights_list[3:]:
-                    render_insight_card(insight)
-    else:
-        st.success("Tudo certo! Nenhuma anomalia detectada no momento.")
+render_status_section(df_cards_filtered, insights_list)
 
 # --- ROW 2: THROUGHPUT & TEAM ---
 st.markdown("---")
-r2_c1, r2_c2 = st.columns([2, 1])
-
-with r2_c1:
-    st.markdown("### 📈 Produtividade (Throughput)")
-    # actions já foi carregado lá em cima
-    if actions:
-        done_list_ids = [lid for lid, name in all_lists.items() if 'Done' in name or 'Concluído' in name]
-        throughput_dates = []
-        for action in actions:
-            if action['type'] == 'updateCard' and action['data'].get('listAfter', {}).get('id') in done_list_ids:
-                throughput_dates.append(action['date'])
-        
-        if throughput_dates:
-            df_tp = pd.DataFrame({'date': throughput_dates})
-            df_tp['date'] = pd.to_datetime(df_tp['date'], utc=True)
-            df_tp['week'] = df_tp['date'].dt.to_period('W').apply(lambda r: r.start_time)
-            weekly_tp = df_tp['week'].value_counts().sort_index().reset_index()
-            weekly_tp.columns = ['Semana', 'Entregas']
-            
-            # FIXED: px.area handles fill automatically. Removed invalid 'fill_color' param.
-            fig_tp = px.area(weekly_tp, x='Semana', y='Entregas', template="plotly_dark")
-            fig_tp.update_traces(line_color='#d4af37') 
-            fig_tp.update_layout(
-                paper_bgcolor='rgba(0,0,0,0)', 
-                plot_bgcolor='rgba(0,0,0,0)', 
-                font_color="#ccc",
-                margin=dict(l=20, r=20, t=20, b=20)
-            )
-            st.plotly_chart(fig_tp, use_container_width=True)
-        else:
-            st.info("Sem dados históricos de conclusão suficientes.")
+render_throughput_section(df_cards_filtered, actions, closed_cards)
+
+# --- ROW 3: PRAZOS ---
+st.markdown("---")
+render_due_section(filter_mask)
+
+# --- ROW 4: LABELS ---
+st.markdown("---")
+render_label_section(snapshot, filter_mask)
 
-with r2_c2:
-    st.markdown("### 👥 Equipe")
-    df_exp = df_cards_filtered.explode('idMembers')
-    df_exp['member_name'] = df_exp['idMembers'].map(all_members).fillna('N/A')
-    member_counts = df_exp['member_name'].value_counts().reset_index()
-    render_plotly_pie(member_counts, 'count', 'member_name', "Cards por Membro", hole=0.4)
+end_trace(run_trace)
+if show_debug:
+    with st.sidebar.expander("⏱️ Waterfall do Rerun", expanded=False):
+        render_trace_waterfall(run_trace.to_dict())
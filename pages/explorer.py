@@ -1,11 +1,19 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
-import base64
 from datetime import datetime, timezone
-from src.services.trello_service import TrelloService
+from src.ui.trello_cache import CachedTrelloService
+from src.services.card_cache import card_detail_cache
+from src.services.refresh import refresh_scheduler
 from src.ui.styles import apply_custom_styles
-from src.ui.components import render_explorer_table, render_card_detail_dialog
+from src.ui.assets import asset_src, preload_assets
+from src.ui.fragments import timed_fragment
+from src.ui.components import render_explorer_table, render_card_detail_dialog, render_trace_waterfall, render_refresh_status
+from src.tracing import span, start_trace, end_trace, start_metrics_server
+from src.data import build_explorer_grid
+from src.export import EXPORT_FORMATS, export_cards, export_url, cleanup_exports
+from src.ui.snapshot import get_board_snapshot, clear_board_snapshots
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(
@@ -13,7 +21,10 @@ st.set_page_config(
     page_icon="assets/pie-chart.png",
     layout="wide"
 )
+run_trace = start_trace("explorer")
+start_metrics_server()
 apply_custom_styles()
+preload_assets()
 
 # --- INITIALIZATION ---
 if "api_key" not in st.session_state:
@@ -21,28 +32,24 @@ if "api_key" not in st.session_state:
 if "token" not in st.session_state:
     st.session_state["token"] = os.getenv("TRELLO_TOKEN")
 
-trello_service = TrelloService(st.session_state["api_key"], st.session_state["token"])
-BOARD_ID = os.getenv("TRELLO_BOARD_ID")
+trello_service = CachedTrelloService(st.session_state["api_key"], st.session_state["token"])
+# Board escolhido no portfólio (drill-down) ou o configurado no ambiente
+BOARD_ID = st.session_state.get("board_id") or os.getenv("TRELLO_BOARD_ID")
 # --- SIDEBAR (CONFIGURATIONS) ---
 with st.sidebar:
     st.image("assets/logo.png", use_container_width=True)
     
     # Carregando ícones da sidebar
     try:
-        def get_b64(path):
-            with open(path, "rb") as f:
-                return base64.b64encode(f.read()).decode()
-        
-        icon_settings = get_b64("assets/settings.png")
-        icon_cloud = get_b64("assets/cloud.png")
-        icon_back = get_b64("assets/back.png")
-    except:
-        icon_settings = icon_cloud = icon_back = ""
+        icon_settings = asset_src("settings.png")
+        icon_cloud = asset_src("cloud.png")
+    except OSError:
+        icon_settings = icon_cloud = ""
 
     # Header Configurações
     st.markdown(f"""
     <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 20px;">
-        <img src="data:image/png;base64,{icon_settings}" style="width: 24px; height: 24px;">
+        <img src="{icon_settings}" style="width: 24px; height: 24px;">
         <span style="font-weight: 700; font-size: 1.1rem; color: #fff;">Configurações</span>
     </div>
     """, unsafe_allow_html=True)
@@ -55,6 +62,9 @@ with st.sidebar:
     
     if st.button("Sincronizar Agora", use_container_width=True, help="Recarrega dados do Trello"):
         st.cache_data.clear()
+        clear_board_snapshots()
+        card_detail_cache.clear()
+        trello_service.invalidate_board(BOARD_ID)
         st.rerun()
 
     st.divider()
@@ -62,13 +72,15 @@ with st.sidebar:
     if st.button("Painel Principal", use_container_width=True):
         st.switch_page("app.py")
 
+    show_debug = st.toggle("Modo debug", key="show_debug", help="Exibe a cascata de tempos do rerun")
+
     # Injeção de CSS para colocar os ícones nos botões da sidebar
     st.markdown(f"""
     <style>
         /* Sincronizar Agora */
         section[data-testid="stSidebar"] button[kind="secondary"]:nth-of-type(1) div[data-testid="stMarkdownContainer"] p::before {{
             content: "";
-            background-image: url('data:image/png;base64,{icon_cloud}');
+            background-image: url('{icon_cloud}');
             background-size: contain;
             background-repeat: no-repeat;
             display: inline-block;
@@ -82,11 +94,9 @@ with st.sidebar:
 
 # --- UI HEADER ---
 try:
-    with open("assets/search.png", "rb") as f:
-        search_encoded = base64.b64encode(f.read()).decode()
     header_html = f"""
     <div class="title-container" style="margin-bottom: 10px;">
-        <img src="data:image/png;base64,{search_encoded}" class="title-icon-img">
+        <img src="{asset_src('search.png')}" class="title-icon-img">
         <h1 style="margin: 0;">Card Explorer</h1>
     </div>
     """
@@ -94,95 +104,132 @@ try:
 except:
     st.markdown("<h1>🔍 Card Explorer</h1>", unsafe_allow_html=True)
 
-# --- FILTROS EM LINHA ---
-c_f1, c_f2, c_f3 = st.columns([2, 1, 1])
-with c_f1:
-    search_query = st.text_input("", placeholder="🔍 Buscar por nome ou descrição...", label_visibility="collapsed")
-
 # Busca de dados
-board_data = trello_service.get_board_data(BOARD_ID)
-if not board_data:
+with span("board_snapshot"):
+    snapshot = get_board_snapshot(trello_service, BOARD_ID)
+if not snapshot:
     st.error("Erro ao carregar dados do Board.")
     st.stop()
 
-all_lists = {l['id']: l['name'] for l in board_data['lists']}
-all_members = {m['id']: m['fullName'] for m in board_data['members']}
-
-with st.expander("🎛️ Filtros Avançados & Ordenação", expanded=False):
-    col_e1, col_e2, col_e3 = st.columns(3)
-    with col_e1:
-        sel_lists = st.multiselect("Listas:", options=all_lists.values())
-    with col_e2:
-        sel_members = st.multiselect("Responsáveis:", options=all_members.values())
-    with col_e3:
-        sort_by = st.selectbox("Ordenar por:", ["Última Atividade", "Nome (A-Z)", "Prazo"])
-
-    col_e4, col_e5, col_e6 = st.columns(3)
-    with col_e4:
-        only_overdue = st.checkbox("Apenas Atrasados")
-    with col_e5:
-        if st.button("Limpar Todos os Filtros", use_container_width=True):
-            st.rerun()
-
-# --- DATA PROCESSING ---
-df_cards = pd.DataFrame(board_data['cards'])
-df_cards['list_name'] = df_cards['idList'].map(all_lists)
-
-# Aplicar Filtros
-if search_query:
-    df_cards = df_cards[
-        df_cards['name'].str.contains(search_query, case=False, na=False) |
-        df_cards['desc'].str.contains(search_query, case=False, na=False)
-    ]
-
-if sel_lists:
-    df_cards = df_cards[df_cards['list_name'].isin(sel_lists)]
-
-if sel_members:
-    name_to_id = {v: k for k, v in all_members.items()}
-    selected_ids = [name_to_id[name] for name in sel_members]
-    df_cards = df_cards[df_cards['idMembers'].apply(lambda x: any(mid in selected_ids for mid in x))]
-
-if only_overdue:
-    now = datetime.now(timezone.utc)
-    df_cards['due_date'] = pd.to_datetime(df_cards['due'], utc=True, errors='coerce')
-    df_cards = df_cards[(df_cards['due_date'] < now) & (~df_cards['dueComplete'])]
-
-# Ordenação
-if sort_by == "Nome (A-Z)":
-    df_cards = df_cards.sort_values("name")
-elif sort_by == "Prazo":
-    df_cards = df_cards.sort_values("due", na_position='last')
-else:
-    df_cards = df_cards.sort_values("dateLastActivity", ascending=False)
-
-# --- PAGINAÇÃO ---
-ITEMS_PER_PAGE = 20
-total_items = len(df_cards)
-num_pages = (total_items // ITEMS_PER_PAGE) + (1 if total_items % ITEMS_PER_PAGE > 0 else 0)
-
-# Resumo de busca
-st.markdown(f"<small style='color:#777'>Exibindo <b>{len(df_cards)}</b> cartões</small>", unsafe_allow_html=True)
-
-# --- RENDER TABLE ---
-# Callback para abrir o modal
-def handle_card_click(card_id):
-    # Busca detalhes extras (checklists, actions)
-    with st.spinner("Carregando detalhes..."):
-        card_details = trello_service.get_card_details(card_id)
-        # Pega os dados básicos do card do dataframe original
-        basic_data = df_cards[df_cards['id'] == card_id].iloc[0].to_dict()
-        render_card_detail_dialog(basic_data, card_details)
-
-if total_items > 0:
-    # Sidebar paginação (ou footer)
-    page_col1, page_col2 = st.columns([1, 1])
-    with page_col2:
-        current_page = st.number_input("Página", min_value=1, max_value=max(1, num_pages), step=1, label_visibility="collapsed")
-    
-    start_idx = (current_page - 1) * ITEMS_PER_PAGE
-    end_idx = start_idx + ITEMS_PER_PAGE
-    
-    render_explorer_table(df_cards.iloc[start_idx:end_idx], handle_card_click)
-else:
-    st.info("Nenhum card corresponde aos critérios selecionados.")
+all_lists = snapshot.lists
+all_members = snapshot.members
+all_labels = snapshot.labels
+with span("checklists_actions"):
+    board_checklists = trello_service.get_board_checklists(BOARD_ID)
+    # Detalhes em cache de cards alterados desde a última busca são descartados
+    card_detail_cache.invalidate_from_actions(trello_service.get_actions(BOARD_ID))
+# Atualização adaptativa: o intervalo segue a taxa de ações do board (medida nas ações acima)
+with st.sidebar:
+    render_refresh_status(refresh_scheduler.status(BOARD_ID))
+
+
+# --- FILTROS + GRID (fragment: mudar um filtro reexecuta só esta seção) ---
+@timed_fragment("Explorer")
+def render_explorer_section(snapshot):
+    # --- FILTROS EM LINHA ---
+    c_f1, c_f2, c_f3 = st.columns([2, 1, 1])
+    with c_f1:
+        search_query = st.text_input("Buscar", placeholder="🔍 Buscar por nome ou descrição...", label_visibility="collapsed")
+
+    with st.expander("🎛️ Filtros Avançados & Ordenação", expanded=False):
+        col_e1, col_e2, col_e3 = st.columns(3)
+        with col_e1:
+            sel_lists = st.multiselect("Listas:", options=all_lists.values())
+        with col_e2:
+            sel_members = st.multiselect("Responsáveis:", options=all_members.values())
+        with col_e3:
+            sort_by = st.selectbox("Ordenar por:", ["Última Atividade", "Nome (A-Z)", "Prazo", "Progresso do Checklist"])
+
+        col_e4, col_e5, col_e6 = st.columns(3)
+        with col_e4:
+            only_overdue = st.checkbox("Apenas Atrasados")
+        with col_e5:
+            if st.button("Limpar Todos os Filtros", use_container_width=True):
+                st.rerun()
+        with col_e6:
+            sel_labels = st.multiselect("Labels:", options=snapshot.label_table['id'].tolist(),
+                                        format_func=lambda label_id: all_labels.get(label_id, label_id))
+
+    with span("filter"):
+        # Aplicar Filtros (lista/membro via máscara sobre o snapshot compartilhado)
+        name_to_id = {v: k for k, v in all_members.items()}
+        mask = snapshot.mask(
+            list_names=sel_lists,
+            member_ids=[name_to_id[name] for name in sel_members],
+            label_ids=sel_labels,
+        )
+        if only_overdue:
+            # Atrasados: faixa do índice de prazos até agora, restrita à máscara
+            overdue_mask = np.zeros(len(snapshot), dtype=bool)
+            overdue_mask[snapshot.overdue_rows(datetime.now(timezone.utc), mask)] = True
+            mask = overdue_mask
+        df_cards = snapshot.view(mask)
+
+        if search_query:
+            df_cards = df_cards[
+                df_cards['name'].str.contains(search_query, case=False, na=False) |
+                df_cards['desc'].str.contains(search_query, case=False, na=False)
+            ]
+
+        # Ordenação
+        if sort_by == "Nome (A-Z)":
+            df_cards = df_cards.sort_values("name")
+        elif sort_by == "Prazo":
+            df_cards = df_cards.sort_values("due", na_position='last')
+        elif sort_by == "Progresso do Checklist":
+            df_cards = df_cards.sort_values("checklist_progress", ascending=False, na_position='last')
+        else:
+            df_cards = df_cards.sort_values("dateLastActivity", ascending=False)
+
+    # Resumo de busca
+    st.markdown(f"<small style='color:#777'>Exibindo <b>{len(df_cards)}</b> cartões</small>", unsafe_allow_html=True)
+
+    # --- EXPORT (gravado em fatias direto no disco, baixado como arquivo estático) ---
+    c_x1, c_x2, c_x3 = st.columns([1, 1, 3])
+    with c_x1:
+        export_format = st.selectbox("Formato", EXPORT_FORMATS, format_func=str.upper, label_visibility="collapsed")
+    with c_x2:
+        if st.button("Exportar seleção", use_container_width=True):
+            with st.spinner("Gerando arquivo..."):
+                st.session_state["explorer_export"] = export_cards(
+                    df_cards, export_format, all_labels, all_members, snapshot.board_name
+                )
+    # Exports expirados somem mesmo sem novos exports (os links da sessão deixam de aparecer)
+    cleanup_exports()
+    export_path = st.session_state.get("explorer_export")
+    if export_path and os.path.exists(export_path):
+        with c_x3:
+            file_name = os.path.basename(export_path)
+            if st.get_option("server.enableStaticServing"):
+                st.markdown(f"<a href='{export_url(export_path)}' download='{file_name}'>⬇️ {file_name}</a>", unsafe_allow_html=True)
+            else:
+                with open(export_path, "rb") as f:
+                    st.download_button(f"⬇️ {file_name}", f, file_name=file_name)
+
+    # --- RENDER TABLE ---
+    # Callback para abrir o modal
+    def handle_card_click(card_id):
+        # Busca detalhes extras (checklists, actions)
+        with st.spinner("Carregando detalhes..."):
+            # Checklists já vieram na carga em massa do board: evita uma chamada por card
+            with span("card_details"):
+                card_details = dict(trello_service.get_card_details(card_id, include_checklists=False))
+            card_details["checklists"] = [ck for ck in board_checklists if ck.get('idCard') == card_id]
+            # Pega os dados básicos do card do dataframe original
+            basic_data = df_cards[df_cards['id'] == card_id].iloc[0].to_dict()
+            render_card_detail_dialog(basic_data, card_details)
+
+    # Grid virtualizada: todos os cards filtrados num único componente, sem paginação
+    with span("explorer_grid"):
+        grid_df = build_explorer_grid(df_cards, all_labels, datetime.now(timezone.utc))
+    # Seleção vale só para as linhas que a geraram (posições mudam com filtros/ordenação/dados)
+    grid_state = (id(snapshot), search_query, sel_lists, sel_members, sel_labels, only_overdue, sort_by)
+    render_explorer_table(grid_df, handle_card_click, grid_state)
+
+
+render_explorer_section(snapshot)
+
+end_trace(run_trace)
+if show_debug:
+    with st.sidebar.expander("⏱️ Waterfall do Rerun", expanded=False):
+        render_trace_waterfall(run_trace.to_dict())
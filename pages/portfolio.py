@@ -0,0 +1,143 @@
+import streamlit as st
+import pandas as pd
+import os
+from src.ui.styles import apply_custom_styles
+from src.ui.assets import preload_assets
+from src.ui.components import render_kpi_card_new, render_plotly_area, render_plotly_bar, render_trace_waterfall, selection_key, selected_row
+from src.ui.snapshot import clear_board_snapshots
+from src.services.shared_cache import SharedCacheTrelloService, configured_board_ids
+from src.services.refresh import refresh_scheduler
+from src.portfolio import load_portfolio, PORTFOLIO_RECENT_WEEKS
+from src.tracing import span, start_trace, end_trace, start_metrics_server
+
+# --- CONFIGURAÇÃO DA PÁGINA ---
+st.set_page_config(
+    page_title="Portfólio | Núcleo Digital",
+    page_icon="assets/pie-chart.png",
+    layout="wide"
+)
+run_trace = start_trace("portfolio")
+start_metrics_server()
+apply_custom_styles()
+preload_assets()
+
+# --- INITIALIZATION ---
+if "api_key" not in st.session_state:
+    st.session_state["api_key"] = os.getenv("TRELLO_API_KEY")
+if "token" not in st.session_state:
+    st.session_state["token"] = os.getenv("TRELLO_TOKEN")
+
+BOARD_IDS = configured_board_ids()
+
+
+@st.cache_data(max_entries=16, show_spinner="Carregando boards em paralelo...")
+def get_portfolio(board_ids, epochs, _api_key, _token):
+    # `epochs`: épocas de atualização dos boards; qualquer board vencido recalcula o portfólio
+    return load_portfolio(list(board_ids), _api_key, _token)
+
+
+# --- SIDEBAR ---
+with st.sidebar:
+    st.image("assets/logo.png", use_container_width=True)
+    if st.button("Sincronizar Agora", use_container_width=True, help="Recarrega os boards do Trello"):
+        st.cache_data.clear()
+        clear_board_snapshots()
+        service = SharedCacheTrelloService()
+        for board_id in BOARD_IDS:
+            service.invalidate_board(board_id)
+        st.rerun()
+    show_debug = st.toggle("Modo debug", key="show_debug")
+
+st.markdown("<h1 style='margin-bottom: 0;'>Portfólio de Boards</h1>", unsafe_allow_html=True)
+
+if not BOARD_IDS:
+    st.info("Defina TRELLO_BOARD_IDS (IDs separados por vírgula) para ver a visão consolidada.")
+    st.stop()
+
+with span("portfolio_load", boards=len(BOARD_IDS)):
+    epochs = tuple(refresh_scheduler.epoch(board_id) for board_id in BOARD_IDS)
+    portfolio = get_portfolio(tuple(BOARD_IDS), epochs, st.session_state["api_key"], st.session_state["token"])
+
+for error in portfolio["errors"]:
+    st.warning(f"Board {error['board_id']}: {error['error']}")
+if not portfolio["boards"]:
+    st.stop()
+
+# --- KPIs CONSOLIDADOS ---
+totals = portfolio["totals"]
+k1, k2, k3, k4, k5 = st.columns(5)
+with k1:
+    render_kpi_card_new("Boards", len(portfolio["boards"]), "Boards carregados", "🗂️")
+with k2:
+    render_kpi_card_new("Total Registros", totals["total"], "Somando todos os boards", "📝")
+with k3:
+    render_kpi_card_new("Em Execução", totals["wip"], "WIP consolidado", "⚙️")
+with k4:
+    render_kpi_card_new("Atrasados", totals["overdue"], "Vencidos e pendentes", "🚨")
+with k5:
+    render_kpi_card_new("Entregas", totals["throughput_recent"], f"Últimas {PORTFOLIO_RECENT_WEEKS} semanas", "🚀")
+
+st.markdown("<br>", unsafe_allow_html=True)
+
+# --- TABELA POR BOARD (seleção = drill-down) ---
+boards_df = pd.DataFrame([{
+    "board_id": r["board_id"],
+    "Board": r["board_name"],
+    "Total": r["kpis"]["total"],
+    "WIP": r["kpis"]["wip"],
+    "Atrasados": r["kpis"]["overdue"],
+    "Sem Dono": r["kpis"]["unassigned"],
+    "Entregas": r["throughput_recent"],
+    "Gargalo": f"{r['bottleneck']['list']} ({r['bottleneck']['share']:.0%})" if r["bottleneck"] else "-",
+} for r in portfolio["boards"]])
+
+st.markdown("### Boards")
+event = st.dataframe(
+    boards_df,
+    key=selection_key("portfolio_grid", (epochs, boards_df["board_id"].tolist())),
+    use_container_width=True,
+    hide_index=True,
+    on_select="rerun",
+    selection_mode="single-row",
+    column_order=["Board", "Total", "WIP", "Atrasados", "Sem Dono", "Entregas", "Gargalo"],
+    column_config={
+        "Entregas": st.column_config.NumberColumn("Entregas", help=f"Movidos para concluído nas últimas {PORTFOLIO_RECENT_WEEKS} semanas"),
+        "Gargalo": st.column_config.TextColumn("Gargalo", help="Lista ativa com mais cards (fatia do WIP)"),
+    },
+)
+selected = selected_row(event, boards_df)
+if selected is not None:
+    if st.button(f"Abrir dashboard de '{selected['Board']}'", type="primary"):
+        # O app.py lê o board da sessão (cai no TRELLO_BOARD_ID se não houver)
+        st.session_state["board_id"] = selected["board_id"]
+        st.switch_page("app.py")
+else:
+    st.caption("Selecione um board para abrir o dashboard completo.")
+
+# --- GRÁFICOS CONSOLIDADOS ---
+c1, c2 = st.columns(2)
+with c1:
+    st.markdown("### Entregas por Semana (todos os boards)")
+    weekly = pd.DataFrame(list(portfolio["throughput_weekly"].items()), columns=["period", "count"])
+    if weekly.empty:
+        st.info("Sem entregas registradas nas ações recentes.")
+    else:
+        weekly["period"] = pd.to_datetime(weekly["period"])
+        render_plotly_area(weekly, "period", "count")
+with c2:
+    st.markdown("### Gargalos")
+    necks = pd.DataFrame([{
+        "Board": f"{r['board_name']} · {r['bottleneck']['list']} ({r['bottleneck']['share']:.0%})",
+        "Cards": r["bottleneck"]["cards"],
+    } for r in portfolio["bottlenecks"]])
+    if necks.empty:
+        st.info("Nenhum card ativo nos boards.")
+    else:
+        render_plotly_bar(necks, "Board", "Cards", "")
+
+st.caption(f"Carga: {portfolio['elapsed_ms']:.0f} ms (board mais lento: {portfolio['slowest_load_ms']:.0f} ms)")
+
+end_trace(run_trace)
+if show_debug:
+    with st.sidebar.expander("⏱️ Waterfall do Rerun", expanded=False):
+        render_trace_waterfall(run_trace.to_dict())
@@ -0,0 +1,249 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from src.insights import generate_insights
+from src.report import load_board
+from src.services.shared_cache import SharedCacheTrelloService, configured_board_ids
+
+ALERTS_DIR = os.getenv("ALERTS_DIR", os.path.join("data", "alerts"))
+ALERTS_WORKERS = int(os.getenv("ALERTS_WORKERS", "4"))
+# Severidades que geram alerta
+ALERT_SEVERITIES = tuple(os.getenv("ALERT_SEVERITIES", "critical,attention").split(","))
+# Regras cujo resultado não é conclusivo nesta rodada (não resolvem alertas abertos)
+_INCONCLUSIVE = ("adiada", "erro")
+
+
+def insight_fingerprint(board_id, insight):
+    """Identidade estável do insight: board + regra + tipo + título (a métrica pode variar)."""
+    raw = "|".join([str(board_id), insight.get("rule", ""), insight.get("type", ""), insight.get("title", "")])
+    return hashlib.blake2b(raw.encode(), digest_size=10).hexdigest()
+
+
+def evaluate_board(board_id, severities=ALERT_SEVERITIES):
+    """
+    Roda as regras de insight para um board (sem Streamlit).
+    Retorna {"board_id", "board_name", "insights": {fingerprint: insight}, "inconclusive": {regra}}
+    ou {"board_id", "error"} se o board não pôde ser carregado.
+    """
+    # Um serviço por tarefa: last_error não é compartilhado entre threads
+    service = SharedCacheTrelloService()
+    try:
+        snapshot, actions = load_board(service, board_id)
+    except RuntimeError as e:
+        return {"board_id": board_id, "error": str(e)}
+
+    timings = []
+    # Job em segundo plano: sem orçamento de latência (nenhuma regra é adiada)
+    insights = generate_insights(snapshot.view(), actions, snapshot.lists, timings=timings, budget_ms=float("inf"),
+                                 label_names=snapshot.labels)
+    return {
+        "board_id": board_id,
+        "board_name": snapshot.board_name,
+        "insights": {
+            insight_fingerprint(board_id, i): i for i in insights if i.get("severity") in severities
+        },
+        "inconclusive": {t["rule"] for t in timings if t["status"].startswith(_INCONCLUSIVE)},
+    }
+
+
+def _summary(insight):
+    return {key: insight.get(key) for key in ("rule", "type", "severity", "title", "metric", "description")}
+
+
+def diff_transitions(state, result, now):
+    """
+    Compara o estado aberto do board com a avaliação atual.
+    Retorna (eventos, novo_estado_do_board): 'new' para insights que surgiram, 'resolved' para os que sumiram.
+    """
+    board_id = result["board_id"]
+    previous = state.get(board_id, {})
+    if "error" in result:
+        # Falha de carga não resolve nada: mantém os alertas abertos
+        return [], previous
+
+    events = []
+    current = {}
+    for fp, insight in result["insights"].items():
+        if fp in previous:
+            current[fp] = {**previous[fp], "last_seen": now, "insight": _summary(insight)}
+        else:
+            current[fp] = {"first_seen": now, "last_seen": now, "insight": _summary(insight)}
+            events.append({"event": "new", "board_id": board_id, "board_name": result["board_name"],
+                           "fingerprint": fp, "at": now, **_summary(insight)})
+
+    for fp, entry in previous.items():
+        if fp in current:
+            continue
+        if entry["insight"].get("rule") in result["inconclusive"]:
+            current[fp] = entry
+            continue
+        events.append({"event": "resolved", "board_id": board_id, "board_name": result["board_name"],
+                       "fingerprint": fp, "at": now, "open_since": entry["first_seen"], **entry["insight"]})
+    return events, current
+
+
+# --- Sinks: qualquer objeto com emit(events) ---
+
+class FileSink:
+    """Grava cada evento como uma linha JSON."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def emit(self, events):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+
+
+class WebhookSink:
+    """POST dos eventos em lote ({"events": [...]}) para uma URL."""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def emit(self, events):
+        response = requests.post(self.url, json={"events": events}, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class StdoutSink:
+    def emit(self, events):
+        for event in events:
+            print(f"[{event['event']}] {event['board_name']}: {event['title']} ({event.get('metric')})")
+
+
+def build_sink(spec):
+    """'file:<caminho>', 'webhook:<url>' ou 'stdout'."""
+    kind, _, target = spec.partition(":")
+    if kind == "file":
+        return FileSink(target or os.path.join(ALERTS_DIR, "events.jsonl"))
+    if kind == "webhook":
+        return WebhookSink(target)
+    if kind == "stdout":
+        return StdoutSink()
+    raise ValueError(f"Sink desconhecido: {spec}")
+
+
+# --- Estado e ciclo ---
+
+def load_state(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+
+def run_once(board_ids, sinks, state_path=None, workers=ALERTS_WORKERS):
+    """
+    Avalia todos os boards no pool, emite as transições e persiste o estado.
+    Se algum sink falha, os boards com eventos mantêm o estado anterior: as mesmas transições
+    são emitidas de novo na próxima rodada. Retorna (eventos, sinks_ok).
+    """
+    state_path = state_path or os.path.join(ALERTS_DIR, "state.json")
+    state = load_state(state_path)
+    now = datetime.now(timezone.utc).isoformat()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(evaluate_board, board_ids))
+
+    events = []
+    new_state = dict(state)
+    for result in results:
+        board_events, new_state[result["board_id"]] = diff_transitions(state, result, now)
+        events.extend(board_events)
+        if "error" in result:
+            print(f"{result['board_id']}: {result['error']}", file=sys.stderr)
+
+    sinks_ok = True
+    if events:
+        for sink in sinks:
+            try:
+                sink.emit(events)
+            except Exception as e:
+                sinks_ok = False
+                print(f"Falha no sink {type(sink).__name__}: {e}", file=sys.stderr)
+    if not sinks_ok:
+        # Entrega incompleta: só avança o estado dos boards sem transições pendentes
+        for board_id in {event["board_id"] for event in events}:
+            if board_id in state:
+                new_state[board_id] = state[board_id]
+            else:
+                new_state.pop(board_id, None)
+    save_state(new_state, state_path)
+    return events, sinks_ok
+
+
+def serve_webhook_receiver(port, out_path):
+    """Receptor de webhook para testes: grava cada POST recebido em out_path (JSONL)."""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with open(out_path, "a", encoding="utf-8") as f:
+                f.write(body.decode("utf-8") + "\n")
+            self.send_response(204)
+            self.end_headers()
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    print(f"Receptor de webhook em http://127.0.0.1:{port} -> {out_path}")
+    server.serve_forever()
+
+
+def main(argv=None):
+    # Uso: python -m src.alerts --sink stdout --sink file:data/alerts/events.jsonl [--every 10]
+    parser = argparse.ArgumentParser(description="Avalia os insights dos boards e emite transições (novo/resolvido).")
+    parser.add_argument("--board", nargs="+", default=None, help="Boards (default: TRELLO_BOARD_IDS/TRELLO_BOARD_ID)")
+    parser.add_argument("--sink", action="append", default=None,
+                        help="Destino: stdout, file:<caminho>, webhook:<url> (repetível)")
+    parser.add_argument("--every", type=int, default=0, help="Repete a cada N minutos (0 = uma vez)")
+    parser.add_argument("--workers", type=int, default=ALERTS_WORKERS, help="Boards avaliados em paralelo")
+    parser.add_argument("--state", default=None, help="Arquivo de estado (default: ALERTS_DIR/state.json)")
+    parser.add_argument("--receiver", type=int, default=0, metavar="PORT",
+                        help="Só sobe um receptor de webhook de teste nesta porta")
+    args = parser.parse_args(argv)
+
+    if args.receiver:
+        serve_webhook_receiver(args.receiver, os.path.join(ALERTS_DIR, "webhook_received.jsonl"))
+        return
+
+    boards = args.board or configured_board_ids()
+    if not boards:
+        parser.error("informe --board ou defina TRELLO_BOARD_IDS")
+    sinks = [build_sink(spec) for spec in (args.sink or ["stdout"])]
+
+    while True:
+        events, sinks_ok = run_once(boards, sinks, args.state, args.workers)
+        print(f"{datetime.now():%H:%M:%S} {len(boards)} boards, {len(events)} transições", file=sys.stderr)
+        if not args.every:
+            break
+        time.sleep(args.every * 60)
+    if not sinks_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import math
+import os
+import threading
+from datetime import datetime, timezone, timedelta
+import pandas as pd
+from src.services.history_store import build_daily_snapshot
+
+# Peso do ponto mais recente na média móvel exponencial (EWMA)
+EWMA_ALPHA = float(os.getenv("ANOMALY_EWMA_ALPHA", "0.2"))
+# Largura da banda esperada, em desvios robustos
+ANOMALY_Z = float(os.getenv("ANOMALY_Z", "3.0"))
+# Pontos mínimos antes de uma série poder gerar alertas
+MIN_POINTS = int(os.getenv("ANOMALY_MIN_POINTS", "7"))
+# Escala mínima (em cards) para evitar bandas de largura zero em séries constantes
+MIN_SCALE = 1.0
+
+# Dimensões do histórico acompanhadas pelo motor
+TRACKED_DIMENSIONS = {"list_wip", "member_wip", "due_status", "throughput"}
+# Apenas estes status de prazo viram série
+TRACKED_DUE_STATUS = {"overdue"}
+
+
+class EwmaBaseline:
+    """
+    Baseline incremental de uma série: média e variância exponenciais mais um
+    desvio absoluto médio exponencial (aproximação robusta do MAD).
+    Cada novo ponto custa O(1); nenhum histórico é mantido em memória.
+    """
+
+    __slots__ = ("mean", "var", "mad", "n")
+
+    def __init__(self, mean=0.0, var=0.0, mad=0.0, n=0):
+        self.mean, self.var, self.mad, self.n = mean, var, mad, n
+
+    def update(self, value, alpha=EWMA_ALPHA):
+        if self.n == 0:
+            self.mean = float(value)
+        else:
+            diff = value - self.mean
+            incr = alpha * diff
+            self.mean += incr
+            self.var = (1 - alpha) * (self.var + diff * incr)
+            self.mad = (1 - alpha) * self.mad + alpha * abs(diff)
+        self.n += 1
+
+    def scale(self):
+        # 1.4826 * MAD estima o desvio padrão em séries normais; usa o maior dos dois
+        return max(1.4826 * self.mad, math.sqrt(self.var), MIN_SCALE)
+
+    def zscore(self, value):
+        return (value - self.mean) / self.scale()
+
+    def band(self, z=ANOMALY_Z):
+        spread = z * self.scale()
+        return max(0.0, self.mean - spread), self.mean + spread
+
+    def to_dict(self):
+        return {"mean": self.mean, "var": self.var, "mad": self.mad, "n": self.n}
+
+
+class AnomalyEngine:
+    """
+    Mantém baselines por série (dimension:key) de um board, alimentadas pelos
+    snapshots diários do HistoryStore. Só dias completos (anteriores a hoje)
+    entram nas baselines; os valores de hoje são comparados com a banda.
+    """
+
+    def __init__(self, board_id, history_store):
+        self.board_id = board_id
+        self.store = history_store
+        self.baselines = {}
+        self.labels = {}
+        self.last_date = None
+        # Compartilhado entre sessões (st.cache_resource): checar e consumir dias é atômico
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def _state_path(self):
+        return os.path.join(self.store._board_dir(self.board_id), "baselines.json")
+
+    @property
+    def version(self):
+        """Identifica o estado das baselines (para memoização dos insights)."""
+        return f"{self.last_date}:{len(self.baselines)}"
+
+    def _load(self):
+        if not os.path.exists(self._state_path):
+            return
+        try:
+            with open(self._state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.last_date = state.get("last_date")
+        self.labels = state.get("labels", {})
+        self.baselines = {k: EwmaBaseline(**v) for k, v in state.get("baselines", {}).items()}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self._state_path), exist_ok=True)
+        tmp_path = f"{self._state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "last_date": self.last_date,
+                "labels": self.labels,
+                "baselines": {k: b.to_dict() for k, b in self.baselines.items()},
+            }, f)
+        os.replace(tmp_path, self._state_path)
+
+    @staticmethod
+    def series_from_snapshot(snapshot):
+        """Converte um snapshot (formato longo) em {serie: (rótulo, valor)}."""
+        series = {}
+        for row in snapshot.itertuples(index=False):
+            if row.dimension not in TRACKED_DIMENSIONS:
+                continue
+            if row.dimension == "due_status" and row.key not in TRACKED_DUE_STATUS:
+                continue
+            series[f"{row.dimension}:{row.key}"] = (row.label, float(row.count))
+        return series
+
+    def update(self, now=None):
+        """
+        Consome apenas os dias completos ainda não vistos (O(1) por ponto e série).
+        Séries ausentes num dia contam como zero. Retorna o número de dias consumidos.
+        """
+        with self._lock:
+            now = now or datetime.now(timezone.utc)
+            yesterday = (now - timedelta(days=1)).date()
+            if self.last_date and self.last_date >= yesterday.isoformat():
+                return 0
+
+            start = (datetime.fromisoformat(self.last_date) + timedelta(days=1)) if self.last_date else datetime(2000, 1, 1)
+            history = self.store.query(self.board_id, start, yesterday)
+            if history.empty:
+                return 0
+
+            days = 0
+            for day, snapshot in history.groupby('date', sort=True):
+                observed = self.series_from_snapshot(snapshot)
+                for key in set(self.baselines) | set(observed):
+                    label, value = observed.get(key, (self.labels.get(key, key), 0.0))
+                    self.labels[key] = label
+                    self.baselines.setdefault(key, EwmaBaseline()).update(value)
+                self.last_date = day.date().isoformat()
+                days += 1
+
+            self._save()
+            return days
+
+    def detect(self, current_snapshot, z=ANOMALY_Z):
+        """Séries cujo valor atual saiu da banda esperada."""
+        current = self.series_from_snapshot(current_snapshot)
+        with self._lock:
+            baselines = list(self.baselines.items())
+        anomalies = []
+        for key, baseline in baselines:
+            if baseline.n < MIN_POINTS:
+                continue
+            label, value = current.get(key, (self.labels.get(key, key), 0.0))
+            low, high = baseline.band(z)
+            if low <= value <= high:
+                continue
+            anomalies.append({
+                "series": key,
+                "dimension": key.split(":", 1)[0],
+                "label": label,
+                "value": value,
+                "expected": baseline.mean,
+                "low": low,
+                "high": high,
+                "zscore": baseline.zscore(value),
+            })
+        return sorted(anomalies, key=lambda a: -abs(a["zscore"]))
+
+
+def build_history_context(engine, board_data, actions, now=None):
+    """Contexto histórico para generate_insights: baselines + snapshot atual do board inteiro."""
+    current = build_daily_snapshot(board_data, now, actions)
+    hashed = pd.util.hash_pandas_object(current[['dimension', 'key', 'count']], index=False).values
+    return {
+        "engine": engine,
+        "current": current,
+        "fingerprint": hashlib.blake2b(hashed.tobytes(), digest_size=8).hexdigest(),
+    }
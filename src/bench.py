@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from src.data import BoardSnapshot, build_explorer_grid
+from src.insights import generate_insights, clear_insights_cache
+from src.metrics import compute_kpis, throughput
+from src.synth import generate_board
+
+BENCH_BASELINE = os.getenv("BENCH_BASELINE", os.path.join("data", "bench", "baseline.json"))
+# Escalas padrão: cards (ações = 2x cards)
+BENCH_SCALES = [10_000, 100_000]
+# Tolerância antes de acusar regressão (0.25 = 25% mais lento que o baseline)
+BENCH_TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "0.25"))
+# Estágios abaixo disso (ms) são ruído demais para comparar
+BENCH_MIN_MS = 5.0
+
+
+def _timeit(fn, repeat):
+    """Menor tempo (ms) entre `repeat` execuções."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best, result
+
+
+def run_stages(board_data, actions, checklists, repeat=3, now=None):
+    """
+    Executa o pipeline do dashboard offline, estágio por estágio, e retorna {estágio: ms}.
+    Os estágios espelham o que app.py e pages/explorer.py fazem a cada carga.
+    """
+    now = now or datetime.now(timezone.utc)
+    timings = {}
+
+    timings["parse"], snapshot = _timeit(lambda: BoardSnapshot(board_data, checklists), repeat)
+
+    lists = list(snapshot.lists.values())[1:3]
+    members = list(snapshot.members)[:3]
+    timings["filter"], cards = _timeit(
+        lambda: snapshot.view(snapshot.mask(list_names=lists, member_ids=members)), repeat)
+    all_cards = snapshot.view()
+
+    timings["kpis"], _ = _timeit(lambda: compute_kpis(all_cards, now), repeat)
+
+    def insights_cold():
+        clear_insights_cache()
+        return generate_insights(all_cards, actions, snapshot.lists, label_names=snapshot.labels)
+    timings["insights"], _ = _timeit(insights_cold, repeat)
+    # Memo quente: mesma entrada, regras devolvem o resultado cacheado
+    timings["insights_memo"], _ = _timeit(lambda: generate_insights(all_cards, actions, snapshot.lists, label_names=snapshot.labels), repeat)
+
+    timings["throughput"], _ = _timeit(lambda: throughput(actions, snapshot.lists, 'W'), repeat)
+
+    def explorer_page():
+        view = all_cards.sort_values("dateLastActivity", ascending=False)
+        return build_explorer_grid(view, snapshot.labels, now)
+    timings["explorer"], _ = _timeit(explorer_page, repeat)
+
+    return {stage: round(ms, 2) for stage, ms in timings.items()}
+
+
+def run_benchmarks(scales=BENCH_SCALES, actions_per_card=2.0, repeat=3, seed=42):
+    """Roda os estágios para cada escala. Retorna {n_cards (str): {estágio: ms}}."""
+    results = {}
+    for n_cards in scales:
+        board_data, actions, checklists = generate_board(n_cards, int(n_cards * actions_per_card), seed=seed)
+        results[str(n_cards)] = run_stages(board_data, actions, checklists, repeat=repeat)
+        del board_data, actions, checklists
+    return results
+
+
+def compare(results, baseline, tolerance=BENCH_TOLERANCE):
+    """Lista de regressões (escala, estágio, baseline_ms, atual_ms) acima da tolerância."""
+    regressions = []
+    for scale, stages in results.items():
+        for stage, ms in stages.items():
+            base = baseline.get(scale, {}).get(stage)
+            if base is None or max(base, ms) < BENCH_MIN_MS:
+                continue
+            if ms > base * (1 + tolerance):
+                regressions.append((scale, stage, base, ms))
+    return regressions
+
+
+def _environment():
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def main(argv=None):
+    # Uso: python -m src.bench [--scales 10000 100000] [--record]
+    parser = argparse.ArgumentParser(description="Benchmark offline do pipeline com boards sintéticos.")
+    parser.add_argument("--scales", type=int, nargs="+", default=BENCH_SCALES, help="Quantidades de cards")
+    parser.add_argument("--actions-per-card", type=float, default=2.0, help="Ações geradas por card")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por estágio (vale o menor tempo)")
+    parser.add_argument("--baseline", default=BENCH_BASELINE, help="Arquivo de baseline (JSON)")
+    parser.add_argument("--record", action="store_true", help="Grava os resultados como novo baseline")
+    parser.add_argument("--tolerance", type=float, default=BENCH_TOLERANCE, help="Tolerância de regressão (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.scales, args.actions_per_card, args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    for scale, stages in results.items():
+        print(f"{int(scale):,} cards".replace(",", "."))
+        for stage, ms in stages.items():
+            base = baseline.get(scale, {}).get(stage)
+            delta = f"  ({(ms / base - 1) * 100:+.0f}% vs baseline)" if base else ""
+            print(f"  {stage:<14} {ms:10.1f} ms{delta}")
+
+    if args.record:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        merged = {**baseline, **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"environment": _environment(), "results": merged}, f, indent=2)
+        print(f"Baseline gravado em {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for scale, stage, base, ms in regressions:
+        print(f"REGRESSÃO: {stage} @ {scale} cards: {base:.1f} ms -> {ms:.1f} ms", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Copy-on-Write: fatias/derivações nunca escrevem no snapshot compartilhado (padrão no pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+CHECKLIST_COLUMNS = ["checklist_items", "checklist_done", "checklist_progress"]
+
+# Colunas de texto convertidas para armazenamento Arrow (compacto e imutável)
+ARROW_STRING_COLUMNS = ["id", "name", "desc", "idList", "list_name", "url"]
+
+_DAY_NS = 86_400 * 10**9
+# Janela de "vencendo em breve" (Explorer, KPIs, insights e alertas)
+DUE_SOON_HOURS = int(os.getenv("DUE_SOON_HOURS", "48"))
+
+
+def checklist_progress(checklists):
+    """
+    Agrega os checklists do board (carga em massa) por card.
+    Retorna DataFrame indexado por idCard com total de itens, concluídos e progresso (0-1).
+    """
+    rows = []
+    for ck in checklists or []:
+        items = ck.get('checkItems', [])
+        rows.append((
+            ck.get('idCard'),
+            len(items),
+            sum(1 for item in items if item.get('state') == 'complete'),
+        ))
+
+    if not rows:
+        return pd.DataFrame(columns=CHECKLIST_COLUMNS[:2]).rename_axis('idCard')
+
+    df = pd.DataFrame(rows, columns=['idCard'] + CHECKLIST_COLUMNS[:2])
+    df = df.groupby('idCard').sum()
+    df['checklist_progress'] = df['checklist_done'] / df['checklist_items'].where(df['checklist_items'] > 0)
+    return df
+
+
+def build_cards_frame(board_data, checklists=None):
+    """
+    Monta o DataFrame de cards do board com as colunas derivadas usadas pelas páginas:
+    list_name e progresso de checklist (NaN para cards sem checklist).
+    """
+    all_lists = {l['id']: l['name'] for l in board_data['lists']}
+    df_cards = pd.DataFrame(board_data['cards'])
+    df_cards['list_name'] = df_cards['idList'].map(all_lists)
+
+    progress = checklist_progress(checklists)
+    if progress.empty:
+        for col in CHECKLIST_COLUMNS:
+            df_cards[col] = 0 if col != "checklist_progress" else float('nan')
+    else:
+        df_cards = df_cards.join(progress, on='id')
+        df_cards[CHECKLIST_COLUMNS[:2]] = df_cards[CHECKLIST_COLUMNS[:2]].fillna(0).astype(int)
+    return df_cards
+
+
+def _to_ns(ts):
+    """Instante (datetime/Timestamp/ns; sem fuso = UTC) em ns desde a época."""
+    if isinstance(ts, (int, np.integer)):
+        return int(ts)
+    ts = pd.Timestamp(ts)
+    return (ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')).value
+
+
+def created_at_from_ids(ids):
+    """
+    Data de criação embutida no id do Trello (8 primeiros hex = timestamp Unix), em UTC.
+    Ids fora do formato (ou com datas implausíveis) viram NaT.
+    """
+    ids = pd.Series(ids, dtype=object).reset_index(drop=True)
+    prefixes = ids.str.slice(0, 8)
+    valid = prefixes.str.fullmatch(r'[0-9a-fA-F]{8}').fillna(False).to_numpy(dtype=bool)
+    seconds = np.full(len(ids), np.nan)
+    if valid.any():
+        seconds[valid] = np.frombuffer(bytes.fromhex("".join(prefixes[valid])), dtype='>u4')
+    created = pd.to_datetime(pd.Series(seconds), unit='s', utc=True)
+    # Trello existe desde 2011: antes disso (ou no futuro) o id não carrega a data
+    created[(created < pd.Timestamp("2011-01-01", tz="UTC")) | (created > pd.Timestamp.now(tz="UTC"))] = pd.NaT
+    return created
+
+
+def explode_ids(series):
+    """(ids, posições dos cards) de uma coluna de listas de ids (idMembers, idLabels), sem loop por linha."""
+    exploded = series.reset_index(drop=True).explode().dropna()
+    return exploded.to_numpy(dtype=object), exploded.index.to_numpy()
+
+
+def build_explorer_grid(df_cards, label_names, now):
+    """
+    Payload colunar da grid do Explorer: todas as colunas calculadas de forma vetorizada,
+    prontas para um único st.dataframe (sem elementos Streamlit por linha).
+    """
+    due = pd.to_datetime(df_cards['due'], utc=True, errors='coerce')
+    last_activity = pd.to_datetime(df_cards['dateLastActivity'], utc=True, errors='coerce')
+    done = df_cards['dueComplete'].fillna(False).astype(bool)
+
+    due_status = pd.Series("--", index=df_cards.index)
+    due_status[due.notna()] = "📅 No prazo"
+    due_status[due.notna() & (due - now < pd.Timedelta(hours=DUE_SOON_HOURS))] = "⏳ Vencendo"
+    due_status[due.notna() & (due < now)] = "🚨 Vencido"
+    due_status[due.notna() & done] = "✅ Concluído"
+
+    age_days = (now - last_activity).dt.days
+    age_icon = pd.Series("🔴", index=df_cards.index)
+    age_icon[age_days < 15] = "🟡"
+    age_icon[age_days < 5] = "🟢"
+
+    return pd.DataFrame({
+        "id": df_cards['id'],
+        "Card": df_cards['name'],
+        "Labels": df_cards['idLabels'].map(lambda ids: [label_names.get(i, "") for i in ids or []]),
+        "Lista": df_cards['list_name'],
+        "Status": due_status,
+        "Prazo": due.dt.tz_localize(None),
+        "Última Ativ.": last_activity.dt.tz_localize(None),
+        "Idade": age_icon + " " + age_days.fillna(0).astype(int).astype(str) + "d",
+        "Checklist": df_cards['checklist_progress'] * 100,
+    })
+
+
+class BoardSnapshot:
+    """
+    Snapshot imutável do board, construído uma vez por processo e compartilhado entre sessões.
+    As sessões não copiam nem alteram `cards`: guardam apenas máscaras (mask) e materializam
+    a fatia filtrada sob demanda (view), que é descartada ao fim do rerun.
+    """
+
+    def __init__(self, board_data, checklists=None):
+        self.board_data = board_data
+        self.board_name = board_data.get('name', '')
+        self.lists = {l['id']: l['name'] for l in board_data['lists']}
+        self.members = {m['id']: m['fullName'] for m in board_data['members']}
+        self.labels = {lbl['id']: lbl.get('name') or lbl.get('color', '') for lbl in board_data.get('labels', [])}
+
+        cards = build_cards_frame(board_data, checklists)
+        # Colunas derivadas calculadas uma única vez (antes cada sessão recalculava/mutava)
+        cards['due_date'] = pd.to_datetime(cards['due'], utc=True, errors='coerce')
+        cards['last_activity'] = pd.to_datetime(cards['dateLastActivity'], utc=True, errors='coerce')
+        cards['dueComplete'] = cards['dueComplete'].fillna(False).astype(bool)
+        cards['member_count'] = cards['idMembers'].map(len).astype('int32')
+        for col in ARROW_STRING_COLUMNS:
+            if col in cards.columns:
+                cards[col] = cards[col].astype("string[pyarrow]")
+        self.cards = cards
+
+        # Índice membro -> posições dos cards (evita apply por linha nos filtros)
+        self._member_ids, self._member_rows = explode_ids(cards['idMembers'])
+
+        # Dimensão de labels: tabela resolvida uma vez + bitmap (bits empacotados) por label
+        label_ids, label_rows = explode_ids(cards['idLabels'] if 'idLabels' in cards.columns else pd.Series([[]] * len(cards)))
+        self._label_bitmaps = {}
+        for label_id in pd.unique(label_ids):
+            bits = np.zeros(len(cards), dtype=bool)
+            bits[label_rows[label_ids == label_id]] = True
+            self._label_bitmaps[label_id] = np.packbits(bits)
+        self.label_table = pd.DataFrame([{
+            "id": label['id'],
+            "name": self.labels[label['id']],
+            "color": label.get('color'),
+            "cards": int(np.unpackbits(self._label_bitmaps[label['id']]).sum()) if label['id'] in self._label_bitmaps else 0,
+        } for label in board_data.get('labels', [])], columns=["id", "name", "color", "cards"])
+
+        # Índice de prazos ordenado: atrasados/vencendo/calendário viram buscas por faixa
+        self._build_due_index()
+
+    def _build_due_index(self):
+        """Prazos pendentes (com data e não concluídos) ordenados: ns UTC e posição do card."""
+        due = self.cards['due_date']
+        rows = np.flatnonzero((due.notna() & ~self.cards['dueComplete']).to_numpy(dtype=bool))
+        due_ns = due.iloc[rows].dt.tz_convert('UTC').dt.tz_localize(None).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        order = np.argsort(due_ns, kind='stable')
+        self._due_ns = due_ns[order]
+        self._due_rows = rows[order]
+
+    def _due_slice(self, start=None, end=None, mask=None):
+        """(ns, posições) dos prazos pendentes em [start, end) por busca binária (None = sem limite)."""
+        lo = 0 if start is None else np.searchsorted(self._due_ns, _to_ns(start), side='left')
+        hi = len(self._due_ns) if end is None else np.searchsorted(self._due_ns, _to_ns(end), side='left')
+        due_ns, rows = self._due_ns[lo:hi], self._due_rows[lo:hi]
+        if mask is not None:
+            keep = mask[rows]
+            due_ns, rows = due_ns[keep], rows[keep]
+        return due_ns, rows
+
+    def due_rows(self, start=None, end=None, mask=None):
+        """
+        Posições dos cards com prazo pendente em [start, end), ordenadas por prazo.
+        `mask` restringe aos cards filtrados; só a faixa consultada é percorrida.
+        """
+        return self._due_slice(start, end, mask)[1]
+
+    def overdue_rows(self, now, mask=None):
+        """Cards atrasados em `now`: a fronteira com "a vencer" é só a posição de `now` no índice."""
+        return self.due_rows(end=now, mask=mask)
+
+    def due_soon_rows(self, now, hours, mask=None):
+        """Cards que vencem nas próximas `hours` horas."""
+        return self.due_rows(now, pd.Timestamp(now) + pd.Timedelta(hours=hours), mask)
+
+    def due_calendar(self, start, days, mask=None):
+        """Prazos pendentes por dia UTC a partir do dia de `start`: DataFrame [date, count]."""
+        first_day = _to_ns(pd.Timestamp(_to_ns(start), tz='UTC').normalize())
+        due_ns, _ = self._due_slice(first_day, first_day + days * _DAY_NS, mask)
+        counts = np.bincount((due_ns - first_day) // _DAY_NS, minlength=days)
+        return pd.DataFrame({
+            'date': pd.date_range(pd.Timestamp(first_day, tz='UTC'), periods=days, freq='D'),
+            'count': counts,
+        })
+
+    def __len__(self):
+        return len(self.cards)
+
+    def label_bitmap(self, label_ids, mode="or"):
+        """
+        Bitmap empacotado (np.uint8) dos cards com as labels: 'or' = qualquer uma, 'and' = todas.
+        Labels sem cards contam como bitmap vazio.
+        """
+        empty = np.zeros((len(self.cards) + 7) // 8, dtype=np.uint8)
+        bitmaps = [self._label_bitmaps.get(label_id, empty) for label_id in label_ids]
+        if not bitmaps:
+            return empty
+        op = np.bitwise_and if mode == "and" else np.bitwise_or
+        return op.reduce(bitmaps)
+
+    def label_matrix(self, mask=None):
+        """(ids das labels, matriz booleana labels x cards da máscara) para agregados por label."""
+        label_ids = list(self._label_bitmaps)
+        if not label_ids:
+            return label_ids, np.zeros((0, int(mask.sum()) if mask is not None else len(self.cards)), dtype=bool)
+        matrix = np.unpackbits(np.vstack([self._label_bitmaps[i] for i in label_ids]), axis=1, count=len(self.cards)).astype(bool)
+        return label_ids, matrix if mask is None else matrix[:, mask]
+
+    def mask(self, list_names=None, member_ids=None, label_ids=None, label_mode="or"):
+        """
+        Máscara booleana (numpy) dos cards que passam nos filtros de lista, membro e label
+        (labels combinadas por OR ou AND sobre os bitmaps).
+        """
+        mask = np.ones(len(self.cards), dtype=bool)
+        if list_names:
+            mask &= self.cards['list_name'].isin(list(list_names)).to_numpy(dtype=bool, na_value=False)
+        if member_ids:
+            member_mask = np.zeros(len(self.cards), dtype=bool)
+            member_mask[self._member_rows[np.isin(self._member_ids, list(member_ids))]] = True
+            mask &= member_mask
+        if label_ids:
+            mask &= np.unpackbits(self.label_bitmap(label_ids, label_mode), count=len(self.cards)).astype(bool)
+        return mask
+
+    def view(self, mask=None):
+        """Fatia dos cards para a máscara (todos se None). Nunca altera o snapshot."""
+        if mask is None:
+            return self.cards
+        return self.cards[mask]
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from src.data import _to_ns
+from src.metrics import done_list_ids
+
+# Itens detalhados por categoria no painel (as contagens são sempre completas)
+DELTA_MAX_ITEMS = 20
+
+DELTA_KINDS = ["moved", "completed", "assigned", "newly_overdue"]
+
+
+class ActionIndex:
+    """
+    Ações do board ordenadas por data (ns UTC) em arrays paralelos, montado uma vez por
+    carga de ações. "O que aconteceu entre A e B" vira uma busca binária e uma fatia:
+    o custo depende só do número de ações na faixa, não do tamanho do board.
+    """
+
+    def __init__(self, actions):
+        actions = actions or []
+        dates = pd.to_datetime(pd.Series([a['date'] for a in actions], dtype=object), utc=True, errors='coerce')
+        ns = dates.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        order = np.argsort(ns, kind='stable')
+        self.dates = ns[order]
+        self._actions = [actions[i] for i in order]
+
+    def __len__(self):
+        return len(self._actions)
+
+    @property
+    def oldest(self):
+        """Data (ns) da ação mais antiga do índice, ou None se vazio."""
+        return int(self.dates[0]) if len(self.dates) else None
+
+    @property
+    def version(self):
+        """Versão do snapshot de ações: data (ns) da ação mais recente (0 se vazio)."""
+        return int(self.dates[-1]) if len(self.dates) else 0
+
+    def between(self, start, end=None):
+        """Ações com data em (start, end], mais recentes primeiro."""
+        lo = np.searchsorted(self.dates, _to_ns(start), side='right')
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, _to_ns(end), side='right')
+        return self._actions[lo:hi][::-1]
+
+
+def _item(card, date, detail):
+    return {"card_id": card.get('id'), "name": card.get('name', ''), "date": date, "detail": detail}
+
+
+def compute_delta(index, snapshot, visit, now):
+    """
+    O que mudou no board desde a última visita (`visit` = {"seen_at", "version"} do VisitStore):
+    cards movidos, concluídos e atribuídos (ações do índice mais novas que a versão vista) e que
+    passaram a atrasar (faixa [seen_at, now) do índice de prazos do snapshot).
+    Cada card conta uma vez por categoria, pela ação mais recente.
+    Retorna {"counts", "items", "since", "partial"}; `partial` indica que a visita é mais antiga
+    que o histórico de ações carregado (contagens de ações incompletas).
+    """
+    seen_at = _to_ns(visit["seen_at"])
+    done_ids = set(done_list_ids(snapshot.lists))
+    seen = {kind: set() for kind in DELTA_KINDS}
+    items = {kind: [] for kind in DELTA_KINDS}
+
+    def add(kind, card, date, detail):
+        if card.get('id') in seen[kind]:
+            return
+        seen[kind].add(card.get('id'))
+        items[kind].append(_item(card, date, detail))
+
+    for action in index.between(visit["version"]):
+        data = action.get('data', {})
+        card = data.get('card', {})
+        if action['type'] == 'updateCard' and 'listAfter' in data:
+            after = data['listAfter']
+            kind = "completed" if after.get('id') in done_ids else "moved"
+            add(kind, card, action['date'], f"{data.get('listBefore', {}).get('name', '?')} → {after.get('name', '?')}")
+        elif action['type'] == 'addMemberToCard':
+            member = data.get('member', {})
+            add("assigned", card, action['date'], member.get('name') or snapshot.members.get(data.get('idMember'), '?'))
+
+    # Prazos que venceram no intervalo e seguem pendentes: só as linhas da faixa são lidas
+    rows = snapshot.due_rows(seen_at, now)
+    overdue = snapshot.cards.iloc[rows[::-1][:DELTA_MAX_ITEMS]]
+    items["newly_overdue"] = [
+        {"card_id": r.id, "name": r.name, "date": r.due_date.isoformat(), "detail": r.list_name}
+        for r in overdue[['id', 'name', 'due_date', 'list_name']].itertuples(index=False)
+    ]
+
+    counts = {kind: len(seen[kind]) for kind in DELTA_KINDS}
+    counts["newly_overdue"] = len(rows)
+    return {
+        "counts": counts,
+        "items": {kind: kind_items[:DELTA_MAX_ITEMS] for kind, kind_items in items.items()},
+        "since": pd.Timestamp(seen_at, tz='UTC'),
+        "partial": index.oldest is not None and visit["version"] < index.oldest,
+    }
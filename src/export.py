@@ -0,0 +1,127 @@
+import os
+import re
+import secrets
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from src.data import build_explorer_grid
+
+# Exports são gravados em static/ e baixados via /app/static (sem passar pela memória da sessão).
+# O static não passa pela autenticação do app: o nome leva um token aleatório (não adivinhável)
+# e os arquivos expiram
+EXPORTS_DIR = os.path.join("static", "exports")
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+# Arquivos mais antigos que isso são removidos a cada novo export
+EXPORT_TTL_SECONDS = int(os.getenv("EXPORT_TTL_SECONDS", "3600"))
+EXPORT_FORMATS = ("parquet", "csv")
+
+EXPORT_COLUMNS = [
+    "id", "Card", "Lista", "Responsáveis", "Labels", "Status",
+    "Prazo", "Última Ativ.", "Idade (dias)", "Checklist (%)", "URL",
+]
+
+
+def _export_chunk(chunk, label_names, member_names, now):
+    """Colunas do export para uma fatia de cards (mesmo cálculo da grid do Explorer)."""
+    grid = build_explorer_grid(chunk, label_names, now)
+    last_activity = pd.to_datetime(chunk['dateLastActivity'], utc=True, errors='coerce')
+    return pd.DataFrame({
+        "id": grid['id'].astype("string"),
+        "Card": grid['Card'].astype("string"),
+        "Lista": grid['Lista'].astype("string"),
+        "Responsáveis": chunk['idMembers'].map(
+            lambda ids: ", ".join(member_names.get(i, "") for i in ids or [])).astype("string"),
+        "Labels": grid['Labels'].map(", ".join).astype("string"),
+        "Status": grid['Status'].astype("string"),
+        "Prazo": grid['Prazo'].astype("datetime64[ns]"),
+        "Última Ativ.": grid['Última Ativ.'].astype("datetime64[ns]"),
+        "Idade (dias)": (now - last_activity).dt.days.astype("Int64"),
+        "Checklist (%)": grid['Checklist'].astype("float64"),
+        "URL": chunk['url'].astype("string"),
+    }, columns=EXPORT_COLUMNS)
+
+
+def iter_export_chunks(df_cards, label_names, member_names, now=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Gera o export em fatias de chunk_rows cards: só uma fatia derivada vive em memória por vez."""
+    now = now or datetime.now(timezone.utc)
+    for start in range(0, len(df_cards), chunk_rows):
+        yield _export_chunk(df_cards.iloc[start:start + chunk_rows], label_names, member_names, now)
+
+
+def _write_parquet(chunks, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return writer is not None
+
+
+def _write_csv(chunks, path):
+    wrote = False
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        for chunk in chunks:
+            chunk.to_csv(f, index=False, header=not wrote, date_format="%Y-%m-%d %H:%M")
+            wrote = True
+    return wrote
+
+
+def cleanup_exports(max_age=EXPORT_TTL_SECONDS, exports_dir=EXPORTS_DIR):
+    """Remove exports expirados."""
+    if not os.path.isdir(exports_dir):
+        return
+    limit = time.time() - max_age
+    for name in os.listdir(exports_dir):
+        path = os.path.join(exports_dir, name)
+        try:
+            if os.path.getmtime(path) < limit:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def export_cards(df_cards, fmt, label_names, member_names, board_name="board", exports_dir=EXPORTS_DIR,
+                 chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Grava os cards filtrados em Parquet ou CSV, em fatias e direto no disco (memória constante).
+    Retorna o caminho do arquivo gerado.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de export inválido: {fmt}")
+
+    cleanup_exports(exports_dir=exports_dir)
+    os.makedirs(exports_dir, exist_ok=True)
+    slug = re.sub(r"[^a-z0-9]+", "-", board_name.lower()).strip("-") or "board"
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(exports_dir, f"cards-{slug}-{stamp}-{secrets.token_urlsafe(16)}.{fmt}")
+
+    chunks = iter_export_chunks(df_cards, label_names, member_names, chunk_rows=chunk_rows)
+    if len(df_cards) == 0:
+        chunks = iter([_export_chunk(df_cards, label_names, member_names, datetime.now(timezone.utc))])
+
+    tmp_path = f"{path}.tmp"
+    writer = _write_parquet if fmt == "parquet" else _write_csv
+    try:
+        writer(chunks, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def export_url(path):
+    """URL servida pelo Streamlit (server.enableStaticServing) para um arquivo em static/."""
+    return "app/" + os.path.relpath(path).replace(os.sep, "/")
@@ -0,0 +1,322 @@
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import requests
+
+FAKE_TRELLO_PORT = int(os.getenv("FAKE_TRELLO_PORT", "8765"))
+# Parâmetros que nunca vão para as fixtures gravadas
+AUTH_PARAMS = ("key", "token")
+ME = {"id": "fake-member", "fullName": "Usuário Fake", "username": "fake"}
+
+
+def _fixture_path(fixtures_dir, resource):
+    # boards/<id>/actions -> <dir>/boards/<id>/actions.json
+    safe = re.sub(r"[^A-Za-z0-9_/-]", "_", resource.strip("/"))
+    return os.path.join(fixtures_dir, f"{safe}.json")
+
+
+def _action_matches(action, filters):
+    """'updateCard:idList' casa só com updateCard que alterou idList (campo em data.old), como na API."""
+    for action_type, _, field in filters:
+        if action.get("type") == action_type and (not field or field in action.get("data", {}).get("old", {})):
+            return True
+    return False
+
+
+def _apply_action_query(actions, query):
+    """Aplica filter/since/before/limit como a API faz para listas de ações."""
+    if query.get("filter") and query["filter"] != "all":
+        filters = [f.partition(":") for f in query["filter"].split(",")]
+        actions = [a for a in actions if _action_matches(a, filters)]
+    if query.get("since"):
+        actions = [a for a in actions if a.get("date", "") > query["since"]]
+    if query.get("before"):
+        actions = [a for a in actions if a.get("date", "") < query["before"]]
+    limit = int(query.get("limit", 50))
+    return actions[:limit]
+
+
+def _record_query(parts, query):
+    """
+    Query enviada à API real no modo record. Listas de ações e de cards arquivados são gravadas
+    sem filtro nem paginação (até 1000 itens, o máximo da API): a fixture tem um nome só por
+    recurso e o replay aplica filter/since/before/limit localmente.
+    """
+    if parts[-1] == "actions":
+        query = {k: v for k, v in query.items() if k not in ("filter", "since", "before", "limit")}
+        return {**query, "filter": "all", "limit": 1000}
+    if parts[-2:] == ["cards", "closed"]:
+        query = {k: v for k, v in query.items() if k not in ("since", "before", "limit")}
+        return {**query, "limit": 1000}
+    return query
+
+
+def _apply_card_query(cards, query):
+    """Paginação de listas de cards por id (before/since/limit), ids mais novos primeiro."""
+    if query.get("before"):
+        cards = [c for c in cards if c["id"] < query["before"]]
+    if query.get("since"):
+        cards = [c for c in cards if c["id"] > query["since"]]
+    return cards[:int(query.get("limit", 1000))]
+
+
+class FakeTrello:
+    """
+    Stand-in local da API do Trello para testes de carga.
+    Fontes: board sintético (src.synth), fixtures gravadas em disco (replay) ou gravação
+    a partir da API real (record). Injeta latência, erros 500 e 429 com taxas configuráveis.
+    """
+
+    def __init__(self, synthetic=None, fixtures_dir=None, upstream=None, latency_ms=0, jitter_ms=0,
+                 error_rate=0.0, rate_limit_rate=0.0, seed=None, closed=None):
+        self.fixtures_dir = fixtures_dir
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = Counter()
+        self.routes = Counter()
+
+        self._board = self._actions = None
+        self._closed_cards = []
+        self._checklists_by_card = defaultdict(list)
+        self._actions_by_card = defaultdict(list)
+        if synthetic:
+            board_data, actions, checklists = synthetic
+            if closed:
+                # Cards arquivados (src.synth.generate_closed_cards) + ações de arquivamento
+                self._closed_cards = list(closed[0])
+                actions = sorted(actions + closed[1], key=lambda a: a["date"], reverse=True)
+            self._board, self._actions, self._checklists = board_data, actions, checklists
+            for ck in checklists:
+                self._checklists_by_card[ck["idCard"]].append(ck)
+            for action in actions:
+                card_id = action.get("data", {}).get("card", {}).get("id")
+                if card_id:
+                    self._actions_by_card[card_id].append(action)
+
+    # --- fontes de dados ---
+
+    def _synthetic(self, parts):
+        if self._board is None:
+            return None
+        if parts[0] == "boards" and len(parts) == 2:
+            return self._board
+        if parts[0] == "boards" and parts[2:] == ["actions"]:
+            return self._actions
+        if parts[0] == "boards" and parts[2:] == ["checklists"]:
+            return self._checklists
+        if parts[0] == "boards" and parts[2:] == ["cards", "closed"]:
+            return self._closed_cards
+        if parts[0] == "cards" and len(parts) == 2:
+            return next((c for c in self._board["cards"] + self._closed_cards if c["id"] == parts[1]), None)
+        if parts[0] == "cards" and parts[2:] == ["checklists"]:
+            return self._checklists_by_card.get(parts[1], [])
+        if parts[0] == "cards" and parts[2:] == ["actions"]:
+            return self._actions_by_card.get(parts[1], [])
+        if parts[0] == "cards" and parts[2:] == ["attachments"]:
+            return []
+        return None
+
+    def _replay(self, resource):
+        if not self.fixtures_dir:
+            return None
+        path = _fixture_path(self.fixtures_dir, resource)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _record(self, resource, query):
+        """Busca na API real e grava a resposta (sem credenciais) para replay."""
+        parts = [p for p in resource.strip("/").split("/") if p]
+        params = {**_record_query(parts, query), "key": os.getenv("TRELLO_API_KEY"), "token": os.getenv("TRELLO_TOKEN")}
+        response = requests.get(f"{self.upstream}/{resource.strip('/')}", params=params, timeout=30)
+        if response.status_code != 200:
+            return None
+        payload = response.json()
+        if self.fixtures_dir:
+            path = _fixture_path(self.fixtures_dir, resource)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+        return payload
+
+    def resolve(self, resource, query):
+        """(status, payload) de um recurso, ex.: 'boards/<id>/actions'."""
+        parts = [p for p in resource.strip("/").split("/") if p]
+        if parts == ["members", "me"]:
+            return 200, ME
+        if len(parts) < 2:
+            return 404, {"message": "not found"}
+
+        payload = self._synthetic(parts)
+        if payload is None:
+            payload = self._replay(resource)
+        if payload is None and self.upstream:
+            payload = self._record(resource, query)
+        if payload is None:
+            return 404, {"message": f"fixture ausente: {resource}"}
+
+        if parts[-1] == "actions":
+            payload = _apply_action_query(payload, query)
+        elif parts[-2:] == ["cards", "closed"]:
+            payload = _apply_card_query(payload, query)
+        return 200, payload
+
+    def close_card(self, card_id, date):
+        """Arquiva um card do board sintético (simula uso real para testar a ingestão incremental)."""
+        with self._lock:
+            card = next(c for c in self._board["cards"] if c["id"] == card_id)
+            self._board["cards"].remove(card)
+            card = {**card, "closed": True, "dateLastActivity": date}
+            self._closed_cards = sorted(self._closed_cards + [card], key=lambda c: c["id"], reverse=True)
+            self._actions.insert(0, {
+                "id": f"{int(time.time()):08x}{self._rng.getrandbits(64):016x}",
+                "type": "updateCard", "date": date,
+                "data": {"card": {"id": card_id, "name": card["name"], "closed": True}, "old": {"closed": False}},
+            })
+
+    def batch(self, urls):
+        """Resposta de /batch: um item por URL, {"200": payload} ou objeto de erro."""
+        results = []
+        for url in urls:
+            split = urlsplit(url)
+            query = {k: v[-1] for k, v in parse_qs(split.query).items()}
+            status, payload = self.resolve(split.path, query)
+            if status == 200:
+                results.append({"200": payload})
+            else:
+                results.append({"name": "NotFound", "message": payload.get("message"), "statusCode": status})
+        return results
+
+    # --- injeção de falhas ---
+
+    def fault(self):
+        """Latência simulada e, conforme as taxas, um status de falha (429/500) ou None."""
+        delay = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+    def count(self, route, status):
+        with self._lock:
+            self.routes[route] += 1
+            self.stats[str(status)] += 1
+            self.stats["total"] += 1
+
+    def snapshot_stats(self):
+        with self._lock:
+            return {"status": dict(self.stats), "routes": dict(self.routes)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    app = None  # FakeTrello, definido por make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        split = urlsplit(self.path)
+        if split.path == "/_stats":
+            return self._send(200, self.app.snapshot_stats())
+
+        resource = split.path[2:] if split.path.startswith("/1/") else split.path
+        query = {k: v[-1] for k, v in parse_qs(split.query).items() if k not in AUTH_PARAMS}
+        # Rota normalizada (sem IDs) para as estatísticas
+        route = re.sub(r"/[0-9a-zA-Z_-]{8,}", "/{id}", "/" + resource.strip("/"))
+
+        failure = self.app.fault()
+        if failure == 429:
+            self.app.count(route, 429)
+            return self._send(429, {"message": "API token limit exceeded"}, {"Retry-After": "1"})
+        if failure:
+            self.app.count(route, failure)
+            return self._send(failure, {"message": "Internal server error"})
+
+        if resource.strip("/") == "batch":
+            urls = [u for u in query.get("urls", "").split(",") if u]
+            status, payload = 200, self.app.batch(urls)
+        else:
+            status, payload = self.app.resolve(resource, query)
+        self.app.count(route, status)
+        self._send(status, payload)
+
+
+def make_server(app, host="127.0.0.1", port=FAKE_TRELLO_PORT):
+    """Servidor HTTP (uma thread por conexão) servindo o FakeTrello."""
+    handler = type("FakeTrelloHandler", (_Handler,), {"app": app})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    # Uso: python -m src.fake_trello --cards 10000 --latency-ms 80 --rate-limit-rate 0.02
+    #      export TRELLO_BASE_URL=http://127.0.0.1:8765/1
+    parser = argparse.ArgumentParser(description="API fake do Trello com replay de fixtures e injeção de falhas.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=FAKE_TRELLO_PORT)
+    parser.add_argument("--cards", type=int, default=0, help="Gera um board sintético com N cards")
+    parser.add_argument("--actions", type=int, default=None, help="Ações do board sintético (default: 2x cards)")
+    parser.add_argument("--closed", type=int, default=0, help="Cards arquivados no board sintético")
+    parser.add_argument("--fixtures", default=None, help="Diretório de fixtures gravadas (replay/record)")
+    parser.add_argument("--record", action="store_true", help="Busca na API real o que faltar e grava em --fixtures")
+    parser.add_argument("--upstream", default="https://api.trello.com/1", help="API real usada no modo --record")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latência média por requisição")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Variação (+/-) da latência")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fração de respostas 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0, help="Fração de respostas 429")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    synthetic = closed = None
+    if args.cards:
+        from src.synth import generate_board, generate_closed_cards
+        synthetic = generate_board(args.cards, args.actions, seed=args.seed)
+        if args.closed:
+            closed = generate_closed_cards(synthetic[0], args.closed, seed=args.seed)
+    if not synthetic and not args.fixtures:
+        parser.error("informe --cards (sintético) ou --fixtures (replay/record)")
+
+    app = FakeTrello(
+        synthetic=synthetic, fixtures_dir=args.fixtures, upstream=args.upstream if args.record else None,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, seed=args.seed, closed=closed,
+    )
+    server = make_server(app, args.host, args.port)
+    print(f"Fake Trello em http://{args.host}:{args.port}/1 — export TRELLO_BASE_URL=http://{args.host}:{args.port}/1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
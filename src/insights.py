@@ -1,170 +1,536 @@
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
+import hashlib
+import os
+import re
+import threading
+import time
+import numpy as np
 import pandas as pd
+from src.data import explode_ids, DUE_SOON_HOURS
 
-def generate_insights(df_cards, df_actions, list_names_map):
+# Orçamento padrão de latência por regra (ms). Regras que estouram o orçamento
+# são adiadas na execução seguinte para não travar o rerun do dashboard.
+RULE_BUDGET_MS = float(os.getenv("INSIGHTS_RULE_BUDGET_MS", "250"))
+
+# Dias sem atividade para um checklist parcialmente concluído ser considerado parado
+STALLED_CHECKLIST_DAYS = int(os.getenv("INSIGHTS_STALLED_CHECKLIST_DAYS", "7"))
+
+# Label com atrasos concentrados: mínimo de cards atrasados e taxa mínima (também >= 2x a dos demais cards)
+LABEL_OVERDUE_MIN_CARDS = 3
+LABEL_OVERDUE_MIN_RATE = 0.25
+
+# Classificação das listas do board pelo nome: critério único (sem diferenciar maiúsculas)
+# para todas as regras. Antes cada regra tinha o seu: as de atraso/sem dono não excluíam listas
+# "Concluded" e a de velocidade diferenciava maiúsculas; agora todas usam os padrões abaixo
+DONE_LISTS_PATTERN = re.compile(r'Done|Concluído|Concluded', re.IGNORECASE)
+INACTIVE_LISTS_PATTERN = re.compile(r'Backlog|Arquivado|Model', re.IGNORECASE)
+
+# Registro de regras (ordem de registro = ordem de exibição)
+INSIGHT_RULES = []
+
+# Estatísticas de custo por regra, compartilhadas no processo
+_RULE_STATS = {}
+
+# Resultados memoizados por (regra, fingerprint das entradas)
+RESULT_CACHE_SIZE = int(os.getenv("INSIGHTS_CACHE_SIZE", "256"))
+_RESULT_CACHE = OrderedDict()
+# O motor roda também em threads (alertas, portfólio): acesso ao memo é serializado
+_CACHE_LOCK = threading.Lock()
+
+
+def insight_rule(name, inputs, columns=(), clock=None, severity="info", budget_ms=None):
     """
-    Gera insights determinísticos baseados nos dados do board.
-    Retorna uma lista de dicionários com: type, severity, title, metric, description, recommendation.
+    Registra uma regra de insight no motor.
+    - name: identificador único da regra
+    - inputs: dados que a regra consome ("cards", "actions", "list_roles", "history")
+    - columns: colunas de cards lidas pela regra (definem o fingerprint de "cards")
+    - clock: granularidade do relógio que afeta o resultado ("minute", "day", "week" ou None)
+    - severity: severidade padrão quando a regra não define uma própria
+    - budget_ms: orçamento de latência (default: RULE_BUDGET_MS)
+    A função decorada recebe o contexto e retorna um insight, uma lista de insights ou None.
     """
-    insights = []
-    
-    if df_cards.empty:
-        return insights
+    def decorator(fn):
+        INSIGHT_RULES.append({
+            "name": name,
+            "fn": fn,
+            "inputs": tuple(inputs),
+            "columns": tuple(columns),
+            "clock": clock,
+            "severity": severity,
+            "budget_ms": budget_ms,
+        })
+        return fn
+    return decorator
 
-    # Helper: Garantir datas UTC
-    now = datetime.now(timezone.utc)
-    if 'due_date' not in df_cards.columns:
-         df_cards['due_date'] = pd.to_datetime(df_cards['due'], utc=True, errors='coerce')
-    
-    # ---------------------------------------------------------
-    # 1. RISCO (Critical): Cards Vencidos
-    # ---------------------------------------------------------
+
+def build_list_roles(list_names_map):
+    """Mapeia id da lista -> papel no fluxo: 'done', 'inactive' ou 'active'."""
+    roles = {}
+    for lid, name in list_names_map.items():
+        if DONE_LISTS_PATTERN.search(name or ''):
+            roles[lid] = "done"
+        elif INACTIVE_LISTS_PATTERN.search(name or ''):
+            roles[lid] = "inactive"
+        else:
+            roles[lid] = "active"
+    return roles
+
+
+def _active_cards(ctx):
+    """Cards em listas ativas (nem concluídas, nem backlog/arquivo)."""
+    roles = ctx["cards"]['idList'].map(ctx["list_roles"]).fillna("active")
+    return ctx["cards"][roles == "active"]
+
+
+# ---------------------------------------------------------
+# 1. RISCO (Critical): Cards Vencidos
+# ---------------------------------------------------------
+@insight_rule("prazos_expirados", inputs=("cards",), columns=("name", "list_name", "due_date", "dueComplete"),
+              clock="minute", severity="critical")
+def _rule_overdue(ctx):
+    df_cards = ctx["cards"]
     overdue_df = df_cards[
-        (df_cards['due_date'] < now) & 
-        (~df_cards['dueComplete']) & 
+        (df_cards['due_date'] < ctx["now"]) &
+        (~df_cards['dueComplete']) &
         (df_cards['due_date'].notna())
     ]
     overdue_count = len(overdue_df)
-    
+
     if overdue_count > 0:
-        insight = {
+        return {
             "type": "risk",
-            "severity": "critical",  # critical, attention, info
             "title": "Prazos Expirados",
             "metric": f"{overdue_count} cards",
             "description": f"Existem {overdue_count} atividades com data de entrega passada que ainda não foram concluídas.",
             "recommendation": "Priorizar imediatamente ou renegociar prazos para evitar gargalos em cascata.",
             "details": overdue_df[['name', 'list_name', 'due_date']].to_dict('records')
         }
-        insights.append(insight)
-
-    # ---------------------------------------------------------
-    # 2. GESTÃO (Attention): Cards Sem Dono (Unassigned)
-    # ---------------------------------------------------------
-    # Filtra apenas listas que não são de "Done" ou "Backlog" para ser mais relevante
-    active_lists_df = df_cards[
-        ~df_cards['list_name'].str.contains('Done|Concluído|Backlog|Arquivado|Model', case=False, na=False)
-    ]
-    
+
+
+# ---------------------------------------------------------
+# 2. GESTÃO (Attention): Cards Sem Dono (Unassigned)
+# ---------------------------------------------------------
+@insight_rule("atividades_orfas", inputs=("cards", "list_roles"), columns=("name", "idList", "list_name", "idMembers"),
+              severity="attention")
+def _rule_unassigned(ctx):
+    # Considera apenas listas ativas para ser mais relevante
+    active_lists_df = _active_cards(ctx)
     unassigned_df = active_lists_df[active_lists_df['idMembers'].apply(len) == 0]
     unassigned_count = len(unassigned_df)
-    
+
     if unassigned_count > 0:
-        insight = {
+        return {
             "type": "management",
-            "severity": "attention",
             "title": "Atividades Órfãs",
             "metric": f"{unassigned_count} cards",
             "description": "Existem atividades em progresso sem nenhum responsável atribuído.",
             "recommendation": "Atribuir membros responsáveis para garantir accountability e execução.",
             "details": unassigned_df[['name', 'list_name']].to_dict('records')
         }
-        insights.append(insight)
-
-    # ---------------------------------------------------------
-    # 3. GARGALO (Warning): Lista com Acúmulo Anormal
-    # ---------------------------------------------------------
-    # Conta cards por lista (apenas ativas e que não sejam de conclusão)
-    bottleneck_lists_df = active_lists_df[
-        ~active_lists_df['list_name'].str.contains('Done|Concluído|Concluded', case=False, na=False)
-    ]
-    
-    if not bottleneck_lists_df.empty:
-        list_counts = bottleneck_lists_df['list_name'].value_counts()
-        if not list_counts.empty:
-            max_list = list_counts.idxmax()
-            max_count = list_counts.max()
-            avg_count = list_counts.mean()
-            
-            # Se a maior lista tiver 50% mais cards que a média (e tiver pelo menos 3 cards)
-            if max_count > 2 and max_count > (avg_count * 1.5):
-                insight = {
-                    "type": "bottleneck",
-                    "severity": "attention",
-                    "title": f"Gargalo em '{max_list}'",
-                    "metric": f"{max_count} cards",
-                    "description": f"A etapa '{max_list}' concentra um volume desproporcional de atividades ({int(max_count/active_lists_df.shape[0]*100)}% do WIP).",
-                    "recommendation": "Verificar impedimentos nesta etapa ou redistribuir força de trabalho.",
-                    "details": [] 
-                }
-                insights.append(insight)
-
-    # ---------------------------------------------------------
-    # 4. PERFORMANCE (Info): Tendência de Throughput
-    # ---------------------------------------------------------
-    # Analisa ações de conclusão nas últimas 2 semanas
-    if df_actions:
-        # Filtrar ações de conclusão (mover para done)
-        done_list_ids = [lid for lid, name in list_names_map.items() 
-                         if 'Done' in name or 'Concluído' in name]
-        
-        dates = []
-        for action in df_actions:
-            if (action['type'] == 'updateCard' and 
-                action['data'].get('listAfter', {}).get('id') in done_list_ids):
-                dates.append(pd.to_datetime(action['date']))
-        
-        if dates:
-            df_dates = pd.DataFrame({'date': dates})
-            df_dates['date'] = pd.to_datetime(df_dates['date'], utc=True)
-            
-            # Definir semana atual e anterior
-            this_week_start = now - timedelta(days=now.weekday())
-            last_week_start = this_week_start - timedelta(days=7)
-            
-            count_this_week = len(df_dates[df_dates['date'] >= this_week_start])
-            count_last_week = len(df_dates[
-                (df_dates['date'] >= last_week_start) & 
-                (df_dates['date'] < this_week_start)
-            ])
-            
-            trend = "Estável"
+
+
+# ---------------------------------------------------------
+# 3. GARGALO (Warning): Lista com Acúmulo Anormal
+# ---------------------------------------------------------
+@insight_rule("gargalo", inputs=("cards", "list_roles"), columns=("idList", "list_name"), severity="attention")
+def _rule_bottleneck(ctx):
+    active_lists_df = _active_cards(ctx)
+    if active_lists_df.empty:
+        return None
+
+    list_counts = active_lists_df['list_name'].value_counts()
+    if list_counts.empty:
+        return None
+
+    max_list = list_counts.idxmax()
+    max_count = list_counts.max()
+    avg_count = list_counts.mean()
+
+    # Se a maior lista tiver 50% mais cards que a média (e tiver pelo menos 3 cards)
+    if max_count > 2 and max_count > (avg_count * 1.5):
+        return {
+            "type": "bottleneck",
+            "title": f"Gargalo em '{max_list}'",
+            "metric": f"{max_count} cards",
+            "description": f"A etapa '{max_list}' concentra um volume desproporcional de atividades ({int(max_count/active_lists_df.shape[0]*100)}% do WIP).",
+            "recommendation": "Verificar impedimentos nesta etapa ou redistribuir força de trabalho.",
+            "details": []
+        }
+
+
+# ---------------------------------------------------------
+# 4. PERFORMANCE (Info): Tendência de Throughput
+# ---------------------------------------------------------
+@insight_rule("throughput", inputs=("actions", "list_roles"), clock="week", severity="info")
+def _rule_throughput(ctx):
+    # Analisa ações de conclusão (mover para done) nas últimas 2 semanas
+    if not ctx["actions"]:
+        return None
+
+    done_list_ids = {lid for lid, role in ctx["list_roles"].items() if role == "done"}
+
+    dates = []
+    for action in ctx["actions"]:
+        if (action['type'] == 'updateCard' and
+            action['data'].get('listAfter', {}).get('id') in done_list_ids):
+            dates.append(action['date'])
+
+    if not dates:
+        return None
+
+    df_dates = pd.DataFrame({'date': pd.to_datetime(dates, utc=True)})
+    now = ctx["now"]
+
+    # Definir semana atual (a partir de segunda 00:00 UTC) e anterior
+    this_week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    last_week_start = this_week_start - timedelta(days=7)
+
+    count_this_week = len(df_dates[df_dates['date'] >= this_week_start])
+    count_last_week = len(df_dates[
+        (df_dates['date'] >= last_week_start) &
+        (df_dates['date'] < this_week_start)
+    ])
+
+    # Só gera insight de tendência se tiver dados comparáveis
+    if count_last_week > 0:
+        delta = count_this_week - count_last_week
+        pct_change = (delta / count_last_week) * 100
+
+        if pct_change >= 20:
+            trend = "Alta Produtividade"
+            desc = f"O time entregou {int(pct_change)}% mais cards que na semana passada."
+            rec = "Investigar o que funcionou bem e replicar as boas práticas."
+            severity = "success"  # Special case for color
+        elif pct_change <= -20:
+            trend = "Queda de Ritmo"
+            desc = f"Redução de {abs(int(pct_change))}% nas entregas comparado à semana anterior."
+            rec = "Checar se houve bloqueios externos ou redução de capacidade da equipe."
+            severity = "attention"
+        else:
+            trend = "Ritmo Estável"
+            desc = "A produtividade se mantém consistente com a média recente."
+            rec = "Manter o ritmo e monitorar qualidade das entregas."
             severity = "info"
-            
-            # Só gera insight se tiver dados comparáveis
-            if count_last_week > 0:
-                delta = count_this_week - count_last_week
-                pct_change = (delta / count_last_week) * 100
-                
-                if pct_change >= 20:
-                    trend = "Alta Produtividade"
-                    desc = f"O time entregou {int(pct_change)}% mais cards que na semana passada."
-                    rec = "Investigar o que funcionou bem e replicar as boas práticas."
-                    severity = "success" # Special case for color
-                    icon = "🚀"
-                elif pct_change <= -20:
-                    trend = "Queda de Ritmo"
-                    desc = f"Redução de {abs(int(pct_change))}% nas entregas comparado à semana anterior."
-                    rec = "Checar se houve bloqueios externos ou redução de capacidade da equipe."
-                    severity = "attention"
-                    icon = "📉"
-                else:
-                    trend = "Ritmo Estável"
-                    desc = "A produtividade se mantém consistente com a média recente."
-                    rec = "Manter o ritmo e monitorar qualidade das entregas."
-                    icon = "📊"
-                
-                insight = {
-                    "type": "performance",
-                    "severity": severity,
-                    "title": trend,
-                    "metric": f"{count_this_week} entregas",
-                    "description": desc,
-                    "recommendation": rec,
-                    "details": []
-                }
-                insights.append(insight)
-            elif count_this_week > 0:
-                 # Primeira semana com dados
-                 insight = {
-                    "type": "performance",
-                    "severity": "info",
-                    "title": "Ritmo Inicial",
-                    "metric": f"{count_this_week} entregas",
-                    "description": "Primeiros registros de conclusão contabilizados nesta semana.",
-                    "recommendation": "Continuar registrando para gerar histórico de tendências.",
-                    "details": []
-                }
-                 insights.append(insight)
+
+        return {
+            "type": "performance",
+            "severity": severity,
+            "title": trend,
+            "metric": f"{count_this_week} entregas",
+            "description": desc,
+            "recommendation": rec,
+            "details": []
+        }
+
+    if count_this_week > 0:
+        # Primeira semana com dados
+        return {
+            "type": "performance",
+            "severity": "info",
+            "title": "Ritmo Inicial",
+            "metric": f"{count_this_week} entregas",
+            "description": "Primeiros registros de conclusão contabilizados nesta semana.",
+            "recommendation": "Continuar registrando para gerar histórico de tendências.",
+            "details": []
+        }
+
+
+# ---------------------------------------------------------
+# 5. EXECUÇÃO (Attention): Checklists Parados em Progresso Parcial
+# ---------------------------------------------------------
+@insight_rule("checklists_parados", inputs=("cards", "list_roles"),
+              columns=("name", "idList", "list_name", "checklist_progress", "dateLastActivity"),
+              clock="day", severity="attention")
+def _rule_stalled_checklists(ctx):
+    if 'checklist_progress' not in ctx["cards"].columns:
+        return None
+
+    active_lists_df = _active_cards(ctx)
+    progress = active_lists_df['checklist_progress']
+    last_activity = pd.to_datetime(active_lists_df['dateLastActivity'], utc=True, errors='coerce')
+    stalled_df = active_lists_df[
+        (progress > 0) & (progress < 1) &
+        (last_activity < ctx["now"] - timedelta(days=STALLED_CHECKLIST_DAYS))
+    ]
+    stalled_count = len(stalled_df)
+
+    if stalled_count > 0:
+        return {
+            "type": "execution",
+            "title": "Checklists Parados",
+            "metric": f"{stalled_count} cards",
+            "description": f"Existem {stalled_count} cards com checklist parcialmente concluído e sem atividade há mais de {STALLED_CHECKLIST_DAYS} dias.",
+            "recommendation": "Verificar impedimentos nos itens pendentes ou dividir o card em entregas menores.",
+            "details": stalled_df[['name', 'list_name']].to_dict('records')
+        }
+
+
+# ---------------------------------------------------------
+# 6. ANOMALIAS: séries fora da banda histórica (EWMA robusto)
+# ---------------------------------------------------------
+ANOMALY_TEXTS = {
+    "list_wip": ("WIP Fora do Padrão", "lista(s) com volume de cards fora da faixa histórica",
+             "Verificar se a etapa está represando trabalho ou recebendo demanda atípica."),
+    "member_wip": ("Carga Atípica no Time", "membro(s) com carga ativa fora da faixa histórica",
+                   "Rebalancear atribuições antes que a sobrecarga vire atraso."),
+    "due_status": ("Atrasos Acima do Normal", "indicador(es) de prazo fora da faixa histórica",
+                   "Revisar prazos vencidos e causas de atraso recorrentes."),
+    "throughput": ("Entregas Fora do Ritmo", "indicador(es) de throughput fora da faixa histórica",
+                   "Comparar com a semana anterior e checar bloqueios ou mudanças de capacidade."),
+}
+
+
+@insight_rule("anomalias", inputs=("history",), severity="attention")
+def _rule_anomalies(ctx):
+    history = ctx["history"]
+    if not history:
+        return None
+
+    by_dimension = {}
+    for anomaly in history["engine"].detect(history["current"]):
+        by_dimension.setdefault(anomaly["dimension"], []).append(anomaly)
+
+    insights = []
+    for dimension, anomalies in by_dimension.items():
+        title, what, rec = ANOMALY_TEXTS[dimension]
+        # Alta de atrasos é crítica; demais desvios pedem atenção
+        above = [a for a in anomalies if a["value"] > a["high"]]
+        severity = "critical" if dimension == "due_status" and above else "attention"
+        top = anomalies[0]
+        insights.append({
+            "type": "anomaly",
+            "severity": severity,
+            "title": title,
+            "metric": f"{len(anomalies)} série(s)",
+            "description": f"{len(anomalies)} {what}. Maior desvio: '{top['label']}' com {int(top['value'])} (esperado {top['low']:.0f}–{top['high']:.0f}).",
+            "recommendation": rec,
+            "details": [
+                {"name": f"{int(a['value'])} (esperado {a['low']:.0f}–{a['high']:.0f}, z={a['zscore']:+.1f})",
+                 "list_name": a["label"]}
+                for a in anomalies
+            ]
+        })
+    return insights
+
+
+# ---------------------------------------------------------
+# 7. LABELS (Attention): Atrasos Concentrados em uma Label
+# ---------------------------------------------------------
+@insight_rule("atrasos_por_label", inputs=("cards", "labels"), columns=("idLabels", "due_date", "dueComplete"),
+              clock="minute", severity="attention")
+def _rule_label_overdue(ctx):
+    df_cards = ctx["cards"]
+    if 'idLabels' not in df_cards.columns:
+        return None
+    label_ids, rows = explode_ids(df_cards['idLabels'])
+    if not len(label_ids):
+        return None
+
+    overdue = ((df_cards['due_date'] < ctx["now"]) & (~df_cards['dueComplete'])).to_numpy(dtype=bool, na_value=False)
+    # Contagem por label via bincount sobre os códigos (sem loop por card)
+    codes, uniques = pd.factorize(label_ids)
+    totals = np.bincount(codes, minlength=len(uniques))
+    late = np.bincount(codes, weights=overdue[rows], minlength=len(uniques)).astype(int)
+    rates = late / totals
+    # Taxa dos demais cards (sem a label) como referência
+    others = np.maximum(len(overdue) - totals, 1)
+    rest_rates = (overdue.sum() - late) / others
+    flagged = np.flatnonzero(
+        (late >= LABEL_OVERDUE_MIN_CARDS) & (rates >= LABEL_OVERDUE_MIN_RATE) & (rates >= 2 * rest_rates)
+    )
+    if not len(flagged):
+        return None
+
+    flagged = flagged[np.argsort(-late[flagged])]
+    names = [ctx["label_names"].get(uniques[i]) or uniques[i] for i in flagged]
+    top = flagged[0]
+    return {
+        "type": "risk",
+        "title": f"Atrasos Concentrados em '{names[0]}'",
+        "metric": f"{late[top]} de {totals[top]} cards",
+        "description": f"{rates[top]:.0%} dos cards com a label '{names[0]}' estão atrasados, contra {rest_rates[top]:.0%} dos demais cards.",
+        "recommendation": "Revisar escopo e prazos desse tipo de demanda ou reforçar quem atua nela.",
+        "details": [{"name": f"{late[i]} de {totals[i]} cards atrasados ({rates[i]:.0%})", "list_name": name}
+                    for i, name in zip(flagged, names)]
+    }
+
+
+# ---------------------------------------------------------
+# 8. PRAZOS (Attention): Vencendo nas Próximas Horas
+# ---------------------------------------------------------
+@insight_rule("prazos_proximos", inputs=("cards",), columns=("name", "list_name", "due_date", "dueComplete"),
+              clock="minute", severity="attention")
+def _rule_due_soon(ctx):
+    df_cards = ctx["cards"]
+    now = ctx["now"]
+    due_soon_df = df_cards[
+        (df_cards['due_date'] >= now) &
+        (df_cards['due_date'] < now + timedelta(hours=DUE_SOON_HOURS)) &
+        (~df_cards['dueComplete'])
+    ].sort_values('due_date')
+    due_soon_count = len(due_soon_df)
+
+    if due_soon_count > 0:
+        return {
+            "type": "risk",
+            "title": f"Prazos nas Próximas {DUE_SOON_HOURS}h",
+            "metric": f"{due_soon_count} cards",
+            "description": f"{due_soon_count} atividades pendentes vencem nas próximas {DUE_SOON_HOURS} horas.",
+            "recommendation": "Confirmar com os responsáveis se as entregas seguem no prazo ou antecipar a renegociação.",
+            "details": due_soon_df[['name', 'list_name', 'due_date']].to_dict('records')
+        }
+
+
+def _column_fingerprint(ctx, col):
+    """Hash de uma coluna de cards (com índice), calculado uma vez por execução."""
+    memo = ctx["_fingerprints"]
+    if col not in ctx["cards"].columns:
+        # Coluna ausente: a própria regra decide (pular ou falhar) ao executar
+        return "<missing>"
+    if col not in memo:
+        values = ctx["cards"][col]
+        if values.dtype == object:
+            # Listas (ex.: idMembers) não são hasheáveis pelo pandas
+            values = values.map(lambda v: ",".join(v) if isinstance(v, list) else v)
+        hashed = pd.util.hash_pandas_object(values, index=True).values
+        memo[col] = hashlib.blake2b(hashed.tobytes(), digest_size=8).hexdigest()
+    return memo[col]
+
+
+def actions_fingerprint(actions):
+    """Ações chegam da mais recente para a mais antiga: tamanho + extremos bastam."""
+    if not actions:
+        return "0"
+    return f"{len(actions)}:{actions[0].get('id')}:{actions[-1].get('id')}"
+
+
+def _rule_fingerprint(rule, ctx):
+    """Fingerprint apenas das entradas que a regra declara."""
+    parts = [rule["name"]]
+    if "cards" in rule["inputs"]:
+        parts.extend(_column_fingerprint(ctx, col) for col in rule["columns"])
+    if "actions" in rule["inputs"]:
+        parts.append(ctx["_actions_fingerprint"])
+    if "list_roles" in rule["inputs"]:
+        parts.append(repr(sorted(ctx["list_roles"].items())))
+    if "labels" in rule["inputs"]:
+        parts.append(repr(sorted(ctx["label_names"].items())))
+    if "history" in rule["inputs"]:
+        history = ctx["history"]
+        parts.append(f"{history['engine'].version}:{history['fingerprint']}" if history else "none")
+    if rule["clock"] == "minute":
+        parts.append(ctx["now"].strftime('%Y%m%d%H%M'))
+    elif rule["clock"] == "day":
+        parts.append(ctx["now"].strftime('%Y%m%d'))
+    elif rule["clock"] == "week":
+        parts.append(ctx["now"].strftime('%G%V'))
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=12).hexdigest()
+
+
+def clear_insights_cache():
+    """Descarta resultados memoizados (ex.: após sincronização manual)."""
+    with _CACHE_LOCK:
+        _RESULT_CACHE.clear()
+
+
+def _run_rule(rule, ctx, budget_ms):
+    """Executa uma regra medindo o custo. Retorna (insights, ms, status)."""
+    start = time.perf_counter()
+    key = _rule_fingerprint(rule, ctx)
+    with _CACHE_LOCK:
+        cached = _RESULT_CACHE.get(key)
+        if cached is not None:
+            _RESULT_CACHE.move_to_end(key)
+    if cached is not None:
+        result = [dict(insight) for insight in cached]
+        return result, (time.perf_counter() - start) * 1000, "memo"
+
+    # Estatísticas compartilhadas entre sessões/threads: lidas e gravadas sob o mesmo lock do memo
+    with _CACHE_LOCK:
+        stats = _RULE_STATS.setdefault(rule["name"], {"last_ms": 0.0, "runs": 0, "deferred": False})
+        # Regra estourou o orçamento na última execução: adia uma vez e tenta de novo depois
+        if stats["last_ms"] > budget_ms and not stats["deferred"]:
+            stats["deferred"] = True
+            return [], 0.0, "adiada"
+
+    start = time.perf_counter()
+    try:
+        result = rule["fn"](ctx)
+        status = "ok"
+    except Exception as e:
+        result = None
+        status = f"erro: {e}"
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    with _CACHE_LOCK:
+        stats["last_ms"] = elapsed_ms
+        stats["runs"] += 1
+        stats["deferred"] = False
+    if status == "ok" and elapsed_ms > budget_ms:
+        status = "acima do orçamento"
+
+    if result is None:
+        result = []
+    elif isinstance(result, dict):
+        result = [result]
+    for insight in result:
+        insight.setdefault("severity", rule["severity"])
+        insight.setdefault("rule", rule["name"])
+
+    # Só memoiza execuções completas
+    if not status.startswith("erro"):
+        with _CACHE_LOCK:
+            _RESULT_CACHE[key] = [dict(insight) for insight in result]
+            while len(_RESULT_CACHE) > RESULT_CACHE_SIZE:
+                _RESULT_CACHE.popitem(last=False)
+    return result, elapsed_ms, status
+
+
+def generate_insights(df_cards, df_actions, list_names_map, timings=None, budget_ms=None, history=None,
+                      label_names=None):
+    """
+    Gera insights determinísticos baseados nos dados do board.
+    Retorna uma lista de dicionários com: rule, type, severity, title, metric, description, recommendation.
+    Se `timings` for uma lista, recebe o custo de cada regra (rule, ms, status, insights).
+    `history` (opcional) habilita as regras históricas: dict com "engine" (AnomalyEngine),
+    "current" (snapshot atual do board) e "fingerprint" (hash desse snapshot).
+    `label_names` (id -> nome) dá nome às labels nas regras fatiadas por label.
+    Cada regra é memoizada pelo fingerprint das entradas que declara: uma nova ação só
+    recalcula o throughput; mover um card só recalcula as regras que leem a lista do card.
+    """
+    insights = []
+
+    if df_cards.empty:
+        return insights
+
+    # Helper: Garantir datas UTC
+    if 'due_date' not in df_cards.columns:
+        df_cards['due_date'] = pd.to_datetime(df_cards['due'], utc=True, errors='coerce')
+
+    ctx = {
+        "cards": df_cards,
+        "actions": df_actions,
+        "list_roles": build_list_roles(list_names_map),
+        "history": history,
+        "label_names": label_names or {},
+        "now": datetime.now(timezone.utc),
+        "_fingerprints": {},
+        "_actions_fingerprint": actions_fingerprint(df_actions),
+    }
+
+    for rule in INSIGHT_RULES:
+        rule_budget = rule["budget_ms"] or budget_ms or RULE_BUDGET_MS
+        result, elapsed_ms, status = _run_rule(rule, ctx, rule_budget)
+        insights.extend(result)
+        if timings is not None:
+            timings.append({
+                "rule": rule["name"],
+                "inputs": ", ".join(rule["inputs"]),
+                "ms": round(elapsed_ms, 2),
+                "budget_ms": rule_budget,
+                "status": status,
+                "insights": len(result),
+            })
 
     return insights
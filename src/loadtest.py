@@ -0,0 +1,105 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from src.services.card_cache import card_detail_cache
+from src.services.trello_service import TrelloService
+
+LOADTEST_STEPS = ["board", "checklists", "actions", "card_details", "total"]
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def refresh_once(service, board_id, card_details=3):
+    """
+    Uma carga fria do dashboard contra a API (board, checklists, ações e alguns detalhes de card).
+    Retorna ({etapa: ms}, ok).
+    """
+    timings = {}
+    start = time.perf_counter()
+
+    t = time.perf_counter()
+    board_data = service.get_board_data(board_id)
+    timings["board"] = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    service.get_board_checklists(board_id)
+    timings["checklists"] = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    service.get_actions(board_id)
+    timings["actions"] = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    for card in (board_data or {}).get("cards", [])[:card_details]:
+        service.get_card_details(card["id"], include_checklists=False)
+    timings["card_details"] = (time.perf_counter() - t) * 1000
+
+    timings["total"] = (time.perf_counter() - start) * 1000
+    return timings, board_data is not None
+
+
+def run_load(base_url, board_id, concurrency=4, refreshes=20, card_details=3):
+    """Executa `refreshes` cargas com `concurrency` sessões simultâneas. Retorna o resumo por etapa."""
+    # Mede a API, não o cache local de detalhes
+    card_detail_cache.max_bytes = 0
+
+    def worker(_):
+        service = TrelloService()
+        service.base_url = base_url.rstrip("/")
+        return refresh_once(service, board_id, card_details)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, range(refreshes)))
+    wall_s = time.perf_counter() - start
+
+    summary = {"refreshes": refreshes, "concurrency": concurrency, "wall_s": round(wall_s, 2),
+               "failed": sum(1 for _, ok in results if not ok), "steps": {}}
+    for step in LOADTEST_STEPS:
+        values = [timings[step] for timings, _ in results]
+        summary["steps"][step] = {
+            "p50": round(_percentile(values, 50), 1),
+            "p95": round(_percentile(values, 95), 1),
+            "max": round(max(values), 1),
+        }
+    return summary
+
+
+def main(argv=None):
+    # Uso: python -m src.loadtest --base-url http://127.0.0.1:8765/1 --concurrency 8 --refreshes 50
+    parser = argparse.ArgumentParser(description="Teste de carga do refresh do dashboard contra a API (real ou fake).")
+    parser.add_argument("--base-url", default=os.getenv("TRELLO_BASE_URL", "http://127.0.0.1:8765/1"))
+    parser.add_argument("--board", default=os.getenv("TRELLO_BOARD_ID", "synthetic"))
+    parser.add_argument("--concurrency", type=int, default=4, help="Sessões simultâneas")
+    parser.add_argument("--refreshes", type=int, default=20, help="Total de cargas")
+    parser.add_argument("--card-details", type=int, default=3, help="Detalhes de card abertos por carga")
+    args = parser.parse_args(argv)
+
+    summary = run_load(args.base_url, args.board, args.concurrency, args.refreshes, args.card_details)
+    print(f"{summary['refreshes']} cargas, {summary['concurrency']} simultâneas, "
+          f"{summary['wall_s']} s, {summary['failed']} falhas")
+    for step, stats in summary["steps"].items():
+        print(f"  {step:<13} p50 {stats['p50']:8.1f} ms   p95 {stats['p95']:8.1f} ms   max {stats['max']:8.1f} ms")
+
+    # Contadores do servidor fake (status 429/500 injetados), se disponível
+    root = args.base_url.rstrip("/").rsplit("/1", 1)[0]
+    try:
+        stats = requests.get(f"{root}/_stats", timeout=2).json()
+        print(f"  servidor: {stats['status']}")
+    except Exception:
+        pass
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+from datetime import datetime, timezone
+import pandas as pd
+from src.data import created_at_from_ids
+from src.insights import build_list_roles
+
+# Listas fora do WIP nos KPIs (mesmo critério usado historicamente pelo dashboard)
+WIP_EXCLUDE_PATTERN = 'Done|Concluído|Backlog|Arquivado'
+# Listas fora do gráfico de distribuição do WIP
+WIP_CHART_EXCLUDE_PATTERN = 'Done|Concluído|Backlog'
+
+
+def _kpi_flags(df_cards, now):
+    """Máscaras booleanas (numpy) dos KPIs: ativo (WIP), atrasado e sem dono."""
+    active = ~df_cards['list_name'].str.contains(WIP_EXCLUDE_PATTERN, case=False, na=False)
+    overdue = (df_cards['due_date'] < now) & (~df_cards['dueComplete'])
+    return {
+        "wip": active.to_numpy(dtype=bool),
+        "overdue": overdue.to_numpy(dtype=bool, na_value=False),
+        "unassigned": (df_cards['member_count'] == 0).to_numpy(dtype=bool),
+    }
+
+
+def compute_kpis(df_cards, now=None):
+    """
+    KPIs do topo do dashboard para um conjunto de cards (já filtrado).
+    Espera as colunas derivadas do BoardSnapshot (list_name, due_date, dueComplete, member_count).
+    """
+    flags = _kpi_flags(df_cards, now or datetime.now(timezone.utc))
+    return {"total": int(len(df_cards)), **{key: int(flag.sum()) for key, flag in flags.items()}}
+
+
+def label_kpis(snapshot, mask=None, now=None):
+    """
+    KPIs por label para os cards da máscara: matriz de bitmaps (labels x cards) vezes os
+    vetores de cada KPI. Retorna DataFrame [label_id, label, color, total, wip, overdue, unassigned]
+    ordenado por total, só com labels presentes na seleção.
+    """
+    cards = snapshot.view(mask)
+    label_ids, matrix = snapshot.label_matrix(mask)
+    columns = ['label_id', 'label', 'color', 'total', 'wip', 'overdue', 'unassigned']
+    if not label_ids:
+        return pd.DataFrame(columns=columns)
+
+    flags = _kpi_flags(cards, now or datetime.now(timezone.utc))
+    counts = matrix.astype('int32')
+    colors = snapshot.label_table.set_index('id')['color'] if not snapshot.label_table.empty else pd.Series(dtype=object)
+    df = pd.DataFrame({
+        'label_id': label_ids,
+        'label': [snapshot.labels.get(label_id, label_id) for label_id in label_ids],
+        'color': [colors.get(label_id) for label_id in label_ids],
+        'total': counts.sum(axis=1),
+        **{key: counts @ flag.astype('int32') for key, flag in flags.items()},
+    }, columns=columns)
+    return df[df['total'] > 0].sort_values('total', ascending=False, ignore_index=True)
+
+
+def done_list_ids(list_names_map):
+    """Listas de conclusão pelo mesmo critério dos insights, histórico e arquivo (build_list_roles)."""
+    return [lid for lid, role in build_list_roles(list_names_map).items() if role == "done"]
+
+
+def throughput(actions, list_names_map, period='W'):
+    """
+    Entregas (movimentos para listas de conclusão) por período ('W' semana, 'M' mês).
+    Retorna DataFrame [period, count] ordenado; vazio se não houver conclusões.
+    """
+    done_ids = done_list_ids(list_names_map)
+    dates = [
+        action['date'] for action in actions or []
+        if action['type'] == 'updateCard' and action['data'].get('listAfter', {}).get('id') in done_ids
+    ]
+    if not dates:
+        return pd.DataFrame(columns=['period', 'count'])
+
+    dates = pd.to_datetime(pd.Series(dates), utc=True).dt.tz_localize(None)
+    periods = dates.dt.to_period(period).dt.start_time
+    tp = periods.value_counts().sort_index().reset_index()
+    tp.columns = ['period', 'count']
+    return tp
+
+
+def completions(snapshot, actions, closed_cards=None):
+    """
+    Cards concluídos ao longo da vida do board: abertos em listas de conclusão + arquivados
+    concluídos (src.services.card_archive). A data de conclusão é a última movimentação para
+    concluído no log de ações; sem ela, a data de arquivamento (ou a última atividade).
+    Retorna DataFrame [id, idMembers, created_at, done_at, archived].
+    """
+    columns = ['id', 'idMembers', 'created_at', 'done_at', 'archived']
+    done_ids = set(done_list_ids(snapshot.lists))
+    moves = pd.DataFrame([
+        (action['data'].get('card', {}).get('id'), action['date'])
+        for action in actions or []
+        if action['type'] == 'updateCard' and action['data'].get('listAfter', {}).get('id') in done_ids
+    ], columns=['id', 'moved_at'])
+    moved_at = pd.to_datetime(moves.groupby('id')['moved_at'].max(), utc=True) if not moves.empty else pd.Series(dtype='datetime64[ns, UTC]')
+
+    cards = snapshot.cards
+    open_done = cards[cards['idList'].isin(done_ids)]
+    frames = [pd.DataFrame({
+        'id': open_done['id'].astype(object),
+        'idMembers': open_done['idMembers'],
+        'created_at': created_at_from_ids(open_done['id']).to_numpy(),
+        'done_at': open_done['id'].astype(object).map(moved_at).fillna(open_done['last_activity']),
+        'archived': False,
+    })]
+    if closed_cards is not None and not closed_cards.empty:
+        archived = closed_cards[closed_cards['done'].astype(bool)]
+        frames.append(pd.DataFrame({
+            'id': archived['id'],
+            'idMembers': archived['idMembers'].map(list),
+            'created_at': pd.to_datetime(archived['created_at'], utc=True),
+            'done_at': archived['id'].map(moved_at).fillna(pd.to_datetime(archived['closed_at'], utc=True)),
+            'archived': True,
+        }))
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    df = pd.concat(frames, ignore_index=True).drop_duplicates('id', keep='last')
+    df['done_at'] = pd.to_datetime(df['done_at'], utc=True)
+    df['created_at'] = pd.to_datetime(df['created_at'], utc=True)
+    return df[columns].reset_index(drop=True)
+
+
+def completions_throughput(done, period='W'):
+    """Entregas por período a partir de completions(): mesmo formato de throughput()."""
+    if done.empty:
+        return pd.DataFrame(columns=['period', 'count'])
+    periods = done['done_at'].dt.tz_localize(None).dt.to_period(period).dt.start_time
+    tp = periods.value_counts().sort_index().reset_index()
+    tp.columns = ['period', 'count']
+    return tp
+
+
+def cycle_time(done, period=None):
+    """
+    Tempo de ciclo (criação -> conclusão, em dias) a partir de completions().
+    Sem período: {"median", "p85", "count"}; com período: DataFrame [period, median, p85, count].
+    """
+    days = (done['done_at'] - done['created_at']).dt.total_seconds() / 86400 if not done.empty else pd.Series(dtype=float)
+    valid = days.notna() & (days >= 0)
+    if period is None:
+        days = days[valid]
+        if days.empty:
+            return {"median": None, "p85": None, "count": 0}
+        return {"median": float(days.median()), "p85": float(days.quantile(0.85)), "count": int(len(days))}
+
+    frame = pd.DataFrame({
+        'period': done.loc[valid, 'done_at'].dt.tz_localize(None).dt.to_period(period).dt.start_time,
+        'days': days[valid],
+    })
+    stats = frame.groupby('period')['days'].agg(median='median', p85=lambda d: d.quantile(0.85), count='size')
+    return stats.reset_index()
+
+
+def member_deliveries(done, members_map):
+    """Entregas por membro ao longo da vida do board (cards sem responsável contam como 'N/A')."""
+    member_ids = done[['idMembers']].explode('idMembers')['idMembers']
+    names = member_ids.map(members_map)
+    # Quem já saiu do board continua contando, agrupado
+    names = names.where(names.notna() | member_ids.isna(), 'Ex-membros').fillna('N/A').rename('member_name')
+    return names.value_counts().reset_index()
+
+
+def list_counts(df_cards):
+    """Volume de cards por lista."""
+    return df_cards['list_name'].value_counts().reset_index()
+
+
+def member_counts(df_cards, members_map):
+    """Cards por membro (cards sem responsável contam como 'N/A')."""
+    df_exp = df_cards[['idMembers']].explode('idMembers')
+    names = df_exp['idMembers'].map(members_map).fillna('N/A').rename('member_name')
+    return names.value_counts().reset_index()
@@ -0,0 +1,191 @@
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+
+from src.data import BoardSnapshot
+from src.insights import build_list_roles
+from src.metrics import compute_kpis, throughput
+from src.services.shared_cache import SharedCacheTrelloService, configured_board_ids
+
+# Cargas de board simultâneas (I/O: limita a pressão sobre o rate limit do Trello)
+PORTFOLIO_LOAD_WORKERS = int(os.getenv("PORTFOLIO_LOAD_WORKERS", "8"))
+# Processos para os rollups (pandas é CPU e segura o GIL); 0 = calcula no próprio processo
+PORTFOLIO_PROCESSES = int(os.getenv("PORTFOLIO_PROCESSES", str(min(4, os.cpu_count() or 1))))
+# Janela de "entregas recentes" exibida por board
+PORTFOLIO_RECENT_WEEKS = 4
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _process_pool(processes=PORTFOLIO_PROCESSES):
+    """
+    Pool de processos do módulo, criado uma vez e reaproveitado entre reruns.
+    Usa forkserver/spawn: o processo do Streamlit tem threads e não deve ser forkado.
+    """
+    global _POOL
+    if processes <= 0:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _POOL = ProcessPoolExecutor(max_workers=processes, mp_context=context)
+        return _POOL
+
+
+def _reset_process_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+
+
+def fetch_board_payload(board_id, api_key=None, token=None):
+    """
+    Busca os dados brutos do board (via cache em disco compartilhado).
+    Retorna {"board_id", "board_data", "checklists", "actions", "load_ms"} ou {"board_id", "error"}.
+    """
+    start = time.perf_counter()
+    # Um serviço por tarefa: last_error não é compartilhado entre threads
+    service = SharedCacheTrelloService(api_key, token)
+    board_data = service.get_board_data(board_id)
+    if not board_data:
+        return {"board_id": board_id, "error": service.last_error or f"Board {board_id} indisponível."}
+    return {
+        "board_id": board_id,
+        "board_data": board_data,
+        "checklists": service.get_board_checklists(board_id),
+        "actions": service.get_actions(board_id),
+        "load_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def _bottleneck(cards, list_names_map):
+    """Lista ativa com mais cards e sua fatia do WIP (None se não houver cards ativos)."""
+    roles = cards['idList'].map(build_list_roles(list_names_map)).fillna("active")
+    active = cards[roles == "active"]
+    if active.empty:
+        return None
+    counts = active['list_name'].value_counts()
+    return {"list": counts.idxmax(), "cards": int(counts.max()), "share": round(float(counts.max()) / len(active), 3)}
+
+
+def board_rollup(payload, now):
+    """
+    Agregados de um board (executado nos processos do pool): KPIs, throughput semanal,
+    entregas recentes e gargalo. Recebe e devolve apenas tipos simples (picklable).
+    """
+    start = time.perf_counter()
+    snapshot = BoardSnapshot(payload["board_data"], payload["checklists"])
+    cards = snapshot.view()
+    tp = throughput(payload["actions"], snapshot.lists, 'W')
+    weekly = {period.date().isoformat(): int(count) for period, count in tp.itertuples(index=False)}
+    recent_start = (now - timedelta(weeks=PORTFOLIO_RECENT_WEEKS)).date().isoformat()
+    return {
+        "board_id": payload["board_id"],
+        "board_name": snapshot.board_name,
+        "kpis": compute_kpis(cards, now),
+        "throughput_weekly": weekly,
+        "throughput_recent": sum(count for week, count in weekly.items() if week >= recent_start),
+        "bottleneck": _bottleneck(cards, snapshot.lists),
+        "load_ms": payload["load_ms"],
+        "rollup_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def merge_rollups(rollups):
+    """Visão consolidada: totais somados, throughput semanal somado por semana e gargalos por fatia do WIP."""
+    boards = [r for r in rollups if "error" not in r]
+    totals = {key: sum(r["kpis"][key] for r in boards) for key in ("total", "wip", "overdue", "unassigned")}
+    totals["throughput_recent"] = sum(r["throughput_recent"] for r in boards)
+
+    weekly = Counter()
+    for r in boards:
+        weekly.update(r["throughput_weekly"])
+
+    return {
+        "boards": boards,
+        "errors": [r for r in rollups if "error" in r],
+        "totals": totals,
+        "throughput_weekly": dict(sorted(weekly.items())),
+        "bottlenecks": sorted((r for r in boards if r["bottleneck"]), key=lambda r: r["bottleneck"]["share"], reverse=True),
+    }
+
+
+def load_portfolio(board_ids, api_key=None, token=None, load_workers=PORTFOLIO_LOAD_WORKERS,
+                   processes=PORTFOLIO_PROCESSES, now=None):
+    """
+    Carrega os boards em paralelo (pool de threads limitado) e, à medida que cada um chega,
+    envia o rollup para o pool de processos: o tempo total fica próximo ao do board mais lento.
+    Retorna merge_rollups(...) com "elapsed_ms" e "slowest_load_ms".
+    """
+    start = time.perf_counter()
+    now = now or datetime.now(timezone.utc)
+    pool = _process_pool(processes)
+    rollups = []
+    pending = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, load_workers)) as loaders:
+        loads = [loaders.submit(fetch_board_payload, board_id, api_key, token) for board_id in board_ids]
+        for done in as_completed(loads):
+            payload = done.result()
+            if "error" in payload:
+                rollups.append(payload)
+            elif pool is None:
+                rollups.append(board_rollup(payload, now))
+            else:
+                pending[pool.submit(board_rollup, payload, now)] = payload
+
+    for future, payload in pending.items():
+        try:
+            rollups.append(future.result())
+        except BrokenProcessPool:
+            # Pool perdido (ex.: worker morto): recria na próxima carga e calcula aqui
+            _reset_process_pool()
+            rollups.append(board_rollup(payload, now))
+
+    order = {board_id: i for i, board_id in enumerate(board_ids)}
+    rollups.sort(key=lambda r: order.get(r["board_id"], len(order)))
+    portfolio = merge_rollups(rollups)
+    portfolio["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    portfolio["slowest_load_ms"] = max((r["load_ms"] for r in portfolio["boards"]), default=0)
+    return portfolio
+
+
+def main(argv=None):
+    # Uso: python -m src.portfolio [--board b1 b2 ...] [--workers 8] [--processes 4]
+    parser = argparse.ArgumentParser(description="Visão consolidada de vários boards (carga paralela).")
+    parser.add_argument("--board", nargs="+", default=None, help="Boards (default: TRELLO_BOARD_IDS/TRELLO_BOARD_ID)")
+    parser.add_argument("--workers", type=int, default=PORTFOLIO_LOAD_WORKERS, help="Cargas simultâneas")
+    parser.add_argument("--processes", type=int, default=PORTFOLIO_PROCESSES, help="Processos para os rollups (0 = sem pool)")
+    args = parser.parse_args(argv)
+
+    boards = args.board or configured_board_ids()
+    if not boards:
+        parser.error("informe --board ou defina TRELLO_BOARD_IDS")
+
+    portfolio = load_portfolio(boards, load_workers=args.workers, processes=args.processes)
+    for r in portfolio["boards"]:
+        neck = r["bottleneck"]
+        neck_txt = f"{neck['list']} ({neck['share']:.0%})" if neck else "-"
+        print(f"{r['board_name'][:30]:<30} total={r['kpis']['total']:>6} wip={r['kpis']['wip']:>5} "
+              f"atrasados={r['kpis']['overdue']:>5} entregas_{PORTFOLIO_RECENT_WEEKS}sem={r['throughput_recent']:>4} "
+              f"gargalo={neck_txt}  carga={r['load_ms']:.0f}ms rollup={r['rollup_ms']:.0f}ms")
+    for r in portfolio["errors"]:
+        print(f"{r['board_id']}: erro: {r['error']}")
+    totals = portfolio["totals"]
+    print(f"TOTAL {len(portfolio['boards'])} boards: total={totals['total']} wip={totals['wip']} "
+          f"atrasados={totals['overdue']} sem_dono={totals['unassigned']} entregas={totals['throughput_recent']}")
+    print(f"Tempo: {portfolio['elapsed_ms']:.0f} ms (board mais lento: {portfolio['slowest_load_ms']:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from src.data import BoardSnapshot
+from src.insights import generate_insights
+from src.metrics import compute_kpis, throughput, list_counts, member_counts, label_kpis
+from src.services.trello_service import TrelloService
+
+
+def load_board(service, board_id):
+    """Busca e normaliza o board: (BoardSnapshot, actions). Levanta RuntimeError se indisponível."""
+    board_data = service.get_board_data(board_id)
+    if not board_data:
+        raise RuntimeError(service.last_error or f"Board {board_id} indisponível.")
+    snapshot = BoardSnapshot(board_data, service.get_board_checklists(board_id))
+    return snapshot, service.get_actions(board_id)
+
+
+def build_report(snapshot, actions, board_id=None, now=None, history=None):
+    """
+    Pipeline headless: KPIs, distribuição, throughput semanal, KPIs por label e insights do
+    board, como dict serializável em JSON (sem Streamlit/Plotly).
+    """
+    now = now or datetime.now(timezone.utc)
+    cards = snapshot.view()
+    tp = throughput(actions, snapshot.lists, 'W')
+    return {
+        "board": {"id": board_id or snapshot.board_data.get('id'), "name": snapshot.board_name},
+        "generated_at": now.isoformat(),
+        "kpis": compute_kpis(cards, now),
+        "lists": dict(list_counts(cards).itertuples(index=False)),
+        "members": dict(member_counts(cards, snapshot.members).itertuples(index=False)),
+        "throughput_weekly": {period.date().isoformat(): int(count) for period, count in tp.itertuples(index=False)},
+        "labels": label_kpis(snapshot, now=now).drop(columns=["label_id"]).to_dict("records"),
+        "insights": generate_insights(cards, actions, snapshot.lists, history=history, label_names=snapshot.labels),
+    }
+
+
+def main(argv=None):
+    # Uso (cron/batch): python -m src.report --board <id> [--output report.json]
+    parser = argparse.ArgumentParser(description="Gera KPIs e insights do board em JSON (sem Streamlit).")
+    parser.add_argument("--board", default=os.getenv("TRELLO_BOARD_ID"), help="ID do board (default: TRELLO_BOARD_ID)")
+    parser.add_argument("--output", default="-", help="Arquivo de saída (default: stdout)")
+    parser.add_argument("--indent", type=int, default=2, help="Indentação do JSON (0 = compacto)")
+    args = parser.parse_args(argv)
+
+    if not args.board:
+        parser.error("informe --board ou defina TRELLO_BOARD_ID")
+
+    try:
+        snapshot, actions = load_board(TrelloService(), args.board)
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+
+    report = build_report(snapshot, actions, board_id=args.board)
+    payload = json.dumps(report, ensure_ascii=False, indent=args.indent or None, default=str)
+    if args.output == "-":
+        sys.stdout.write(payload + "\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+import pandas as pd
+from src.data import created_at_from_ids
+from src.insights import build_list_roles
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join("data", "archive"))
+# Tamanho da página da API (máximo do Trello) e páginas por sincronização no app:
+# o backfill inicial de boards grandes avança aos poucos, retomando do cursor salvo
+ARCHIVE_PAGE_SIZE = 1000
+ARCHIVE_MAX_PAGES = int(os.getenv("ARCHIVE_MAX_PAGES", "5"))
+
+ARCHIVE_COLUMNS = ["id", "name", "idList", "list_name", "idMembers", "idLabels",
+                   "created_at", "closed_at", "done"]
+
+
+def _closed_frame(cards, list_names_map, closed_dates=None):
+    """Normaliza cards arquivados para o formato do arquivo (datas UTC, conclusão pela lista)."""
+    if not cards:
+        return pd.DataFrame(columns=ARCHIVE_COLUMNS)
+    df = pd.DataFrame(cards)
+    roles = build_list_roles(list_names_map)
+    closed_at = pd.to_datetime(df['dateLastActivity'], utc=True, errors='coerce')
+    if closed_dates:
+        # Data exata da ação de arquivamento quando conhecida (sync incremental)
+        exact = pd.to_datetime(df['id'].map(closed_dates), utc=True, errors='coerce')
+        closed_at = exact.fillna(closed_at)
+    due_complete = df['dueComplete'].fillna(False).astype(bool) if 'dueComplete' in df else False
+    return pd.DataFrame({
+        "id": df['id'],
+        "name": df['name'],
+        "idList": df['idList'],
+        "list_name": df['idList'].map(list_names_map),
+        "idMembers": df['idMembers'].map(list),
+        "idLabels": df['idLabels'].map(list),
+        "created_at": created_at_from_ids(df['id']),
+        "closed_at": closed_at,
+        # Concluído = arquivado a partir de uma lista de conclusão (ou com prazo marcado como feito)
+        "done": (df['idList'].map(roles) == "done") | due_complete,
+    })
+
+
+class CardArchive:
+    """
+    Cards arquivados do board em Parquet local: <base_dir>/board=<id>/closed_cards.parquet.
+    Preenchido uma vez (backfill paginado e retomável) e depois só com os cards arquivados
+    desde a última sincronização, descobertos pelas ações updateCard:closed.
+    """
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir or ARCHIVE_DIR
+
+    def _board_dir(self, board_id):
+        return os.path.join(self.base_dir, f"board={board_id}")
+
+    def _cards_path(self, board_id):
+        return os.path.join(self._board_dir(board_id), "closed_cards.parquet")
+
+    def _state_path(self, board_id):
+        return os.path.join(self._board_dir(board_id), "state.json")
+
+    def state(self, board_id):
+        """{"backfill_cursor", "backfill_done", "last_sync"} da sincronização do board."""
+        try:
+            with open(self._state_path(board_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"backfill_cursor": None, "backfill_done": False, "last_sync": None}
+
+    def _save_state(self, board_id, state):
+        os.makedirs(self._board_dir(board_id), exist_ok=True)
+        path = self._state_path(board_id)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(f"{path}.tmp", path)
+
+    def load(self, board_id):
+        """Cards arquivados do board (vazio se ainda não sincronizado)."""
+        path = self._cards_path(board_id)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=ARCHIVE_COLUMNS)
+        return pd.read_parquet(path)
+
+    def _write(self, board_id, df):
+        os.makedirs(self._board_dir(board_id), exist_ok=True)
+        path = self._cards_path(board_id)
+        df.to_parquet(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+
+    def upsert(self, board_id, frame, remove_ids=()):
+        """Insere/atualiza cards (por id) e remove os desarquivados. Retorna o total arquivado."""
+        current = self.load(board_id)
+        drop = set(frame['id']) | set(remove_ids)
+        if not current.empty:
+            current = current[~current['id'].isin(drop)]
+        merged = frame if current.empty else pd.concat([current, frame], ignore_index=True)
+        self._write(board_id, merged.sort_values('closed_at', ascending=False, ignore_index=True))
+        return len(merged)
+
+    def sync(self, service, board_id, list_names_map, now=None, max_pages=ARCHIVE_MAX_PAGES):
+        """
+        Avança a ingestão: até `max_pages` páginas do backfill; com o backfill completo, busca só
+        os arquivamentos desde a última sincronização. Retorna um resumo
+        {"mode", "pages", "added", "removed", "complete", "error"}.
+        """
+        now = now or datetime.now(timezone.utc)
+        state = self.state(board_id)
+        summary = {"mode": "backfill" if not state["backfill_done"] else "incremental",
+                   "pages": 0, "added": 0, "removed": 0, "error": None}
+        # Arquivamentos feitos durante o backfill são pegos depois pelo incremental
+        state["last_sync"] = state["last_sync"] or now.isoformat()
+
+        if not state["backfill_done"]:
+            while summary["pages"] < max_pages:
+                page = service.get_closed_cards(board_id, before=state["backfill_cursor"], limit=ARCHIVE_PAGE_SIZE)
+                if page is None:
+                    summary["error"] = service.last_error
+                    break
+                summary["pages"] += 1
+                if page:
+                    self.upsert(board_id, _closed_frame(page, list_names_map))
+                    summary["added"] += len(page)
+                    state["backfill_cursor"] = page[-1]["id"]
+                if len(page) < ARCHIVE_PAGE_SIZE:
+                    state["backfill_done"] = True
+                    break
+                self._save_state(board_id, state)
+        else:
+            closed, reopened, ok = self._closing_changes(service, board_id, state["last_sync"], summary)
+            if ok and closed:
+                cards = service.get_cards(closed)
+                if cards is None:
+                    summary["error"] = service.last_error
+                    ok = False
+                else:
+                    cards = [c for c in cards if c.get("closed")]
+                    self.upsert(board_id, _closed_frame(cards, list_names_map, closed), remove_ids=reopened)
+                    summary["added"], summary["removed"] = len(cards), len(reopened)
+            elif ok and reopened:
+                self.upsert(board_id, pd.DataFrame(columns=ARCHIVE_COLUMNS), remove_ids=reopened)
+                summary["removed"] = len(reopened)
+            if ok:
+                state["last_sync"] = now.isoformat()
+
+        self._save_state(board_id, state)
+        summary["complete"] = state["backfill_done"]
+        return summary
+
+    def _closing_changes(self, service, board_id, since, summary):
+        """
+        Ações de (des)arquivamento desde `since`, paginadas. A mais recente de cada card vale.
+        Retorna ({card_id: data do arquivamento}, {ids desarquivados}, sucesso).
+        """
+        closed, reopened, seen = {}, set(), set()
+        before = None
+        while True:
+            page = service.get_closing_actions(board_id, since, before=before, limit=ARCHIVE_PAGE_SIZE)
+            if page is None:
+                summary["error"] = service.last_error
+                return closed, reopened, False
+            summary["pages"] += 1
+            for action in page:
+                card = action.get("data", {}).get("card", {})
+                if not card.get("id") or card["id"] in seen:
+                    continue
+                seen.add(card["id"])
+                if card.get("closed"):
+                    closed[card["id"]] = action["date"]
+                else:
+                    reopened.add(card["id"])
+            if len(page) < ARCHIVE_PAGE_SIZE:
+                return closed, reopened, True
+            before = page[-1]["date"]
+
+
+def main():
+    # Job agendável (cron): python -m src.services.card_archive --board <id>
+    from src.services.trello_service import TrelloService
+
+    parser = argparse.ArgumentParser(description="Ingere os cards arquivados do board no armazenamento local.")
+    parser.add_argument("--board", default=os.getenv("TRELLO_BOARD_ID"), help="ID do board (default: TRELLO_BOARD_ID)")
+    parser.add_argument("--dir", default=None, help="Diretório do arquivo (default: ARCHIVE_DIR)")
+    parser.add_argument("--max-pages", type=int, default=1000, help="Páginas por execução (backfill)")
+    args = parser.parse_args()
+
+    service = TrelloService()
+    board_data = service.get_board_data(args.board)
+    if not board_data:
+        raise SystemExit(service.last_error or "Não foi possível carregar o board.")
+    list_names = {l['id']: l['name'] for l in board_data['lists']}
+
+    summary = CardArchive(args.dir).sync(service, args.board, list_names, max_pages=args.max_pages)
+    if summary["error"]:
+        raise SystemExit(summary["error"])
+    print(f"{summary['mode']}: {summary['added']} arquivados, {summary['removed']} desarquivados, "
+          f"{summary['pages']} páginas" + ("" if summary["complete"] else " (backfill incompleto)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+# Orçamento de memória do cache de detalhes (MB) e validade de cada entrada (s)
+CARD_DETAILS_CACHE_MB = float(os.getenv("CARD_DETAILS_CACHE_MB", "32"))
+CARD_DETAILS_TTL = int(os.getenv("CARD_DETAILS_TTL", "300"))
+
+
+def _estimate_size(value):
+    """Tamanho aproximado (bytes) do payload, pelo JSON serializado."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class CardDetailCache:
+    """
+    Cache LRU de detalhes de card (checklists, anexos, ações) limitado por bytes.
+    Entradas mais antigas são descartadas quando o orçamento estoura; mudanças
+    reportadas para um card (ações recentes, webhook) invalidam suas entradas.
+    """
+
+    def __init__(self, max_bytes=None, ttl=CARD_DETAILS_TTL):
+        self.max_bytes = int(max_bytes if max_bytes is not None else CARD_DETAILS_CACHE_MB * 1024 * 1024)
+        self.ttl = ttl
+        self._entries = OrderedDict()  # (card_id, variante) -> (details, size, fetched_at)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, card_id, variant=None):
+        key = (card_id, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[2] > self.ttl:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, card_id, details, variant=None):
+        key = (card_id, variant)
+        size = _estimate_size(details)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            # Payload maior que o orçamento inteiro: não cacheia
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (details, size, time.time())
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def invalidate(self, card_id):
+        """Remove todas as variantes cacheadas do card. Retorna True se havia algo."""
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == card_id]
+            for key in keys:
+                self._drop(key)
+            self.invalidations += len(keys)
+            return bool(keys)
+
+    def invalidate_from_actions(self, actions):
+        """
+        Invalida cards com ações mais novas que a entrada em cache (sync incremental).
+        Retorna o número de cards invalidados.
+        """
+        with self._lock:
+            fetched = {key[0]: entry[2] for key, entry in self._entries.items()}
+        if not fetched:
+            return 0
+
+        changed = set()
+        for action in actions or []:
+            card_id = action.get('data', {}).get('card', {}).get('id')
+            if card_id not in fetched or card_id in changed:
+                continue
+            try:
+                action_ts = datetime.fromisoformat(action['date'].replace('Z', '+00:00')).timestamp()
+            except (KeyError, ValueError):
+                continue
+            if action_ts > fetched[card_id]:
+                changed.add(card_id)
+
+        for card_id in changed:
+            self.invalidate(card_id)
+        return len(changed)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Instância única por processo, compartilhada por todas as sessões
+card_detail_cache = CardDetailCache()
@@ -0,0 +1,214 @@
+import argparse
+import glob
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone, timedelta
+import pandas as pd
+from src.data import DUE_SOON_HOURS
+from src.insights import build_list_roles
+
+HISTORY_DIR = os.getenv("HISTORY_DIR", os.path.join("data", "history"))
+
+# Janela para considerar um prazo "vencendo": a mesma da UI e dos alertas (DUE_SOON_HOURS)
+DUE_SOON_WINDOW = timedelta(hours=DUE_SOON_HOURS)
+
+SNAPSHOT_COLUMNS = ["date", "dimension", "key", "label", "count"]
+
+DUE_STATUS_LABELS = {
+    "overdue": "Atrasados",
+    "due_soon": f"Vencendo ({DUE_SOON_HOURS}h)",
+    "on_track": "No prazo",
+    "done": "Concluídos",
+    "no_due": "Sem prazo",
+}
+
+
+def build_daily_snapshot(board_data, now=None, actions=None):
+    """
+    Resume o board em contagens compactas do dia (formato longo):
+    - dimension='list': cards por lista
+    - dimension='list_wip': cards por lista ativa
+    - dimension='member': cards por membro ('unassigned' para cards sem dono)
+    - dimension='member_wip': cards em listas ativas por membro
+    - dimension='due_status': overdue, due_soon, on_track, done, no_due
+    - dimension='throughput': entregas nos últimos 7 dias (se `actions` for informado)
+    """
+    now = now or datetime.now(timezone.utc)
+    day = now.date()
+    rows = []
+
+    df_cards = pd.DataFrame(board_data.get('cards', []))
+    lists = {l['id']: l['name'] for l in board_data.get('lists', [])}
+    members = {m['id']: m['fullName'] for m in board_data.get('members', [])}
+    list_roles = build_list_roles(lists)
+
+    if not df_cards.empty:
+        for lid, count in df_cards['idList'].value_counts().items():
+            rows.append((day, "list", lid, lists.get(lid, lid), int(count)))
+
+        exploded = df_cards['idMembers'].explode().fillna("unassigned")
+        for mid, count in exploded.value_counts().items():
+            label = "Sem dono" if mid == "unassigned" else members.get(mid, mid)
+            rows.append((day, "member", mid, label, int(count)))
+
+        active = df_cards['idList'].map(list_roles).fillna("active") == "active"
+        for lid, count in df_cards.loc[active, 'idList'].value_counts().items():
+            rows.append((day, "list_wip", lid, lists.get(lid, lid), int(count)))
+        for mid, count in df_cards.loc[active, 'idMembers'].explode().dropna().value_counts().items():
+            rows.append((day, "member_wip", mid, members.get(mid, mid), int(count)))
+
+        due = pd.to_datetime(df_cards['due'], utc=True, errors='coerce')
+        done = df_cards['dueComplete'].fillna(False).astype(bool)
+        status = pd.Series("on_track", index=df_cards.index)
+        status[due.isna()] = "no_due"
+        status[due.notna() & (due < now)] = "overdue"
+        status[due.notna() & (due >= now) & (due < now + DUE_SOON_WINDOW)] = "due_soon"
+        status[done & due.notna()] = "done"
+        for key, count in status.value_counts().items():
+            rows.append((day, "due_status", key, DUE_STATUS_LABELS[key], int(count)))
+
+    if actions is not None:
+        done_list_ids = {lid for lid, role in list_roles.items() if role == "done"}
+        week_ago = now - timedelta(days=7)
+        delivered = sum(
+            1 for action in actions
+            if action['type'] == 'updateCard'
+            and action['data'].get('listAfter', {}).get('id') in done_list_ids
+            and week_ago <= pd.Timestamp(action['date']) <= now
+        )
+        rows.append((day, "throughput", "done_7d", "Entregas (7 dias)", delivered))
+
+    snapshot = pd.DataFrame(rows, columns=SNAPSHOT_COLUMNS)
+    snapshot['date'] = pd.to_datetime(snapshot['date'])
+    snapshot['count'] = snapshot['count'].astype('int32')
+    return snapshot
+
+
+def _as_day(value):
+    """Timestamp do dia (sem fuso), compatível com a coluna 'date' do histórico."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return ts.normalize()
+
+
+class HistoryStore:
+    """
+    Armazena snapshots diários em Parquet, particionados por board e mês:
+    <base_dir>/board=<id>/month=YYYY-MM.parquet
+    Consultas por intervalo leem apenas os meses envolvidos.
+    """
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir or HISTORY_DIR
+        self._written = set()
+        self._lock = threading.Lock()
+
+    def _board_dir(self, board_id):
+        return os.path.join(self.base_dir, f"board={board_id}")
+
+    def _month_path(self, board_id, month):
+        return os.path.join(self._board_dir(board_id), f"month={month}.parquet")
+
+    def _read_month(self, board_id, month, columns=None):
+        path = self._month_path(board_id, month)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=columns or SNAPSHOT_COLUMNS)
+        return pd.read_parquet(path, columns=columns)
+
+    def has_snapshot(self, board_id, day):
+        if (board_id, day) in self._written:
+            return True
+        month_df = self._read_month(board_id, day.strftime('%Y-%m'), columns=['date'])
+        found = (month_df['date'].dt.date == day).any() if not month_df.empty else False
+        if found:
+            self._written.add((board_id, day))
+        return bool(found)
+
+    def append_daily_snapshot(self, board_id, board_data, now=None, overwrite=False, actions=None):
+        """
+        Grava o snapshot do dia (idempotente). Retorna True se algo foi escrito.
+        O lock serializa as sessões do processo; entre processos (app e cron), cada escrita usa
+        um arquivo temporário próprio e o os.replace atômico troca o mês inteiro.
+        """
+        now = now or datetime.now(timezone.utc)
+        day = now.date()
+        with self._lock:
+            if not overwrite and self.has_snapshot(board_id, day):
+                return False
+
+            snapshot = build_daily_snapshot(board_data, now, actions)
+            month = day.strftime('%Y-%m')
+            month_df = self._read_month(board_id, month)
+            if not month_df.empty:
+                month_df = month_df[month_df['date'].dt.date != day]
+                snapshot = pd.concat([month_df, snapshot], ignore_index=True)
+            snapshot = snapshot.sort_values(['date', 'dimension', 'key'], ignore_index=True)
+
+            os.makedirs(self._board_dir(board_id), exist_ok=True)
+            path = self._month_path(board_id, month)
+            fd, tmp_path = tempfile.mkstemp(dir=self._board_dir(board_id), prefix=f"month={month}.", suffix=".tmp")
+            os.close(fd)
+            try:
+                snapshot.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+            self._written.add((board_id, day))
+        return True
+
+    def months(self, board_id):
+        """Meses disponíveis para o board (YYYY-MM), em ordem."""
+        pattern = os.path.join(self._board_dir(board_id), "month=*.parquet")
+        return sorted(os.path.basename(p)[len("month="):-len(".parquet")] for p in glob.glob(pattern))
+
+    def query(self, board_id, start, end, dimension=None):
+        """Série histórica entre start e end (datas inclusivas), opcionalmente de uma dimensão."""
+        start, end = _as_day(start), _as_day(end)
+        wanted = [m for m in self.months(board_id) if start.strftime('%Y-%m') <= m <= end.strftime('%Y-%m')]
+
+        frames = []
+        for month in wanted:
+            df = self._read_month(board_id, month)
+            if dimension:
+                df = df[df['dimension'] == dimension]
+            frames.append(df[(df['date'] >= start) & (df['date'] <= end)])
+
+        if not frames:
+            return pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def pivot(self, board_id, start, end, dimension):
+        """Série larga (data x chave) pronta para gráficos de tendência."""
+        df = self.query(board_id, start, end, dimension)
+        if df.empty:
+            return pd.DataFrame()
+        return df.pivot_table(index='date', columns='label', values='count', aggfunc='sum').fillna(0)
+
+
+def main():
+    # Job agendável (cron): python -m src.services.history_store --board <id>
+    from src.services.trello_service import TrelloService
+
+    parser = argparse.ArgumentParser(description="Grava o snapshot diário do board no histórico local.")
+    parser.add_argument("--board", default=os.getenv("TRELLO_BOARD_ID"), help="ID do board (default: TRELLO_BOARD_ID)")
+    parser.add_argument("--dir", default=None, help="Diretório do histórico (default: HISTORY_DIR)")
+    parser.add_argument("--overwrite", action="store_true", help="Regrava o snapshot do dia se já existir")
+    args = parser.parse_args()
+
+    service = TrelloService()
+    board_data = service.get_board_data(args.board)
+    if not board_data:
+        raise SystemExit(service.last_error or "Não foi possível carregar o board.")
+
+    written = HistoryStore(args.dir).append_daily_snapshot(
+        args.board, board_data, overwrite=args.overwrite, actions=service.get_actions(args.board)
+    )
+    print("Snapshot gravado." if written else "Snapshot do dia já existe.")
+
+
+if __name__ == "__main__":
+    main()
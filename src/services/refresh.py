@@ -0,0 +1,235 @@
+import atexit
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Intervalo de atualização por board: mais curto para boards movimentados, mais longo para os
+# parados, sempre dentro de [REFRESH_MIN_SECONDS, REFRESH_MAX_SECONDS]
+REFRESH_MIN_SECONDS = int(os.getenv("REFRESH_MIN_SECONDS", "60"))
+REFRESH_MAX_SECONDS = int(os.getenv("REFRESH_MAX_SECONDS", "1800"))
+# Intervalo antes de conhecer a atividade do board
+REFRESH_DEFAULT_SECONDS = int(os.getenv("SHARED_CACHE_TTL", "600"))
+# Mudanças esperadas entre duas atualizações: intervalo = alvo / taxa de ações
+REFRESH_TARGET_CHANGES = float(os.getenv("REFRESH_TARGET_CHANGES", "5"))
+# Janela (horas) usada para medir a taxa de ações do board
+REFRESH_RATE_WINDOW_HOURS = float(os.getenv("REFRESH_RATE_WINDOW_HOURS", "24"))
+# Orçamento de requisições/minuto para atualizações agendadas, somando todos os processos que
+# compartilham o cache em disco (app, alertas, snapshots); o limite do Trello é de 100
+# requisições a cada 10 s por token
+REFRESH_BUDGET_PER_MIN = float(os.getenv("REFRESH_BUDGET_PER_MIN", "30"))
+# Chamadas à API por atualização de board (board, ações, atribuições, checklists, arquivados)
+REQUESTS_PER_REFRESH = 5
+# Demanda de cada processo publicada ao lado do cache em disco compartilhado
+REFRESH_SHARED_DIR = os.path.join(os.getenv("SHARED_CACHE_DIR", os.path.join("data", "cache")), "_refresh")
+# Releitura da demanda dos outros processos (s); publicações mais velhas que o limite são de
+# processos encerrados (jobs agendados republicam a cada execução)
+_PEERS_READ_SECONDS = 30
+_PEER_STALE_SECONDS = 2 * REFRESH_MAX_SECONDS
+
+
+def action_rate(actions, now=None, window_hours=REFRESH_RATE_WINDOW_HOURS):
+    """
+    Ações por hora do board na janela recente. Se o log carregado (limitado pela API) não cobre
+    a janela toda, a taxa é medida no período que ele cobre.
+    """
+    if not actions:
+        return 0.0
+    now = pd.Timestamp(now or datetime.now(timezone.utc))
+    dates = pd.to_datetime(pd.Series([a['date'] for a in actions], dtype=object), utc=True, errors='coerce').dropna()
+    start = now - pd.Timedelta(hours=window_hours)
+    recent = dates[dates > start]
+    if recent.empty:
+        return 0.0
+    covered_hours = window_hours if len(recent) < len(dates) else (now - recent.min()).total_seconds() / 3600
+    return len(recent) / max(covered_hours, 1 / 60)
+
+
+def interval_for_rate(rate):
+    """Intervalo (s) para esperar ~REFRESH_TARGET_CHANGES mudanças entre atualizações."""
+    if rate <= 0:
+        return REFRESH_MAX_SECONDS
+    return int(min(REFRESH_MAX_SECONDS, max(REFRESH_MIN_SECONDS, REFRESH_TARGET_CHANGES / rate * 3600)))
+
+
+class RefreshScheduler:
+    """
+    Agenda de atualização dos boards: cada board tem um intervalo derivado da sua taxa de ações
+    e uma época que avança quando o intervalo vence. Os caches da UI usam a época como chave
+    (época nova = busca nova) e o cache em disco usa o tempo desde o início da época como
+    validade. Se a soma das atualizações passar do orçamento de requisições, todos os intervalos
+    são esticados na mesma proporção. O orçamento é dividido entre os processos: cada um publica
+    os intervalos dos seus boards em `shared_dir` e a demanda conta cada board uma vez, pelo menor
+    intervalo (o cache em disco faz os processos dividirem as buscas do mesmo board).
+    Quando a época de um board avança, os ouvintes (on_advance) descartam as entradas da época
+    anterior nos caches da UI.
+    """
+
+    def __init__(self, budget_per_min=REFRESH_BUDGET_PER_MIN, shared_dir=REFRESH_SHARED_DIR):
+        self.budget_per_min = budget_per_min
+        self.shared_dir = shared_dir
+        self._boards = {}  # board_id -> {"epoch", "started_at", "base_interval", "rate", "version"}
+        self._lock = threading.Lock()
+        self._listeners = {}
+        self._peers = {}  # board_id -> menor intervalo publicado pelos outros processos
+        self._peers_read_at = 0.0
+        self._published_at = 0.0
+        self._publish_path = os.path.join(shared_dir, f"{socket.gethostname()}-{os.getpid()}.json") if shared_dir else None
+
+    def on_advance(self, name, fn):
+        """Registra fn(board_id, época anterior), chamado quando a época de um board avança (nome único: re-registrar substitui)."""
+        with self._lock:
+            self._listeners[name] = fn
+
+    def _notify(self, board_id, old_epoch):
+        for fn in list(self._listeners.values()):
+            try:
+                fn(board_id, old_epoch)
+            except Exception:
+                pass
+
+    def _publish(self, now):
+        """Grava os intervalos dos boards deste processo (chamado com o lock)."""
+        if not self._publish_path:
+            return
+        self._published_at = now
+        try:
+            os.makedirs(self.shared_dir, exist_ok=True)
+            tmp_path = f"{self._publish_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({board_id: s["base_interval"] for board_id, s in self._boards.items()}, f)
+            os.replace(tmp_path, self._publish_path)
+        except OSError:
+            pass
+
+    def _read_peers(self, now):
+        """Menor intervalo por board entre os outros processos ativos (chamado com o lock)."""
+        self._peers_read_at = now
+        peers = {}
+        try:
+            names = os.listdir(self.shared_dir)
+        except OSError:
+            names = []
+        for name in names:
+            path = os.path.join(self.shared_dir, name)
+            if not name.endswith(".json") or path == self._publish_path:
+                continue
+            try:
+                if now - os.path.getmtime(path) > _PEER_STALE_SECONDS:
+                    continue
+                with open(path, encoding="utf-8") as f:
+                    for board_id, interval in json.load(f).items():
+                        peers[board_id] = min(interval, peers.get(board_id, interval))
+            except (OSError, ValueError, AttributeError):
+                continue
+        self._peers = peers
+
+    def unpublish(self):
+        """Remove a publicação deste processo (ao encerrar)."""
+        if self._publish_path:
+            try:
+                os.remove(self._publish_path)
+            except OSError:
+                pass
+
+    def _state(self, board_id):
+        return self._boards.setdefault(board_id, {
+            "epoch": 0, "started_at": None, "base_interval": REFRESH_DEFAULT_SECONDS, "rate": None, "version": None,
+        })
+
+    def _budget_factor(self):
+        """>= 1: quanto os intervalos precisam crescer para caber no orçamento (todos os processos)."""
+        if self.budget_per_min <= 0:
+            return 1.0
+        now = time.time()
+        if self.shared_dir and now - self._peers_read_at > _PEERS_READ_SECONDS:
+            self._read_peers(now)
+            # Republica periodicamente: mantém a publicação viva para os outros processos
+            if self._boards and now - self._published_at > _PEERS_READ_SECONDS:
+                self._publish(now)
+        intervals = dict(self._peers)
+        for board_id, state in self._boards.items():
+            intervals[board_id] = min(state["base_interval"], intervals.get(board_id, state["base_interval"]))
+        demand = sum(REQUESTS_PER_REFRESH * 60 / interval for interval in intervals.values())
+        return max(1.0, demand / self.budget_per_min)
+
+    def interval(self, board_id):
+        """Intervalo (s) atual do board, já ajustado ao orçamento."""
+        with self._lock:
+            return int(self._state(board_id)["base_interval"] * self._budget_factor())
+
+    def epoch(self, board_id, now=None):
+        """Época do board em `now` (avança quando o intervalo desde o início da época vence)."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            state = self._state(board_id)
+            old_epoch = state["epoch"]
+            if state["started_at"] is None:
+                state["started_at"] = now
+            elif now - state["started_at"] >= state["base_interval"] * self._budget_factor():
+                state["epoch"] += 1
+                state["started_at"] = now
+            epoch = state["epoch"]
+        if epoch != old_epoch:
+            self._notify(board_id, old_epoch)
+        return epoch
+
+    def max_age(self, board_id, now=None):
+        """
+        Idade máxima (s) aceita no cache em disco: na primeira época vale o intervalo (dados de
+        outro processo ainda servem); depois, só o que foi gravado desde o início da época.
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            state = self._state(board_id)
+            interval = state["base_interval"] * self._budget_factor()
+            if state["epoch"] == 0 or state["started_at"] is None:
+                return interval
+            return max(0.0, now - state["started_at"])
+
+    def observe(self, board_id, actions, now=None):
+        """Atualiza a taxa de ações do board (só quando o log de ações mudou)."""
+        version = f"{len(actions or [])}:{actions[0].get('id')}" if actions else "0"
+        with self._lock:
+            if self._state(board_id)["version"] == version:
+                return
+        rate = action_rate(actions, pd.Timestamp(now, unit='s', tz='UTC') if now is not None else None)
+        with self._lock:
+            state = self._state(board_id)
+            changed = state["base_interval"] != interval_for_rate(rate)
+            state.update(version=version, rate=rate, base_interval=interval_for_rate(rate))
+            if changed:
+                self._publish(time.time())
+
+    def invalidate(self, board_id, now=None):
+        """Sincronização manual: abre uma época nova imediatamente."""
+        with self._lock:
+            state = self._state(board_id)
+            old_epoch = state["epoch"]
+            state["epoch"] += 1
+            state["started_at"] = now if now is not None else time.time()
+        self._notify(board_id, old_epoch)
+
+    def status(self, board_id):
+        """{"epoch", "rate", "interval", "refreshed_at", "next_refresh"} (timestamps em s) para a UI."""
+        with self._lock:
+            state = self._state(board_id)
+            interval = state["base_interval"] * self._budget_factor()
+            started = state["started_at"] or time.time()
+            return {
+                "epoch": state["epoch"],
+                "rate": state["rate"],
+                "interval": int(interval),
+                "budget_factor": round(self._budget_factor(), 2),
+                "refreshed_at": started,
+                "next_refresh": started + interval,
+            }
+
+
+# Instância única por processo, compartilhada por todas as sessões e jobs
+refresh_scheduler = RefreshScheduler()
+atexit.register(refresh_scheduler.unpublish)
@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import time
+
+from src.services.trello_service import TrelloService
+from src.services.refresh import refresh_scheduler
+
+# Cache em disco compartilhado entre processos (app, alertas, portfólio, snapshots):
+# cada board é buscado no Trello no máximo uma vez por intervalo de atualização
+# (src.services.refresh; SHARED_CACHE_TTL é o padrão enquanto a atividade do board é desconhecida)
+SHARED_CACHE_DIR = os.getenv("SHARED_CACHE_DIR", os.path.join("data", "cache"))
+SHARED_CACHE_TTL = int(os.getenv("SHARED_CACHE_TTL", "600"))
+# Lock de outro processo mais velho que isso é considerado abandonado
+_LOCK_STALE_SECONDS = 60
+
+
+def configured_board_ids():
+    """Boards configurados: TRELLO_BOARD_IDS (separados por vírgula) ou TRELLO_BOARD_ID."""
+    ids = os.getenv("TRELLO_BOARD_IDS") or os.getenv("TRELLO_BOARD_ID") or ""
+    return [board_id.strip() for board_id in ids.split(",") if board_id.strip()]
+
+
+class DiskTTLCache:
+    """
+    Cache JSON em disco com TTL. Buscas concorrentes da mesma chave (threads ou processos)
+    esperam a primeira terminar em vez de repetir a chamada à API.
+    """
+
+    def __init__(self, base_dir=None, ttl=SHARED_CACHE_TTL):
+        self.base_dir = base_dir or SHARED_CACHE_DIR
+        self.ttl = ttl
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.base_dir, *[str(part) for part in key]) + ".json"
+
+    def _read_fresh(self, path, max_age=None):
+        try:
+            if time.time() - os.path.getmtime(path) > (self.ttl if max_age is None else max_age):
+                return None
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _thread_lock(self, path):
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def _acquire_file_lock(self, lock_path):
+        """Lock entre processos via arquivo exclusivo. Retorna False se outro processo está buscando."""
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.close(fd)
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > _LOCK_STALE_SECONDS:
+                    os.remove(lock_path)
+            except OSError:
+                pass
+            return False
+
+    def get_or_fetch(self, key, fetch, cacheable=lambda value: value is not None, max_age=None):
+        """
+        Valor em cache para `key` (tupla) ou resultado de fetch(), gravado se cacheable(valor).
+        `max_age` (s) substitui o TTL padrão nesta leitura.
+        """
+        path = self._path(key)
+        value = self._read_fresh(path, max_age)
+        if value is not None:
+            return value
+
+        with self._thread_lock(path):
+            value = self._read_fresh(path, max_age)
+            if value is not None:
+                return value
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            lock_path = f"{path}.lock"
+            deadline = time.time() + _LOCK_STALE_SECONDS
+            while not self._acquire_file_lock(lock_path):
+                # Outro processo buscando: aguarda o resultado dele
+                time.sleep(0.2)
+                value = self._read_fresh(path, max_age)
+                if value is not None:
+                    return value
+                if time.time() > deadline:
+                    break
+            try:
+                value = fetch()
+                if cacheable(value):
+                    tmp_path = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump(value, f)
+                    os.replace(tmp_path, path)
+                return value
+            finally:
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    pass
+
+    def invalidate(self, *prefix):
+        """Remove as entradas sob o prefixo (ex.: invalidate('b1') descarta tudo do board)."""
+        target = os.path.join(self.base_dir, *[str(part) for part in prefix])
+        if os.path.isfile(target + ".json"):
+            os.remove(target + ".json")
+        if os.path.isdir(target):
+            for root, _, files in os.walk(target):
+                for name in files:
+                    if name.endswith(".json"):
+                        try:
+                            os.remove(os.path.join(root, name))
+                        except OSError:
+                            pass
+
+
+class SharedCacheTrelloService(TrelloService):
+    """
+    TrelloService com as cargas de board passando pelo cache em disco compartilhado.
+    A validade de cada board segue o refresh_scheduler, alimentado pelas ações carregadas.
+    """
+
+    def __init__(self, api_key=None, token=None, cache=None):
+        super().__init__(api_key, token)
+        self.cache = cache or DiskTTLCache()
+
+    def _cached(self, key, fetch):
+        def guarded_fetch():
+            self.last_error = None
+            return fetch()
+        # Respostas de erro (last_error preenchido) não vão para o cache
+        return self.cache.get_or_fetch(key, guarded_fetch, lambda value: value is not None and not self.last_error,
+                                       max_age=refresh_scheduler.max_age(key[0]))
+
+    def get_board_data(self, board_id):
+        return self._cached((board_id, "board"), lambda: TrelloService.get_board_data(self, board_id))
+
+    def get_actions(self, board_id, limit=1000):
+        actions = self._cached((board_id, f"actions-{limit}"), lambda: TrelloService.get_actions(self, board_id, limit))
+        # Taxa de ações do board define o próximo intervalo de atualização
+        refresh_scheduler.observe(board_id, actions)
+        return actions
+
+    def get_assignments(self, board_id, limit=1000):
+        return self._cached((board_id, f"assignments-{limit}"), lambda: TrelloService.get_assignments(self, board_id, limit))
+
+    def get_board_checklists(self, board_id):
+        return self._cached((board_id, "checklists"), lambda: TrelloService.get_board_checklists(self, board_id))
+
+    def invalidate_board(self, board_id):
+        """Força nova busca do board no próximo acesso (ex.: sincronização manual)."""
+        self.cache.invalidate(board_id)
+        refresh_scheduler.invalidate(board_id)
@@ -1,16 +1,27 @@
 import requests
-import streamlit as st
 import os
 from datetime import datetime, timezone
 from dotenv import load_dotenv
+from src.services.card_cache import card_detail_cache
 
 load_dotenv()
 
+# Permite apontar para um servidor local (ex.: python -m src.fake_trello) em testes de carga
+TRELLO_BASE_URL = os.getenv("TRELLO_BASE_URL", "https://api.trello.com/1")
+
+
 class TrelloService:
+    """
+    Cliente da API do Trello sem dependência de Streamlit (usado pelo dashboard, CLI e jobs).
+    O cache por sessão/processo da UI fica em src.ui.trello_cache.CachedTrelloService.
+    """
+
     def __init__(self, api_key=None, token=None):
         self.api_key = api_key or os.getenv("TRELLO_API_KEY")
         self.token = token or os.getenv("TRELLO_TOKEN")
-        self.base_url = "https://api.trello.com/1"
+        self.base_url = TRELLO_BASE_URL.rstrip("/")
+        # Última falha de rede/API (a UI exibe, a CLI reporta)
+        self.last_error = None
 
     def _get_auth_params(self):
         return {
@@ -18,12 +29,11 @@ class TrelloService:
             "token": self.token
         }
 
-    @st.cache_data(ttl=600, show_spinner="Coletando dados do Trello...")
-    def get_board_data(_self, board_id):
+    def get_board_data(self, board_id):
         """Fetch all necessary board data in parallel-ish via API fields."""
-        url = f"{_self.base_url}/boards/{board_id}"
+        url = f"{self.base_url}/boards/{board_id}"
         params = {
-            **_self._get_auth_params(),
+            **self._get_auth_params(),
             "lists": "open",
             "cards": "visible",
             "members": "all",
@@ -36,14 +46,13 @@ class TrelloService:
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
-            st.error(f"Erro na API do Trello: {e}")
+            self.last_error = f"Erro na API do Trello: {e}"
             return None
 
-    @st.cache_data(ttl=600)
-    def get_actions(_self, board_id, limit=1000):
-        url = f"{_self.base_url}/boards/{board_id}/actions"
+    def get_actions(self, board_id, limit=1000):
+        url = f"{self.base_url}/boards/{board_id}/actions"
         params = {
-            **_self._get_auth_params(),
+            **self._get_auth_params(),
             "filter": "updateCard:idList,createCard",
             "limit": limit
         }
@@ -51,9 +60,110 @@ class TrelloService:
             response = requests.get(url, params=params, timeout=15)
             response.raise_for_status()
             return response.json()
-        except Exception:
+        except Exception as e:
+            self.last_error = f"Erro na API do Trello: {e}"
+            return []
+
+    def get_assignments(self, board_id, limit=1000):
+        """
+        Atribuições de membros a cards (addMemberToCard), mais recentes primeiro. Chamada
+        separada de get_actions para não consumir o limite usado por throughput e insights.
+        """
+        url = f"{self.base_url}/boards/{board_id}/actions"
+        params = {
+            **self._get_auth_params(),
+            "filter": "addMemberToCard",
+            "limit": limit
+        }
+        try:
+            response = requests.get(url, params=params, timeout=15)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            self.last_error = f"Erro na API do Trello: {e}"
             return []
 
+    def get_closed_cards(self, board_id, before=None, limit=1000):
+        """
+        Uma página de cards arquivados do board (ids mais novos primeiro).
+        `before` = id do último card da página anterior. Retorna None em caso de falha.
+        """
+        url = f"{self.base_url}/boards/{board_id}/cards/closed"
+        params = {
+            **self._get_auth_params(),
+            "fields": "name,idList,idMembers,idLabels,due,dueComplete,dateLastActivity,url,closed",
+            "limit": limit
+        }
+        if before:
+            params["before"] = before
+        try:
+            response = requests.get(url, params=params, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            self.last_error = f"Erro na API do Trello: {e}"
+            return None
+
+    def get_closing_actions(self, board_id, since, before=None, limit=1000):
+        """Página de ações de arquivar/desarquivar card (updateCard:closed) desde `since`. None em falha."""
+        url = f"{self.base_url}/boards/{board_id}/actions"
+        params = {
+            **self._get_auth_params(),
+            "filter": "updateCard:closed",
+            "since": since,
+            "limit": limit
+        }
+        if before:
+            params["before"] = before
+        try:
+            response = requests.get(url, params=params, timeout=15)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            self.last_error = f"Erro na API do Trello: {e}"
+            return None
+
+    def get_cards(self, card_ids):
+        """Cards por id via /batch (até 10 por chamada). Retorna só os encontrados; None em falha."""
+        cards = []
+        card_ids = list(card_ids)
+        try:
+            for i in range(0, len(card_ids), 10):
+                params = {**self._get_auth_params(), "urls": ",".join(f"/cards/{cid}" for cid in card_ids[i:i + 10])}
+                response = requests.get(f"{self.base_url}/batch", params=params, timeout=15)
+                response.raise_for_status()
+                cards.extend(result["200"] for result in response.json() if "200" in result)
+        except Exception as e:
+            self.last_error = f"Erro na API do Trello: {e}"
+            return None
+        return cards
+
+    def get_board_checklists(self, board_id):
+        """Todos os checklists do board em uma única chamada (apenas o necessário para progresso)."""
+        url = f"{self.base_url}/boards/{board_id}/checklists"
+        params = {
+            **self._get_auth_params(),
+            "fields": "idCard,name",
+            "checkItems": "all",
+            "checkItem_fields": "name,state"
+        }
+        try:
+            response = requests.get(url, params=params, timeout=15)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            self.last_error = f"Erro na API do Trello: {e}"
+            return []
+
+    def get_me(self):
+        """Membro dono do token ({"id", "fullName", ...}) ou None."""
+        try:
+            res = requests.get(f"{self.base_url}/members/me", params={**self._get_auth_params(), "fields": "fullName,username"}, timeout=5)
+            res.raise_for_status()
+            return res.json()
+        except Exception:
+            return None
+
     def validate_auth(self):
         url = f"{self.base_url}/members/me"
         try:
@@ -61,24 +171,40 @@ class TrelloService:
             return res.status_code == 200
         except:
             return False
-    @st.cache_data(ttl=300)
-    def get_card_details(_self, card_id):
-        """Fetch detailed card info: checklists, attachments, and recent activity."""
-        # endpoints em paralelo via batch se fosse complexo, mas aqui faremos direto
+    def get_card_details(self, card_id, include_checklists=True):
+        """Fetch detailed card info: checklists, attachments, and recent activity.
+        Com include_checklists=False os checklists vêm da carga em massa do board (uma chamada a menos).
+        Resultados ficam no cache LRU limitado por bytes (card_detail_cache), invalidado por mudanças no card."""
+        cached = card_detail_cache.get(card_id, variant=include_checklists)
+        if cached is not None:
+            return cached
+
+        # Uma única chamada /batch em vez de uma requisição por endpoint
         endpoints = {
-            "checklists": f"{_self.base_url}/cards/{card_id}/checklists",
-            "actions": f"{_self.base_url}/cards/{card_id}/actions",
-            "attachments": f"{_self.base_url}/cards/{card_id}/attachments"
+            "checklists": f"/cards/{card_id}/checklists",
+            "actions": f"/cards/{card_id}/actions?limit=10",
+            "attachments": f"/cards/{card_id}/attachments"
         }
-        
-        details = {}
-        for key, url in endpoints.items():
-            try:
-                params = _self._get_auth_params()
-                if key == "actions":
-                    params["limit"] = 10
-                response = requests.get(url, params=params, timeout=10)
-                details[key] = response.json() if response.status_code == 200 else []
-            except:
-                details[key] = []
+        if not include_checklists:
+            endpoints.pop("checklists")
+
+        details = {key: [] for key in endpoints}
+        complete = False
+        try:
+            params = {**self._get_auth_params(), "urls": ",".join(endpoints.values())}
+            response = requests.get(f"{self.base_url}/batch", params=params, timeout=10)
+            if response.status_code == 200:
+                results = response.json()
+                # Cada item vem como {"200": payload} ou como objeto de erro
+                complete = len(results) == len(endpoints)
+                for key, result in zip(endpoints, results):
+                    if "200" in result:
+                        details[key] = result["200"]
+                    else:
+                        complete = False
+        except Exception:
+            complete = False
+        # Respostas com falha não são cacheadas: a próxima abertura tenta de novo
+        if complete:
+            card_detail_cache.put(card_id, details, variant=include_checklists)
         return details
@@ -0,0 +1,46 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+VISITS_DIR = os.getenv("VISITS_DIR", os.path.join("data", "visits"))
+
+
+class VisitStore:
+    """
+    Última visita de cada usuário por board: <base_dir>/<board_id>.json =
+    {user: {"seen_at": ISO, "version": data (ns) da ação mais recente vista}}.
+    Gravação atômica (tmp + replace); o lock serializa as sessões do mesmo processo.
+    """
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir or VISITS_DIR
+        self._lock = threading.Lock()
+
+    def _path(self, board_id):
+        return os.path.join(self.base_dir, f"{board_id}.json")
+
+    def _load(self, board_id):
+        try:
+            with open(self._path(board_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def last_visit(self, board_id, user):
+        """{"seen_at", "version"} da última visita do usuário ao board, ou None."""
+        return self._load(board_id).get(user)
+
+    def mark_seen(self, board_id, user, version, now=None):
+        """Registra que o usuário viu o board até `version`. Retorna o registro gravado."""
+        now = now or datetime.now(timezone.utc)
+        record = {"seen_at": now.isoformat(), "version": int(version)}
+        with self._lock:
+            visits = self._load(board_id)
+            visits[user] = record
+            os.makedirs(self.base_dir, exist_ok=True)
+            path = self._path(board_id)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(visits, f)
+            os.replace(f"{path}.tmp", path)
+        return record
@@ -0,0 +1,98 @@
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+# Orçamento de tempo de import das páginas (ms), medido num processo Python novo
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "2500"))
+# Módulos que só podem ser carregados sob demanda (ex.: ao renderizar o primeiro gráfico).
+# O streamlit já importa plotly/plotly.graph_objects (leves); o custo está no plotly.express.
+LAZY_MODULES = ("plotly.express", "pyarrow.parquet")
+ENTRYPOINTS = ("app.py", "pages/explorer.py", "pages/portfolio.py")
+
+_PROBE = """
+import sys, time
+preloaded = set(sys.modules)
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+print((time.perf_counter() - start) * 1000)
+print(",".join(sorted(sys.modules)))
+print(",".join(sorted(preloaded)))
+"""
+
+
+def entrypoint_imports(path):
+    """Módulos importados no topo de um script Streamlit (o que o cold start paga antes do 1º paint)."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def measure_imports(modules, cwd="."):
+    """
+    Importa os módulos num interpretador novo com -X importtime.
+    Retorna (total_ms, {módulo: ms cumulativo dos imports de primeiro nível}, módulos carregados).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE, *modules],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    per_module = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Apenas imports de primeiro nível (indentação de 1 espaço): evita contar em dobro
+        if name.startswith(" ") and not name.startswith("  ") and cumulative.strip().isdigit():
+            per_module[name.strip()] = int(cumulative) / 1000
+    total_line, loaded_line, preloaded_line = result.stdout.strip().splitlines()[-3:]
+    # Módulos carregados pelo próprio interpretador (site, encodings...) ficam fora do relatório
+    for name in preloaded_line.split(","):
+        per_module.pop(name, None)
+    return float(total_line), per_module, set(loaded_line.split(","))
+
+
+def check_entrypoint(path, budget_ms=STARTUP_BUDGET_MS, lazy_modules=LAZY_MODULES, cwd="."):
+    """Mede o import de uma página e aponta violações (orçamento estourado, módulo pesado carregado cedo)."""
+    total_ms, per_module, loaded = measure_imports(entrypoint_imports(os.path.join(cwd, path)), cwd=cwd)
+    eager = sorted(m for m in lazy_modules if m in loaded)
+    problems = []
+    if total_ms > budget_ms:
+        problems.append(f"{path}: {total_ms:.0f} ms > orçamento de {budget_ms:.0f} ms")
+    if eager:
+        problems.append(f"{path}: módulos que deveriam ser lazy foram importados: {', '.join(eager)}")
+    return {"entrypoint": path, "total_ms": total_ms, "modules": per_module, "problems": problems}
+
+
+def main(argv=None):
+    # Uso (CI/deploy): python -m src.startup [--budget-ms 2500] [--top 10]
+    parser = argparse.ArgumentParser(description="Relatório de tempo de import das páginas e checagem de orçamento.")
+    parser.add_argument("entrypoints", nargs="*", default=list(ENTRYPOINTS), help="Scripts a medir")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS, help="Orçamento por página (ms)")
+    parser.add_argument("--top", type=int, default=10, help="Quantos módulos listar por página")
+    args = parser.parse_args(argv)
+
+    problems = []
+    for path in args.entrypoints:
+        report = check_entrypoint(path, args.budget_ms)
+        print(f"{path}: {report['total_ms']:.0f} ms (orçamento {args.budget_ms:.0f} ms)")
+        top = sorted(report["modules"].items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+        for name, ms in top:
+            print(f"  {ms:8.1f} ms  {name}")
+        problems.extend(report["problems"])
+
+    for problem in problems:
+        print(f"FALHA: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
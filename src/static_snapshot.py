@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import re
+import time
+from datetime import datetime, timezone
+from html import escape
+
+from src.metrics import WIP_CHART_EXCLUDE_PATTERN
+from src.report import load_board, build_report
+from src.services.shared_cache import SharedCacheTrelloService
+from src.ui.html import kpi_card_html, insight_card_html, bar_chart_html, column_chart_html, page_html
+
+# Snapshots servidos como arquivos estáticos (Streamlit /app/static ou qualquer servidor/CDN)
+SNAPSHOTS_DIR = os.path.join("static", "snapshots")
+SNAPSHOT_INTERVAL_MIN = int(os.getenv("SNAPSHOT_INTERVAL_MIN", "5"))
+# Semanas exibidas no gráfico de throughput
+SNAPSHOT_THROUGHPUT_WEEKS = 12
+
+
+def render_overview_html(report, refresh_seconds=None):
+    """Visão geral do board (KPIs, distribuições, throughput, insights) em HTML autocontido."""
+    kpis = report["kpis"]
+    generated = datetime.fromisoformat(report["generated_at"]).astimezone(timezone.utc)
+    wip = {name: count for name, count in report["lists"].items()
+           if not re.search(WIP_CHART_EXCLUDE_PATTERN, name, re.IGNORECASE)}
+    weeks = list(report["throughput_weekly"].items())[-SNAPSHOT_THROUGHPUT_WEEKS:]
+
+    kpi_cards = "".join([
+        kpi_card_html("Total Registros", kpis["total"], "Volume total", "📝"),
+        kpi_card_html("Em Execução", kpis["wip"], "Cards ativos (WIP)", "⚙️"),
+        kpi_card_html("Atrasados", kpis["overdue"], "Vencidos e pendentes", "🚨"),
+        kpi_card_html("Sem Dono", kpis["unassigned"], "Aguardando atribuição", "👤"),
+    ])
+    insights = "".join(insight_card_html(i) for i in report["insights"]) or \
+        '<p style="color:#66BB6A">Tudo certo! Nenhuma anomalia detectada no momento.</p>'
+
+    body = f"""
+    <h1>{escape(report["board"]["name"] or "Board")}</h1>
+    <div class="meta">Snapshot gerado em {generated:%d/%m/%Y %H:%M} UTC · versão estática (sem filtros).
+    Para filtrar, use o dashboard interativo.</div>
+    <div class="grid kpis">{kpi_cards}</div>
+    <div class="grid panels">
+        <div class="panel"><h2>Volume por Fase</h2>{bar_chart_html(report["lists"].items())}</div>
+        <div class="panel"><h2>Distribuição do WIP</h2>{bar_chart_html(wip.items(), color="#29B6F6")}</div>
+        <div class="panel"><h2>Cards por Membro</h2>{bar_chart_html(report["members"].items(), color="#66BB6A")}</div>
+        <div class="panel"><h2>Entregas por Semana</h2>{column_chart_html((w[5:], c) for w, c in weeks)}</div>
+        <div class="panel" style="grid-column: 1 / -1;"><h2>🧠 Insights Automáticos</h2>{insights}</div>
+    </div>
+    """
+    return page_html(f"{report['board']['name']} | Núcleo Digital", body, refresh_seconds)
+
+
+def _write_atomic(path, content):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_snapshot(report, out_dir=SNAPSHOTS_DIR, refresh_seconds=None):
+    """Grava index.html e overview.json em <out_dir>/<board_id>/. Retorna o diretório."""
+    board_dir = os.path.join(out_dir, str(report["board"]["id"]))
+    os.makedirs(board_dir, exist_ok=True)
+    _write_atomic(os.path.join(board_dir, "overview.json"),
+                  json.dumps(report, ensure_ascii=False, default=str))
+    _write_atomic(os.path.join(board_dir, "index.html"), render_overview_html(report, refresh_seconds))
+    return board_dir
+
+
+def snapshot_url(board_id):
+    """URL do snapshot servido pelo Streamlit (server.enableStaticServing)."""
+    return f"app/static/snapshots/{board_id}/index.html"
+
+
+def render_boards(board_ids, out_dir=SNAPSHOTS_DIR, refresh_seconds=None, service=None):
+    """Renderiza o snapshot de cada board. Retorna {board_id: diretório ou mensagem de erro}."""
+    service = service or SharedCacheTrelloService()
+    results = {}
+    for board_id in board_ids:
+        try:
+            snapshot, actions = load_board(service, board_id)
+        except RuntimeError as e:
+            results[board_id] = f"erro: {e}"
+            continue
+        report = build_report(snapshot, actions, board_id=board_id)
+        results[board_id] = write_snapshot(report, out_dir, refresh_seconds)
+    return results
+
+
+def main(argv=None):
+    # Uso: python -m src.static_snapshot --board <id> [--every 5]  (ou agendado via cron sem --every)
+    parser = argparse.ArgumentParser(description="Gera snapshots estáticos (HTML/JSON) da visão geral dos boards.")
+    parser.add_argument("--board", nargs="+", default=[os.getenv("TRELLO_BOARD_ID")], help="IDs dos boards")
+    parser.add_argument("--out", default=SNAPSHOTS_DIR, help="Diretório de saída")
+    parser.add_argument("--every", type=int, default=0,
+                        help="Regenera a cada N minutos (0 = uma vez; ex.: SNAPSHOT_INTERVAL_MIN)")
+    args = parser.parse_args(argv)
+
+    boards = [b for b in args.board if b]
+    if not boards:
+        parser.error("informe --board ou defina TRELLO_BOARD_ID")
+
+    # A página se recarrega no mesmo ritmo da geração
+    refresh_seconds = args.every * 60 if args.every else SNAPSHOT_INTERVAL_MIN * 60
+    while True:
+        for board_id, result in render_boards(boards, args.out, refresh_seconds).items():
+            print(f"{board_id}: {result}")
+        if not args.every:
+            break
+        time.sleep(args.every * 60)
+
+
+if __name__ == "__main__":
+    main()
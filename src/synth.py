@@ -0,0 +1,169 @@
+import random
+from datetime import datetime, timezone, timedelta
+
+# Listas típicas de um board do Núcleo (fluxo + listas fora do WIP)
+SYNTH_LISTS = ["Backlog", "A Fazer", "Em Andamento", "Revisão", "Bloqueado", "Concluído", "Arquivado"]
+# Peso de cada lista na distribuição dos cards (mesma ordem de SYNTH_LISTS)
+SYNTH_LIST_WEIGHTS = [0.25, 0.15, 0.12, 0.06, 0.04, 0.33, 0.05]
+SYNTH_LABEL_COLORS = ["green", "yellow", "orange", "red", "purple", "blue", "sky", "lime", "pink", "black"]
+
+
+def _trello_id(rng, created=None):
+    """ID no formato do Trello (24 hex); com `created`, os 8 primeiros hex são o timestamp de criação."""
+    if created is None:
+        return f"{rng.getrandbits(96):024x}"
+    return f"{int(created.timestamp()):08x}{rng.getrandbits(64):016x}"
+
+
+def _iso(dt):
+    """Data no formato retornado pela API (ms + 'Z')."""
+    return dt.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def generate_board(n_cards=1000, n_actions=None, n_members=25, n_labels=10, checklist_ratio=0.4,
+                   history_days=180, seed=42, now=None):
+    """
+    Gera um board sintético com o formato da API do Trello, em escala configurável
+    (cards apenas com os card_fields pedidos por TrelloService.get_board_data).
+    Retorna (board_data, actions, checklists) — os mesmos payloads de get_board_data,
+    get_actions e get_board_checklists.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+    n_actions = n_cards * 2 if n_actions is None else n_actions
+
+    lists = [{"id": _trello_id(rng), "name": name, "closed": False, "pos": (i + 1) * 16384}
+             for i, name in enumerate(SYNTH_LISTS)]
+    members = [{"id": _trello_id(rng), "fullName": f"Membro {i + 1:03d}", "username": f"membro{i + 1:03d}"}
+               for i in range(n_members)]
+    labels = [{"id": _trello_id(rng), "name": f"Label {i + 1}", "color": SYNTH_LABEL_COLORS[i % len(SYNTH_LABEL_COLORS)]}
+              for i in range(n_labels)]
+    member_ids = [m["id"] for m in members]
+    label_ids = [lbl["id"] for lbl in labels]
+    history_seconds = history_days * 86400
+
+    cards = []
+    card_lists = rng.choices(lists, weights=SYNTH_LIST_WEIGHTS, k=n_cards)
+    for i, lst in enumerate(card_lists):
+        last_activity = now - timedelta(seconds=rng.randint(0, history_seconds))
+        has_due = rng.random() < 0.55
+        due = last_activity + timedelta(days=rng.randint(-10, 30)) if has_due else None
+        created = last_activity - timedelta(seconds=rng.randint(0, 30 * 86400))
+        cards.append({
+            "id": _trello_id(rng, created),
+            "name": f"Card sintético {i + 1}",
+            "idList": lst["id"],
+            # ~20% sem responsável, maioria com 1
+            "idMembers": rng.sample(member_ids, min(len(member_ids), rng.choices([0, 1, 2, 3], [0.2, 0.55, 0.18, 0.07])[0])),
+            "idLabels": rng.sample(label_ids, min(len(label_ids), rng.choices([0, 1, 2], [0.35, 0.45, 0.2])[0])),
+            "due": _iso(due) if due else None,
+            "dueComplete": bool(has_due and lst["name"] in ("Concluído", "Arquivado")),
+            "dateLastActivity": _iso(last_activity),
+            "url": f"https://trello.com/c/{i:08x}",
+        })
+
+    # Ações mais recentes primeiro (ordem da API); ~30% criações, ~10% atribuições, resto movimentações
+    flow = [lst for lst in lists if lst["name"] not in ("Arquivado",)]
+    actions = []
+    offsets = sorted((rng.randint(0, history_seconds) for _ in range(n_actions)))
+    for offset in offsets:
+        card = cards[rng.randrange(n_cards)] if n_cards else {"id": _trello_id(rng), "name": ""}
+        member = rng.choice(members)
+        action = {
+            "id": _trello_id(rng),
+            "idMemberCreator": member["id"],
+            "date": _iso(now - timedelta(seconds=offset)),
+            "data": {"card": {"id": card["id"], "name": card["name"]}},
+        }
+        roll = rng.random()
+        if roll < 0.3:
+            action["type"] = "createCard"
+            action["data"]["list"] = {"id": lists[0]["id"], "name": lists[0]["name"]}
+        elif roll < 0.4:
+            assignee = rng.choice(members)
+            action["type"] = "addMemberToCard"
+            action["data"]["idMember"] = assignee["id"]
+            action["data"]["member"] = {"id": assignee["id"], "name": assignee["fullName"]}
+        else:
+            step = rng.randrange(len(flow) - 1)
+            before, after = flow[step], flow[step + 1]
+            action["type"] = "updateCard"
+            action["data"]["listBefore"] = {"id": before["id"], "name": before["name"]}
+            action["data"]["listAfter"] = {"id": after["id"], "name": after["name"]}
+            action["data"]["old"] = {"idList": before["id"]}
+        actions.append(action)
+
+    checklists = []
+    for card in cards:
+        if rng.random() >= checklist_ratio:
+            continue
+        n_items = rng.randint(1, 12)
+        done_ratio = rng.random()
+        checklists.append({
+            "id": _trello_id(rng),
+            "idCard": card["id"],
+            "name": "Checklist",
+            "checkItems": [
+                {"id": _trello_id(rng), "name": f"Item {j + 1}",
+                 "state": "complete" if rng.random() < done_ratio else "incomplete"}
+                for j in range(n_items)
+            ],
+        })
+
+    board_data = {
+        "id": _trello_id(rng),
+        "name": f"Board sintético ({n_cards} cards)",
+        "desc": "",
+        "url": "https://trello.com/b/synthetic",
+        "lists": lists,
+        "members": members,
+        "labels": labels,
+        "cards": cards,
+    }
+    return board_data, actions, checklists
+
+
+def generate_closed_cards(board_data, n_closed=1000, history_days=720, seed=42, now=None):
+    """
+    Cards arquivados sintéticos para o board (payload de /boards/<id>/cards/closed) e as ações
+    updateCard:closed correspondentes, mais recentes primeiro. ~70% foram concluídos antes de
+    arquivar (lista de conclusão), o resto foi descartado de outras listas.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+    lists = {lst["name"]: lst for lst in board_data["lists"]}
+    other_lists = [lst for name, lst in lists.items() if name not in ("Concluído", "Arquivado")]
+    member_ids = [m["id"] for m in board_data["members"]]
+    label_ids = [lbl["id"] for lbl in board_data["labels"]]
+
+    cards, actions = [], []
+    for i in range(n_closed):
+        closed_at = now - timedelta(seconds=rng.randint(3600, history_days * 86400))
+        created = closed_at - timedelta(seconds=rng.randint(86400, 60 * 86400))
+        done = rng.random() < 0.7
+        lst = lists["Concluído"] if done else rng.choice(other_lists)
+        card = {
+            "id": _trello_id(rng, created),
+            "name": f"Card arquivado {i + 1}",
+            "idList": lst["id"],
+            "idMembers": rng.sample(member_ids, min(len(member_ids), rng.choices([0, 1, 2], [0.15, 0.65, 0.2])[0])),
+            "idLabels": rng.sample(label_ids, min(len(label_ids), rng.choices([0, 1, 2], [0.35, 0.45, 0.2])[0])),
+            "due": None,
+            "dueComplete": done,
+            "dateLastActivity": _iso(closed_at),
+            "url": f"https://trello.com/c/c{i:07x}",
+            "closed": True,
+        }
+        cards.append(card)
+        actions.append({
+            "id": _trello_id(rng, closed_at),
+            "idMemberCreator": rng.choice(member_ids) if member_ids else None,
+            "type": "updateCard",
+            "date": _iso(closed_at),
+            "data": {"card": {"id": card["id"], "name": card["name"], "closed": True},
+                     "old": {"closed": False}, "list": {"id": lst["id"], "name": lst["name"]}},
+        })
+
+    cards.sort(key=lambda c: c["id"], reverse=True)
+    actions.sort(key=lambda a: a["date"], reverse=True)
+    return cards, actions
@@ -0,0 +1,166 @@
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Log estruturado: um JSON por trace ("-" = stderr, vazio = desligado)
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH", "")
+# Porta do endpoint Prometheus (/metrics); 0 = desligado
+TRACE_METRICS_PORT = int(os.getenv("TRACE_METRICS_PORT", "0"))
+# Limites (ms) do histograma exportado
+SPAN_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_metrics_lock = threading.Lock()
+_SPAN_METRICS = {}  # span -> {"count", "sum_ms", "buckets": [..]}
+_log_lock = threading.Lock()
+_metrics_server = None
+
+
+class Trace:
+    """Spans de uma execução (rerun do script ou de um fragment), com offsets relativos ao início."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.now(timezone.utc)
+        self._t0 = time.perf_counter()
+        self._depth = 0
+        self.spans = []
+        self.total_ms = None
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self._t0) * 1000
+
+    def to_dict(self):
+        return {
+            "trace": self.name,
+            "ts": self.started_at.isoformat(),
+            "total_ms": round(self.total_ms if self.total_ms is not None else self.elapsed_ms(), 2),
+            "spans": self.spans,
+        }
+
+
+def _observe(name, ms):
+    with _metrics_lock:
+        metric = _SPAN_METRICS.setdefault(name, {"count": 0, "sum_ms": 0.0, "buckets": [0] * len(SPAN_BUCKETS_MS)})
+        metric["count"] += 1
+        metric["sum_ms"] += ms
+        for i, limit in enumerate(SPAN_BUCKETS_MS):
+            if ms <= limit:
+                metric["buckets"][i] += 1
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Mede um estágio. Dentro de um trace ativo o span entra na cascata (waterfall);
+    fora dele só alimenta as métricas agregadas.
+    """
+    trace = _current_trace.get()
+    start = time.perf_counter()
+    record = None
+    if trace is not None:
+        record = {"name": name, "start_ms": round(trace.elapsed_ms(), 2), "depth": trace._depth, **attrs}
+        trace.spans.append(record)
+        trace._depth += 1
+    try:
+        yield record
+    finally:
+        ms = (time.perf_counter() - start) * 1000
+        if trace is not None:
+            trace._depth -= 1
+            record["ms"] = round(ms, 2)
+        _observe(name, ms)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def start_trace(name):
+    """Inicia um trace e o torna o ativo no contexto atual."""
+    trace = Trace(name)
+    trace._token = _current_trace.set(trace)
+    return trace
+
+
+def end_trace(trace):
+    """Fecha o trace, registra o total nas métricas e grava o log estruturado (se configurado)."""
+    trace.total_ms = trace.elapsed_ms()
+    try:
+        _current_trace.reset(trace._token)
+    except ValueError:
+        _current_trace.set(None)
+    _observe(f"{trace.name}.total", trace.total_ms)
+    _write_log(trace)
+    return trace
+
+
+def _write_log(trace):
+    if not TRACE_LOG_PATH:
+        return
+    line = json.dumps(trace.to_dict(), ensure_ascii=False, default=str)
+    with _log_lock:
+        if TRACE_LOG_PATH == "-":
+            print(line, file=sys.stderr)
+        else:
+            with open(TRACE_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def span_metrics():
+    with _metrics_lock:
+        return {name: {**m, "buckets": list(m["buckets"])} for name, m in _SPAN_METRICS.items()}
+
+
+def render_prometheus():
+    """Métricas dos spans no formato texto do Prometheus (histograma em ms)."""
+    lines = [
+        "# HELP dashboard_span_duration_ms Duração dos estágios do dashboard (ms)",
+        "# TYPE dashboard_span_duration_ms histogram",
+    ]
+    for name, metric in sorted(span_metrics().items()):
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        for limit, count in zip(SPAN_BUCKETS_MS, metric["buckets"]):
+            lines.append(f'dashboard_span_duration_ms_bucket{{span="{label}",le="{limit}"}} {count}')
+        lines.append(f'dashboard_span_duration_ms_bucket{{span="{label}",le="+Inf"}} {metric["count"]}')
+        lines.append(f'dashboard_span_duration_ms_sum{{span="{label}"}} {metric["sum_ms"]:.3f}')
+        lines.append(f'dashboard_span_duration_ms_count{{span="{label}"}} {metric["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(port=TRACE_METRICS_PORT, host="0.0.0.0"):
+    """Sobe o endpoint /metrics numa thread daemon (uma vez por processo). Retorna o servidor ou None."""
+    global _metrics_server
+    if not port or _metrics_server is not None:
+        return _metrics_server
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError:
+        # Porta ocupada (ex.: outra réplica no mesmo host): segue sem o endpoint
+        return None
+    threading.Thread(target=server.serve_forever, name="trace-metrics", daemon=True).start()
+    _metrics_server = server
+    return server
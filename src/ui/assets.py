@@ -0,0 +1,89 @@
+import base64
+import io
+import os
+from functools import lru_cache
+import streamlit as st
+
+ASSETS_DIR = "assets"
+# Pasta servida pelo Streamlit em /app/static quando server.enableStaticServing = true
+STATIC_DIR = "static"
+STATIC_ICONS_DIR = os.path.join(STATIC_DIR, "icons")
+
+# Ícones são exibidos com no máximo ~44px: 96px cobre telas de alta densidade
+ICON_MAX_SIZE = 96
+
+# Ícones usados nas páginas, pré-carregados uma vez por processo
+UI_ICONS = [
+    "edit.png", "gear.png", "siren.png", "user.png", "target.png", "arrow.png",
+    "settings.png", "cloud.png", "search.png",
+]
+
+
+def _optimize_png(data, max_size):
+    """Reduz o PNG para max_size (mantendo proporção) e recomprime. Sem Pillow, devolve o original."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return data
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.thumbnail((max_size, max_size))
+        out = io.BytesIO()
+        image.save(out, format="PNG", optimize=True)
+        optimized = out.getvalue()
+    except Exception:
+        return data
+    return optimized if len(optimized) < len(data) else data
+
+
+@lru_cache(maxsize=None)
+def load_asset(name, max_size=ICON_MAX_SIZE):
+    """Bytes otimizados de um asset (lidos do disco uma única vez por processo)."""
+    with open(os.path.join(ASSETS_DIR, name), "rb") as f:
+        data = f.read()
+    if name.endswith(".png"):
+        data = _optimize_png(data, max_size)
+    return data
+
+
+@lru_cache(maxsize=None)
+def asset_data_uri(name, max_size=ICON_MAX_SIZE):
+    """Data URI memoizado do asset."""
+    encoded = base64.b64encode(load_asset(name, max_size)).decode()
+    return f"data:image/png;base64,{encoded}"
+
+
+@lru_cache(maxsize=None)
+def _publish_static(name, max_size):
+    """Grava a versão otimizada em static/icons e retorna a URL servida pelo Streamlit."""
+    os.makedirs(STATIC_ICONS_DIR, exist_ok=True)
+    path = os.path.join(STATIC_ICONS_DIR, name)
+    data = load_asset(name, max_size)
+    if not os.path.exists(path) or os.path.getsize(path) != len(data):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return f"app/static/icons/{name}"
+
+
+def asset_src(name, max_size=ICON_MAX_SIZE):
+    """
+    URL para usar em <img src> / CSS url(): arquivo estático quando o static serving
+    está habilitado (payload HTML mínimo), senão data URI memoizado.
+    """
+    if st.get_option("server.enableStaticServing"):
+        try:
+            return _publish_static(name, max_size)
+        except OSError:
+            pass
+    return asset_data_uri(name, max_size)
+
+
+def preload_assets(names=UI_ICONS):
+    """Carrega e otimiza os ícones na inicialização (custo único por processo)."""
+    for name in names:
+        try:
+            asset_src(name)
+        except OSError:
+            pass
@@ -1,11 +1,15 @@
 import streamlit as st 
 import pandas as pd
-import plotly.express as px
-import base64
+import hashlib
 import os
+import threading
 import urllib.parse
+from collections import OrderedDict
 import textwrap
 from datetime import datetime, timezone, timedelta
+from src.ui.assets import asset_src
+from src.tracing import span
+from src.ui.html import insight_card_html
 
 def render_kpi_card_new(label, value, footer="Dados atualizados", icon="📊"):
     """
@@ -19,10 +23,7 @@ def render_kpi_card_new(label, value, footer="Dados atualizados", icon="📊"):
     # Lógica para ícones emoji ou PNG
     if icon.endswith(".png"):
         try:
-            with open(f"assets/{icon}", "rb") as f:
-                data = f.read()
-                encoded = base64.b64encode(data).decode()
-                icon_html = f'<img src="data:image/png;base64,{encoded}" class="kpi-icon-img" alt="icon">'
+            icon_html = f'<img src="{asset_src(icon)}" class="kpi-icon-img" alt="icon">'
         except Exception:
             icon_html = '<span class="kpi-icon">⚠️</span>'
     else:
@@ -40,10 +41,77 @@ def render_kpi_card_new(label, value, footer="Dados atualizados", icon="📊"):
     """, unsafe_allow_html=True)
 
 
-def render_plotly_bar(df, x, y, title, color="#d4af37"):
+# Cache de figuras Plotly por fingerprint dos agregados + parâmetros visuais (tema)
+FIGURE_CACHE_SIZE = int(os.getenv("FIGURE_CACHE_SIZE", "64"))
+_FIGURE_CACHE = OrderedDict()
+# Compartilhado pelas threads de todas as sessões: leitura/inserção/evicção serializadas
+_FIGURE_CACHE_LOCK = threading.Lock()
+
+HOVERLABEL_STYLE = dict(
+    bgcolor="#1a1c24",
+    font_size=13,
+    font_family="Inter",
+    font_color="#f8f9fa",
+    bordercolor="#d4af37"
+)
+
+# Paleta otimizada: tons claros e vibrantes que se destacam no dark theme
+# Mantendo harmonia com a identidade visual dourada (#d4af37, #ffd700)
+PALETTE_PREMIUM = [
+    '#FFEB3B',  # Amarelo claro vibrante
+    '#FFD700',  # Dourado brilhante
+    '#FFB74D',  # Laranja suave
+    '#CFD8DC',  # Cinza claro prateado (Blue Grey 100)
+    '#81C784',  # Verde menta
+    '#CE93D8',  # Roxo claro
+]
+
+# SVG de relógio dourado com fundo transparente (centro do donut), codificado uma única vez
+CLOCK_SVG = '''
+<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">
+    <circle cx="50" cy="50" r="45" fill="none" stroke="#d4af37" stroke-width="4"/>
+    <line x1="50" y1="50" x2="50" y2="20" stroke="#d4af37" stroke-width="3" stroke-linecap="round"/>
+    <line x1="50" y1="50" x2="70" y2="65" stroke="#d4af37" stroke-width="3" stroke-linecap="round"/>
+    <circle cx="50" cy="50" r="4" fill="#d4af37"/>
+</svg>
+'''
+CLOCK_SVG_URI = f"data:image/svg+xml,{urllib.parse.quote(CLOCK_SVG)}"
+
+
+def cached_figure(kind, df, params, build):
     """
-    Gráfico de barras com tooltip humanizado.
+    Retorna a figura memoizada para (tipo, dados agregados, parâmetros) ou constrói via build().
+    Figuras em cache são compartilhadas no processo e nunca devem ser alteradas após criadas.
     """
+    hashed = pd.util.hash_pandas_object(df, index=False).values.tobytes()
+    key = hashlib.blake2b(
+        f"{kind}|{list(df.columns)}|{params!r}".encode() + hashed, digest_size=16
+    ).hexdigest()
+
+    with _FIGURE_CACHE_LOCK:
+        fig = _FIGURE_CACHE.get(key)
+        if fig is not None:
+            _FIGURE_CACHE.move_to_end(key)
+            return fig
+
+    # Build fora do lock: figuras lentas não bloqueiam as outras sessões
+    with span(f"plotly.{kind}"):
+        fig = build()
+    with _FIGURE_CACHE_LOCK:
+        _FIGURE_CACHE[key] = fig
+        while len(_FIGURE_CACHE) > FIGURE_CACHE_SIZE:
+            _FIGURE_CACHE.popitem(last=False)
+    return fig
+
+
+def _plotly_express():
+    """plotly.express carregado só quando o primeiro gráfico é construído (fora do cold start)."""
+    import plotly.express as px
+    return px
+
+
+def _build_plotly_bar(df, x, y, title, color):
+    px = _plotly_express()
     fig = px.bar(df, x=x, y=y, title=title if title else None, template="plotly_dark")
     
     fig.update_traces(
@@ -57,42 +125,26 @@ def render_plotly_bar(df, x, y, title, color="#d4af37"):
         margin=dict(l=20, r=20, t=45 if title else 20, b=20),
         xaxis=dict(title=""),
         yaxis=dict(title=""),
-        hoverlabel=dict(
-            bgcolor="#1a1c24",
-            font_size=13,
-            font_family="Inter",
-            font_color="#f8f9fa",
-            bordercolor="#d4af37"
-        )
+        hoverlabel=HOVERLABEL_STYLE
     )
     
     if title:
         layout_args['title_font'] = dict(size=16, color="#d4af37", family='Inter', weight=600)
     
     fig.update_layout(**layout_args)
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-def render_plotly_pie(df, values, names, title, hole=0.5):
+
+def render_plotly_bar(df, x, y, title, color="#d4af37"):
     """
-    Donut chart com:
-    - Paleta clara e contrastante (6 tons)
-    - Tooltips humanizados em PT-BR
-    - Números destacados com bom contraste
-    - Contorno discreto
+    Gráfico de barras com tooltip humanizado.
     """
-    # Última atualização: 2026-01-30 11:13 - Paleta com cinza prateado
-    # Paleta otimizada: tons claros e vibrantes que se destacam no dark theme
-    # Mantendo harmonia com a identidade visual dourada (#d4af37, #ffd700)
-    PALETTE_PREMIUM = [
-        '#FFEB3B',  # Amarelo claro vibrante
-        '#FFD700',  # Dourado brilhante
-        '#FFB74D',  # Laranja suave
-        '#CFD8DC',  # Cinza claro prateado (Blue Grey 100)
-        '#81C784',  # Verde menta
-        '#CE93D8',  # Roxo claro
-    ]
-    
+    fig = cached_figure("bar", df, (x, y, title, color), lambda: _build_plotly_bar(df, x, y, title, color))
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _build_plotly_pie(df, values, names, title, hole):
+    px = _plotly_express()
     fig = px.pie(
         df, 
         values=values, 
@@ -127,13 +179,7 @@ def render_plotly_pie(df, values, names, title, hole=0.5):
             font=dict(size=11, color='#ccc')
         ),
         margin=dict(l=20, r=20, t=45 if title else 20, b=20),
-        hoverlabel=dict(
-            bgcolor="#1a1c24",
-            font_size=13,
-            font_family="Inter",
-            font_color="#f8f9fa",
-            bordercolor="#d4af37"
-        )
+        hoverlabel=HOVERLABEL_STYLE
     )
     
     if title:
@@ -141,27 +187,10 @@ def render_plotly_pie(df, values, names, title, hole=0.5):
 
     fig.update_layout(**layout_args)
     
-    
-    # Adicionar ícone SVG animado no centro do donut (fundo transparente garantido)
-    
-    # SVG de relógio dourado com fundo transparente
-    clock_svg = '''
-    <svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">
-        <circle cx="50" cy="50" r="45" fill="none" stroke="#d4af37" stroke-width="4"/>
-        <line x1="50" y1="50" x2="50" y2="20" stroke="#d4af37" stroke-width="3" stroke-linecap="round"/>
-        <line x1="50" y1="50" x2="70" y2="65" stroke="#d4af37" stroke-width="3" stroke-linecap="round"/>
-        <circle cx="50" cy="50" r="4" fill="#d4af37"/>
-    </svg>
-    '''
-    
-    # Codificar SVG para data URI
-    svg_encoded = urllib.parse.quote(clock_svg)
-    svg_data_uri = f"data:image/svg+xml,{svg_encoded}"
-    
-    # Adicionar imagem no centro usando layout image
+    # Ícone SVG animado no centro do donut (a animação vem do CSS global em styles.py)
     fig.add_layout_image(
         dict(
-            source=svg_data_uri,
+            source=CLOCK_SVG_URI,
             xref="paper", yref="paper",
             x=0.5, y=0.5,
             sizex=0.18, sizey=0.18,
@@ -169,216 +198,209 @@ def render_plotly_pie(df, values, names, title, hole=0.5):
             opacity=0.8
         )
     )
-    
+    return fig
+
+
+def render_plotly_pie(df, values, names, title, hole=0.5):
+    """
+    Donut chart com:
+    - Paleta clara e contrastante (6 tons)
+    - Tooltips humanizados em PT-BR
+    - Números destacados com bom contraste
+    - Contorno discreto
+    """
+    fig = cached_figure("pie", df, (values, names, title, hole, PALETTE_PREMIUM),
+                        lambda: _build_plotly_pie(df, values, names, title, hole))
     st.plotly_chart(fig, use_container_width=True)
-    
-    # Adicionar CSS para animação de rotação do ícone
-    
-    st.markdown("""
-    <style>
-    @keyframes spin {
-        from { transform: rotate(0deg); }
-        to { transform: rotate(360deg); }
-    }
-    
-    /* Animar imagens dentro do gráfico Plotly */
-    .js-plotly-plot .plotly image {
-        animation: spin 3s linear infinite;
-        transform-origin: center;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+
+
+def _build_plotly_area(df, x, y, color):
+    px = _plotly_express()
+    # px.area preenche a área automaticamente
+    fig = px.area(df, x=x, y=y, template="plotly_dark")
+    fig.update_traces(line_color=color)
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)', 
+        plot_bgcolor='rgba(0,0,0,0)', 
+        font_color="#ccc",
+        margin=dict(l=20, r=20, t=20, b=20)
+    )
+    return fig
+
+
+def render_plotly_area(df, x, y, color="#d4af37"):
+    """
+    Gráfico de área (ex.: throughput semanal).
+    """
+    fig = cached_figure("area", df, (x, y, color), lambda: _build_plotly_area(df, x, y, color))
+    st.plotly_chart(fig, use_container_width=True)
+
+WEEKDAY_LABELS = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+
+
+def _build_due_calendar(df, today):
+    px = _plotly_express()
+    # Grade dia da semana x semana (o calendário começa numa segunda-feira)
+    weeks = len(df) // 7
+    z = df['count'].to_numpy().reshape(weeks, 7).T
+    dates = df['date'].dt.strftime('%d/%m').to_numpy().reshape(weeks, 7).T
+    fig = px.imshow(
+        z,
+        x=[f"Sem. {d}" for d in dates[0]],
+        y=WEEKDAY_LABELS,
+        color_continuous_scale=[[0, "#1a1c24"], [0.4, "#6b5a1e"], [1, "#ffd700"]],
+        aspect="auto",
+        template="plotly_dark",
+    )
+    fig.update_traces(
+        customdata=dates,
+        xgap=3, ygap=3,
+        hovertemplate="<b>%{customdata}</b><br>Prazos: %{z}<extra></extra>"
+    )
+    # Marca o dia de hoje (dias anteriores na semana são prazos já vencidos)
+    today_pos = (today - df['date'].iloc[0].normalize()).days
+    if 0 <= today_pos < len(df):
+        fig.add_shape(type="rect", x0=today_pos // 7 - 0.5, x1=today_pos // 7 + 0.5,
+                      y0=today_pos % 7 - 0.5, y1=today_pos % 7 + 0.5, line=dict(color="#d4af37", width=2))
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font_color="#ccc",
+        coloraxis_showscale=False,
+        margin=dict(l=20, r=20, t=20, b=20),
+        hoverlabel=HOVERLABEL_STYLE
+    )
+    return fig
+
+
+def render_due_calendar(df, today):
+    """
+    Heatmap de prazos pendentes por dia (df [date, count] com semanas completas desde uma segunda).
+    """
+    fig = cached_figure("calendar", df, (str(today.date()),), lambda: _build_due_calendar(df, today))
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def render_refresh_status(status):
+    """
+    Legenda da atualização agendada do board (refresh_scheduler.status): horário dos dados,
+    próxima atualização planejada e o motivo do intervalo (taxa de ações, orçamento da API).
+    """
+    refreshed = datetime.fromtimestamp(status["refreshed_at"], timezone.utc)
+    next_refresh = datetime.fromtimestamp(status["next_refresh"], timezone.utc)
+    minutes = max(0, (next_refresh - datetime.now(timezone.utc)).total_seconds()) / 60
+    reason = f"{status['rate']:.1f} ações/h" if status["rate"] is not None else "atividade ainda não medida"
+    if status["budget_factor"] > 1:
+        reason += f", intervalo ×{status['budget_factor']:.1f} pelo orçamento da API"
+    st.caption(
+        f"🔄 Dados de {refreshed:%H:%M} UTC · próxima atualização às {next_refresh:%H:%M} UTC "
+        f"(em {minutes:.0f} min; a cada {status['interval'] / 60:.0f} min · {reason})"
+    )
+
+
+def render_trace_waterfall(trace):
+    """
+    Cascata dos spans de um trace (Trace.to_dict()): uma barra por estágio, posicionada pelo
+    início relativo e com largura proporcional à duração.
+    """
+    total = max(trace.get("total_ms") or 0, 1e-6)
+    rows = []
+    for sp in trace.get("spans", []):
+        ms = sp.get("ms", 0)
+        left = min(sp["start_ms"] / total * 100, 100)
+        width = max(min(ms / total * 100, 100 - left), 0.5)
+        indent = sp.get("depth", 0) * 10
+        rows.append(
+            f'<div style="display:flex; align-items:center; gap:8px; font-size:0.75rem; margin-bottom:3px;">'
+            f'<span style="width:45%; color:#ccc; padding-left:{indent}px; overflow:hidden; white-space:nowrap; text-overflow:ellipsis;">{sp["name"]}</span>'
+            f'<div style="flex:1; position:relative; height:10px; background:rgba(255,255,255,0.04); border-radius:3px;">'
+            f'<div style="position:absolute; left:{left:.2f}%; width:{width:.2f}%; height:100%; background:#d4af37; border-radius:3px;"></div></div>'
+            f'<span style="width:56px; text-align:right; color:#999;">{ms:.0f} ms</span></div>'
+        )
+    st.markdown("".join(rows) or "<small>Sem spans neste rerun.</small>", unsafe_allow_html=True)
+    st.caption(f"Total do rerun: {trace.get('total_ms', 0):.0f} ms")
+
 
 def render_insight_card(insight):
     """
     Renderiza um card de insight com visual premium.
     insight: dict com keys {type, severity, title, metric, description, recommendation, details}
     """
-    
-    # Mapeamento de cores e ícones por severidade
-    styles = {
-        "critical": {"color": "#FF5252", "icon": "🚨", "bg": "rgba(255, 82, 82, 0.1)"},
-        "attention": {"color": "#FFA726", "icon": "⚠️", "bg": "rgba(255, 167, 38, 0.1)"},
-        "info": {"color": "#29B6F6", "icon": "💡", "bg": "rgba(41, 182, 246, 0.1)"},
-        "success": {"color": "#66BB6A", "icon": "🚀", "bg": "rgba(102, 187, 106, 0.1)"}
-    }
-    
-    s = styles.get(insight.get("severity", "info"), styles["info"])
-    
-    # HTML do Card - Minificado para evitar interpretação de bloco de código pelo Markdown
-    html_content = f"""<div style="background: linear-gradient(145deg, #1e2029, #14161d); border-left: 4px solid {s['color']}; border-radius: 8px; padding: 16px; margin-bottom: 16px; box-shadow: 0 4px 6px rgba(0,0,0,0.2); transition: transform 0.2s;"><div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 8px;"><div style="display: flex; align-items: center; gap: 8px;"><span style="font-size: 1.2rem;">{s['icon']}</span><span style="color: {s['color']}; font-weight: 700; font-size: 0.9rem; text-transform: uppercase;">{insight['title']}</span></div><span style="background: {s['bg']}; color: {s['color']}; padding: 2px 8px; border-radius: 12px; font-size: 0.75rem; font-weight: 600;">{insight['metric']}</span></div><p style="color: #e0e0e0; font-size: 0.95rem; margin-bottom: 8px; line-height: 1.4;">{insight['description']}</p><div style="background: rgba(255,255,255,0.03); padding: 8px 12px; border-radius: 6px; border: 1px solid rgba(255,255,255,0.05); display: flex; gap: 8px; align-items: center;"><span style="font-size: 1rem;">👉</span><span style="color: #bbb; font-size: 0.85rem; font-style: italic;">{insight['recommendation']}</span></div></div>"""
-    
+    html_content = insight_card_html(insight)
     st.markdown(html_content, unsafe_allow_html=True)
     
     # Detalhes (st.expander fora do HTML para usar componentes nativos se quiser, ou texto simples)
     if insight.get('details'):
         with st.expander("Ver detalhes e evidências"):
+            now = datetime.now(timezone.utc)
             for item in insight['details']:
                 # Formata detalhes dependendo do conteúdo
                 if 'name' in item:
                     # É um card
-                    st.markdown(f"- **{item.get('list_name', '')}**: {item['name']} " + 
-                                (f"*(Venceu: {item['due_date'].strftime('%d/%m')})*" if 'due_date' in item and hasattr(item['due_date'], 'strftime') else ""))
+                    due = item.get('due_date')
+                    due_txt = ""
+                    if hasattr(due, 'strftime'):
+                        due_txt = f"*(Venceu: {due.strftime('%d/%m')})*" if due < now else f"*(Vence: {due.strftime('%d/%m %H:%M')})*"
+                    st.markdown(f"- **{item.get('list_name', '')}**: {item['name']} " + due_txt)
                 else:
                     st.write(item)
 
-def get_relative_time(dt):
-    """Retorna uma string humanizada do tempo decorrido."""
-    if not dt: return "--"
-    now = datetime.now(timezone.utc)
-    diff = now - dt
-    
-    if diff.days > 30: return dt.strftime('%d/%m/%y')
-    if diff.days > 0: return f"há {diff.days}d"
-    if diff.seconds > 3600: return f"há {diff.seconds // 3600}h"
-    return "agora"
+def selection_key(prefix, state):
+    """
+    Key de uma grid selecionável derivada do estado que define as linhas exibidas (filtros,
+    busca, ordenação, dados): estado novo gera key nova, e a seleção antiga (posição de linha)
+    é descartada em vez de apontar para outra linha.
+    """
+    return f"{prefix}_{hashlib.blake2b(repr(state).encode(), digest_size=8).hexdigest()}"
+
 
-def render_explorer_table(df_cards, on_card_click):
+def selected_row(event, df):
+    """Linha selecionada (Series) de uma grid com on_select, ou None se não houver/for inválida."""
+    rows = event.selection.rows if event else []
+    if not rows or not 0 <= rows[0] < len(df):
+        return None
+    return df.iloc[rows[0]]
+
+
+def render_explorer_table(grid_df, on_card_click, state=(), height=640):
     """
-    Renderiza uma tabela premium de cartões com suporte a busca e filtros aplicados.
+    Renderiza a grid virtualizada do Explorer (um único st.dataframe).
+    grid_df: payload colunar de build_explorer_grid. Clicar numa linha abre os detalhes do card.
+    state: filtros/ordenação/dados que geraram a grid (mudança limpa a seleção).
     """
-    if df_cards.empty:
+    if grid_df.empty:
         st.info("Nenhum cartão encontrado com os filtros aplicados.")
         return
 
-    # Estilo CSS para a tabela explorer (Sticky Header + Hover + Zebra)
-    st.markdown("""
-    <style>
-    .explorer-container {
-        border: 1px solid rgba(212, 175, 55, 0.1);
-        border-radius: 8px;
-        overflow: hidden;
-        background: #14161d;
-    }
-    .explorer-header-row {
-        background: rgba(212, 175, 55, 0.05);
-        color: #d4af37;
-        font-weight: 700;
-        font-size: 0.75rem;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-        padding: 12px;
-        display: grid;
-        grid-template-columns: 2.5fr 1fr 1fr 1.2fr 0.8fr 0.5fr;
-        border-bottom: 1px solid rgba(212, 175, 55, 0.2);
-    }
-    .explorer-row {
-        padding: 10px 12px;
-        display: grid;
-        grid-template-columns: 2.5fr 1fr 1fr 1.2fr 0.8fr 0.5fr;
-        align-items: center;
-        border-bottom: 1px solid rgba(255,255,255,0.03);
-        transition: all 0.2s;
-        cursor: pointer;
-    }
-    .explorer-row:hover {
-        background: rgba(212, 175, 55, 0.08);
-        box-shadow: inset 2px 0 0 #d4af37;
-    }
-    .explorer-row:nth-child(even) { background: rgba(255,255,255,0.01); }
-    
-    .label-badge {
-        font-size: 0.65rem;
-        padding: 1px 6px;
-        border-radius: 10px;
-        margin-right: 4px;
-        font-weight: 600;
-        border: 1px solid rgba(255,255,255,0.1);
-    }
-    .list-badge { 
-        background: rgba(255,255,255,0.08); 
-        padding: 2px 8px; 
-        border-radius: 4px; 
-        font-size: 0.7rem;
-        color: #ccc;
-    }
-    .age-indicator {
-        font-size: 0.7rem;
-        color: #888;
-        display: flex;
-        align-items: center;
-        gap: 4px;
-    }
-    .status-vencido { color: #ff5252; font-weight: 600; }
-    .status-vencendo { color: #ffa726; font-weight: 600; }
-    .status-ok { color: #66bb6a; }
-
-    /* Reduzir botões de ação na tabela */
-    [data-testid="column"] button {
-        height: 30px !important;
-        min-height: 30px !important;
-        padding: 0 !important;
-        line-height: 30px !important;
-        margin: 0 auto !important;
-        display: flex !important;
-        align-items: center !important;
-        justify-content: center !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-    # Headers
-    st.markdown("""
-    <div class="explorer-header-row">
-        <div>Card / Labels</div>
-        <div>Lista</div>
-        <div>Prazo</div>
-        <div>Última Ativ.</div>
-        <div>Idade</div>
-        <div style="text-align:center;">Ações</div>
-    </div>
-    """, unsafe_allow_html=True)
+    event = st.dataframe(
+        grid_df,
+        key=selection_key("explorer_grid", state),
+        height=height,
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        column_order=["Card", "Labels", "Lista", "Status", "Prazo", "Última Ativ.", "Idade", "Checklist"],
+        column_config={
+            "Card": st.column_config.TextColumn("Card", width="large"),
+            "Labels": st.column_config.ListColumn("Labels"),
+            "Lista": st.column_config.TextColumn("Lista"),
+            "Status": st.column_config.TextColumn("Status"),
+            "Prazo": st.column_config.DatetimeColumn("Prazo", format="DD/MM/YYYY"),
+            "Última Ativ.": st.column_config.DatetimeColumn("Última Ativ.", format="DD/MM HH:mm"),
+            "Idade": st.column_config.TextColumn("Idade", help="Dias desde a última atividade"),
+            "Checklist": st.column_config.ProgressColumn("Checklist", min_value=0, max_value=100, format="%.0f%%"),
+        },
+    )
 
-    now = datetime.now(timezone.utc)
-
-    for _, card in df_cards.iterrows():
-        # 1. Prazos
-        due_html = '<span class="status-ok">--</span>'
-        if card['due']:
-            due_dt = pd.to_datetime(card['due'], utc=True)
-            due_str = due_dt.strftime('%d/%m')
-            if card['dueComplete']: 
-                due_html = f'<span class="status-ok">✅ {due_str}</span>'
-            elif due_dt < now: 
-                due_html = f'<span class="status-vencido">🚨 {due_str}</span>'
-            elif (due_dt - now).days < 2: 
-                due_html = f'<span class="status-vencendo">⏳ {due_str}</span>'
-            else:
-                due_html = f'<span>📅 {due_str}</span>'
-        
-        # 2. Labels
-        labels_html = '<div>'
-        for lbl in card.get('labels', [])[:3]:
-            color = lbl.get('color', 'gray')
-            labels_html += f'<span class="label-badge" style="background: {color}44; color: white; border-color: {color}">{lbl.get("name","")}</span>'
-        if len(card.get('labels', [])) > 3:
-            labels_html += f'<span class="label-badge">+{len(card["labels"])-3}</span>'
-        labels_html += '</div>'
-
-        # 3. Idade (Calculada ou Placeholder)
-        # O Trello API não envia common creation date no card objeto base, mas podemos usar o ID como aproximação
-        # ou apenas omitir se não tivermos a data de criação carregada. Usaremos dateLastActivity como 'Idade' visual aqui simplificada.
-        age_days = (now - pd.to_datetime(card['dateLastActivity'], utc=True)).days
-        age_icon = "🟢" if age_days < 5 else "🟡" if age_days < 15 else "🔴"
-
-        with st.container():
-            # Usando grid layout via markdown para precisão visual, mas os botões precisam ser Streamlit
-            col1, col2, col3, col4, col5, col6 = st.columns([2.5, 1, 1, 1.2, 0.8, 0.5])
-            
-            with col1:
-                st.markdown(f"**{card['name']}**{labels_html}", unsafe_allow_html=True)
-            with col2:
-                st.markdown(f'<span class="list-badge">{card["list_name"]}</span>', unsafe_allow_html=True)
-            with col3:
-                st.markdown(due_html, unsafe_allow_html=True)
-            with col4:
-                last_dt = pd.to_datetime(card['dateLastActivity'], utc=True)
-                st.markdown(f"**{last_dt.strftime('%d/%m')}** <br><small style='color:#777'>{get_relative_time(last_dt)}</small>", unsafe_allow_html=True)
-            with col5:
-                st.markdown(f"<div class='age-indicator'>{age_icon} {age_days}d</div>", unsafe_allow_html=True)
-            with col6:
-                if st.button("👁️", key=f"exp_btn_{card['id']}", help="Ver detalhes completos"):
-                    on_card_click(card['id'])
+    # Abre o modal apenas quando a seleção muda (a seleção persiste entre reruns)
+    selected = selected_row(event, grid_df)
+    selected_id = selected['id'] if selected is not None else None
+    if selected_id and selected_id != st.session_state.get("explorer_opened_card"):
+        st.session_state["explorer_opened_card"] = selected_id
+        on_card_click(selected_id)
+    elif not selected_id:
+        st.session_state.pop("explorer_opened_card", None)
 
 @st.dialog("Detalhes do Card", width="large")
 def render_card_detail_dialog(card_data, details):
@@ -437,8 +459,8 @@ def render_card_detail_dialog(card_data, details):
     with col_m2:
         # Prazos e Metadados
         st.markdown("### ℹ️ Detalhes")
-        due_dt = pd.to_datetime(card_data['due']) if card_data['due'] else None
-        due_str = due_dt.strftime('%d/%m/%Y %H:%M') if due_dt else "Não definido"
+        due_dt = pd.to_datetime(card_data.get('due'), errors='coerce')
+        due_str = due_dt.strftime('%d/%m/%Y %H:%M') if pd.notna(due_dt) else "Não definido"
         
         st.markdown(f"**📅 Entrega:**\n{due_str}")
         
@@ -0,0 +1,33 @@
+import functools
+import time
+import streamlit as st
+from src.tracing import span, current_trace, start_trace, end_trace
+
+
+def timed_fragment(name):
+    """
+    Transforma uma seção do dashboard em st.fragment: interações com widgets da própria
+    seção reexecutam só ela. O tempo de cada render fica em st.session_state["fragment_timings"]
+    e aparece como legenda da seção quando o modo debug está ligado. O render também vira um
+    span do trace do rerun (ou um trace próprio quando só o fragment reexecuta).
+    """
+    def decorator(fn):
+        @st.fragment
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            own_trace = start_trace(f"fragment:{name}") if current_trace() is None else None
+            try:
+                with span(name, kind="fragment"):
+                    return fn(*args, **kwargs)
+            finally:
+                if own_trace is not None:
+                    end_trace(own_trace)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                timings = st.session_state.setdefault("fragment_timings", {})
+                runs = timings.get(name, {}).get("runs", 0) + 1
+                timings[name] = {"ms": round(elapsed_ms, 1), "runs": runs}
+                if st.session_state.get("show_debug"):
+                    st.caption(f"⏱️ {name}: {elapsed_ms:.0f} ms (render #{runs})")
+        return wrapper
+    return decorator
@@ -0,0 +1,94 @@
+from html import escape
+
+# Blocos HTML puros (sem Streamlit): usados pelos componentes do app e pelos snapshots estáticos
+
+GOLD = "#d4af37"
+
+INSIGHT_STYLES = {
+    "critical": {"color": "#FF5252", "icon": "🚨", "bg": "rgba(255, 82, 82, 0.1)"},
+    "attention": {"color": "#FFA726", "icon": "⚠️", "bg": "rgba(255, 167, 38, 0.1)"},
+    "info": {"color": "#29B6F6", "icon": "💡", "bg": "rgba(41, 182, 246, 0.1)"},
+    "success": {"color": "#66BB6A", "icon": "🚀", "bg": "rgba(102, 187, 106, 0.1)"}
+}
+
+# CSS mínimo do snapshot estático (mesma identidade visual do dashboard)
+STATIC_CSS = f"""
+body {{ background: #0e1117; color: #e0e0e0; font-family: Inter, -apple-system, 'Segoe UI', sans-serif; margin: 0; padding: 24px 32px; }}
+h1 {{ color: #fff; margin: 0 0 4px 0; font-size: 1.6rem; }}
+h2 {{ color: {GOLD}; font-size: 1.05rem; margin: 0 0 12px 0; text-transform: uppercase; letter-spacing: 1px; }}
+.meta {{ color: #777; font-size: 0.85rem; margin-bottom: 24px; }}
+.grid {{ display: grid; gap: 16px; }}
+.kpis {{ grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); margin-bottom: 24px; }}
+.panels {{ grid-template-columns: repeat(auto-fit, minmax(320px, 1fr)); }}
+.panel {{ background: linear-gradient(135deg, #1a1c24 0%, #14161d 100%); border-radius: 10px; padding: 18px 20px; }}
+.kpi {{ background: linear-gradient(135deg, #1a1c24 0%, #14161d 100%); border-radius: 10px; border-left: 4px solid {GOLD}; padding: 18px 20px; }}
+.kpi-title {{ color: #999; font-size: 0.8rem; font-weight: 700; text-transform: uppercase; letter-spacing: 1.2px; }}
+.kpi-value {{ color: #f8f9fa; font-size: 2.2rem; font-weight: 700; margin: 8px 0; }}
+.kpi-footer {{ color: #777; font-size: 0.8rem; border-top: 1px solid rgba(255,255,255,0.06); padding-top: 8px; }}
+"""
+
+
+def kpi_card_html(label, value, footer="", icon=""):
+    """Card de KPI (versão estática, sem os ícones PNG do app)."""
+    return (
+        f'<div class="kpi"><div class="kpi-title">{icon} {escape(str(label))}</div>'
+        f'<div class="kpi-value">{escape(str(value))}</div>'
+        f'<div class="kpi-footer">{escape(str(footer))}</div></div>'
+    )
+
+
+def insight_card_html(insight):
+    """Card de insight (mesmo HTML exibido no app). Minificado para o Markdown não tratar como bloco de código."""
+    s = INSIGHT_STYLES.get(insight.get("severity", "info"), INSIGHT_STYLES["info"])
+    title = escape(str(insight.get('title', '')))
+    metric = escape(str(insight.get('metric', '')))
+    description = escape(str(insight.get('description', '')))
+    recommendation = escape(str(insight.get('recommendation', '')))
+    return f"""<div style="background: linear-gradient(145deg, #1e2029, #14161d); border-left: 4px solid {s['color']}; border-radius: 8px; padding: 16px; margin-bottom: 16px; box-shadow: 0 4px 6px rgba(0,0,0,0.2); transition: transform 0.2s;"><div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 8px;"><div style="display: flex; align-items: center; gap: 8px;"><span style="font-size: 1.2rem;">{s['icon']}</span><span style="color: {s['color']}; font-weight: 700; font-size: 0.9rem; text-transform: uppercase;">{title}</span></div><span style="background: {s['bg']}; color: {s['color']}; padding: 2px 8px; border-radius: 12px; font-size: 0.75rem; font-weight: 600;">{metric}</span></div><p style="color: #e0e0e0; font-size: 0.95rem; margin-bottom: 8px; line-height: 1.4;">{description}</p><div style="background: rgba(255,255,255,0.03); padding: 8px 12px; border-radius: 6px; border: 1px solid rgba(255,255,255,0.05); display: flex; gap: 8px; align-items: center;"><span style="font-size: 1rem;">👉</span><span style="color: #bbb; font-size: 0.85rem; font-style: italic;">{recommendation}</span></div></div>"""
+
+
+def bar_chart_html(items, color=GOLD):
+    """Barras horizontais em CSS puro. items: [(rótulo, valor)]."""
+    items = list(items)
+    if not items:
+        return '<small style="color:#777">Sem dados.</small>'
+    top = max(value for _, value in items) or 1
+    rows = []
+    for label, value in items:
+        width = value / top * 100
+        rows.append(
+            f'<div style="display:flex; align-items:center; gap:10px; margin-bottom:6px; font-size:0.85rem;">'
+            f'<span style="width:38%; color:#ccc; overflow:hidden; white-space:nowrap; text-overflow:ellipsis;">{escape(str(label))}</span>'
+            f'<div style="flex:1; background:rgba(255,255,255,0.04); border-radius:4px; height:14px;">'
+            f'<div style="width:{width:.1f}%; background:{color}; height:100%; border-radius:4px;"></div></div>'
+            f'<span style="width:44px; text-align:right; color:#999;">{value}</span></div>'
+        )
+    return "".join(rows)
+
+
+def column_chart_html(items, color=GOLD, height=140):
+    """Colunas verticais em CSS puro (ex.: throughput por semana). items: [(rótulo, valor)]."""
+    items = list(items)
+    if not items:
+        return '<small style="color:#777">Sem dados.</small>'
+    top = max(value for _, value in items) or 1
+    cols = []
+    for label, value in items:
+        bar = value / top * (height - 30)
+        cols.append(
+            f'<div style="flex:1; display:flex; flex-direction:column; align-items:center; justify-content:flex-end; min-width:0;" title="{escape(str(label))}: {value}">'
+            f'<span style="font-size:0.7rem; color:#999;">{value}</span>'
+            f'<div style="width:70%; height:{bar:.0f}px; background:{color}; border-radius:3px 3px 0 0;"></div>'
+            f'<span style="font-size:0.65rem; color:#777; white-space:nowrap;">{escape(str(label))}</span></div>'
+        )
+    return f'<div style="display:flex; gap:4px; align-items:flex-end; height:{height}px;">{"".join(cols)}</div>'
+
+
+def page_html(title, body, refresh_seconds=None):
+    """Documento HTML autocontido (CSS embutido, sem JS)."""
+    refresh = f'<meta http-equiv="refresh" content="{int(refresh_seconds)}">' if refresh_seconds else ""
+    return (
+        f'<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">'
+        f'<meta name="viewport" content="width=device-width, initial-scale=1">{refresh}'
+        f'<title>{escape(title)}</title><style>{STATIC_CSS}</style></head><body>{body}</body></html>'
+    )
@@ -0,0 +1,35 @@
+import streamlit as st
+from src.data import BoardSnapshot
+from src.services.refresh import refresh_scheduler
+
+
+class _BoardUnavailable(Exception):
+    """Falha ao carregar o board: levantada para que o resultado não seja cacheado."""
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _load_board_snapshot(_service, board_id, epoch):
+    board_data = _service.get_board_data(board_id)
+    if not board_data:
+        raise _BoardUnavailable(board_id)
+    return BoardSnapshot(board_data, _service.get_board_checklists(board_id))
+
+
+# Época vencida: o snapshot anterior sai do cache na hora (não fica ocupando memória até a evicção)
+refresh_scheduler.on_advance("board_snapshot", lambda board_id, epoch: _load_board_snapshot.clear(None, board_id, epoch))
+
+
+def get_board_snapshot(service, board_id):
+    """
+    Snapshot imutável do board, um por processo e época de atualização (st.cache_resource):
+    todas as sessões compartilham os mesmos dados. Retorna None se o board não puder ser carregado.
+    """
+    try:
+        return _load_board_snapshot(service, board_id, refresh_scheduler.epoch(board_id))
+    except _BoardUnavailable:
+        return None
+
+
+def clear_board_snapshots():
+    """Descarta os snapshots (ex.: botão de sincronização manual)."""
+    _load_board_snapshot.clear()
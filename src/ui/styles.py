@@ -149,5 +149,16 @@ def apply_custom_styles():
             font-weight: 700 !important;
             letter-spacing: -0.5px !important;
         }
+
+        /* Ícone animado no centro dos donuts Plotly */
+        @keyframes spin {
+            from { transform: rotate(0deg); }
+            to { transform: rotate(360deg); }
+        }
+
+        .js-plotly-plot .plotly image {
+            animation: spin 3s linear infinite;
+            transform-origin: center;
+        }
     </style>
     """, unsafe_allow_html=True)
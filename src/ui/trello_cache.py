@@ -0,0 +1,55 @@
+import streamlit as st
+from src.services.shared_cache import SharedCacheTrelloService
+from src.services.refresh import refresh_scheduler
+
+
+class CachedTrelloService(SharedCacheTrelloService):
+    """
+    TrelloService com o cache da UI (st.cache_data) e erros exibidos no app.
+    As entradas são chaveadas pela época do board no refresh_scheduler: quando o intervalo de
+    atualização do board vence, a época avança e a próxima leitura busca de novo. Abaixo fica o
+    cache em disco compartilhado com os jobs (alertas, snapshots), então cada board é buscado no
+    Trello no máximo uma vez por intervalo.
+    """
+
+    def get_board_data(self, board_id):
+        return self._board_data(board_id, refresh_scheduler.epoch(board_id))
+
+    def get_actions(self, board_id, limit=1000):
+        return self._actions(board_id, limit, refresh_scheduler.epoch(board_id))
+
+    def get_assignments(self, board_id, limit=1000):
+        return self._assignments(board_id, limit, refresh_scheduler.epoch(board_id))
+
+    def get_board_checklists(self, board_id):
+        return self._checklists(board_id, refresh_scheduler.epoch(board_id))
+
+    @st.cache_data(max_entries=16, show_spinner="Coletando dados do Trello...")
+    def _board_data(_self, board_id, epoch):
+        board_data = SharedCacheTrelloService.get_board_data(_self, board_id)
+        if board_data is None and _self.last_error:
+            st.error(_self.last_error)
+        return board_data
+
+    @st.cache_data(max_entries=16)
+    def _actions(_self, board_id, limit, epoch):
+        return SharedCacheTrelloService.get_actions(_self, board_id, limit)
+
+    @st.cache_data(max_entries=16)
+    def _assignments(_self, board_id, limit, epoch):
+        return SharedCacheTrelloService.get_assignments(_self, board_id, limit)
+
+    @st.cache_data(max_entries=16)
+    def _checklists(_self, board_id, epoch):
+        return SharedCacheTrelloService.get_board_checklists(_self, board_id)
+
+
+def _evict_epoch(board_id, epoch):
+    """Descarta os payloads da época anterior do board (limit padrão, o único usado pelas páginas)."""
+    CachedTrelloService._board_data.clear(None, board_id, epoch)
+    CachedTrelloService._actions.clear(None, board_id, 1000, epoch)
+    CachedTrelloService._assignments.clear(None, board_id, 1000, epoch)
+    CachedTrelloService._checklists.clear(None, board_id, epoch)
+
+
+refresh_scheduler.on_advance("trello_payloads", _evict_epoch)